@@ -0,0 +1,233 @@
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+from streaming_stats import SUMMARY_COLUMNS, as_stored, float32_columns, report_frame
+
+# Engines the aggregation steps of eda.py and patterns_analysis.py run on.
+# Polars evaluates each step as one lazy query over all the columns, on every
+# core; pandas is always available and is used when polars is not installed.
+BACKENDS = ['pandas', 'polars']
+
+
+def resolve_backend(name='auto'):
+    """The backend to use for ``name``: 'auto' picks polars when it is installed."""
+    polars_installed = importlib.util.find_spec('polars') is not None
+    if name == 'auto':
+        return 'polars' if polars_installed else 'pandas'
+    if name == 'polars' and not polars_installed:
+        print("polars is not installed; using the pandas backend")
+        return 'pandas'
+    return name
+
+
+def add_backend_argument(parser):
+    parser.add_argument('--backend', choices=['auto', *BACKENDS], default='auto',
+                        help='engine for the aggregations: polars (multi-threaded) or pandas; '
+                             'auto uses polars when it is installed (default: auto)')
+
+
+def to_polars(df):
+    """A polars LazyFrame of ``df``; categorical columns become their integer codes.
+
+    Codes keep the category order (and pandas' tie-breaking by it) without
+    converting labels, and missing values become nulls so that polars skips
+    them like pandas does.
+    """
+    import polars as pl
+
+    columns = {}
+    for name, series in df.items():
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            columns[name] = pl.Series(name, series.cat.codes.to_numpy())
+        else:
+            columns[name] = pl.from_pandas(series, nan_to_null=True)
+    frame = pl.DataFrame(columns).lazy()
+    codes = [pl.when(pl.col(name) >= 0).then(pl.col(name)).alias(name)
+             for name, series in df.items() if isinstance(series.dtype, pd.CategoricalDtype)]
+    return frame.with_columns(codes) if codes else frame
+
+
+def _labels(series, values):
+    """Map polars group values back to the labels of ``series``."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return [series.cat.categories[code] for code in values]
+    return list(values)
+
+
+def describe(df, backend='pandas'):
+    """``df.describe(include='all').T`` plus ``missing`` and ``missing_percentage``.
+
+    This is the table eda.py writes to ``summary_statistics.csv``; both
+    backends return it with the same layout and values. Columns are
+    described as ``streaming_stats.report_frame`` gives them.
+    """
+    float32 = float32_columns(df)
+    df = report_frame(df)
+    if backend == 'pandas':
+        summary = df.describe(include='all').T
+        missing = df.isnull().sum()
+    else:
+        summary, missing = _describe_polars(df)
+    summary['missing'] = missing
+    summary['missing_percentage'] = (missing / len(df)) * 100
+    return as_stored(summary, float32)
+
+
+def _describe_polars(df):
+    import polars as pl
+
+    numeric = [name for name, series in df.items()
+               if pd.api.types.is_numeric_dtype(series)
+               and not isinstance(series.dtype, pd.CategoricalDtype)]
+    others = [name for name in df.columns if name not in numeric]
+    frame = to_polars(df)
+
+    # One query for every numeric statistic and null count, one value count
+    # per other column; polars runs them together. Statistics are computed
+    # as pandas does, in float64 (the variance in two passes).
+    stats = []
+    for name in numeric:
+        wide = pl.col(name).cast(pl.Float64)
+        stats += [
+            pl.col(name).count().alias(f'{name}|count'),
+            pl.col(name).mean().alias(f'{name}|mean'),
+            _variance(pl, name).alias(f'{name}|var'),
+            pl.col(name).min().alias(f'{name}|min'),
+            wide.quantile(0.25, 'linear').alias(f'{name}|25%'),
+            wide.quantile(0.5, 'linear').alias(f'{name}|50%'),
+            wide.quantile(0.75, 'linear').alias(f'{name}|75%'),
+            pl.col(name).max().alias(f'{name}|max'),
+        ]
+    stats += [pl.col(name).null_count().alias(f'{name}|missing') for name in df.columns]
+    queries = [frame.select(stats)]
+    for name in others:
+        counts = frame.select(name).drop_nulls().group_by(name, maintain_order=True).len()
+        if isinstance(df[name].dtype, pd.CategoricalDtype):
+            # pandas breaks ties for the most frequent value by category
+            # order, i.e. by code; otherwise by first occurrence
+            counts = counts.sort(name)
+        queries.append(counts.select(pl.len().alias('unique'),
+                                     pl.col(name).get(pl.col('len').arg_max()).alias('top'),
+                                     pl.col('len').max().alias('freq')))
+    results = pl.collect_all(queries)
+    values = results[0].row(0, named=True)
+
+    described = []
+    for name in df.columns:
+        series = df[name]
+        if name in numeric:
+            stat_index = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+            var = values[f'{name}|var'] if values[f'{name}|count'] > 1 else np.nan
+            values[f'{name}|std'] = np.sqrt(var)
+            row = [np.nan if values[f'{name}|{stat}'] is None else values[f'{name}|{stat}']
+                   for stat in stat_index]
+            described.append(pd.Series(row, index=stat_index, name=name, dtype=float))
+            continue
+        unique, top, freq = results[1 + others.index(name)].row(0)
+        if unique:
+            top, freq, dtype = _labels(series, [top])[0], np.int64(freq), None
+        else:
+            top, freq, dtype = np.nan, np.nan, 'object'
+        described.append(pd.Series([len(df) - values[f'{name}|missing'], unique, top, freq],
+                                   index=['count', 'unique', 'top', 'freq'], name=name,
+                                   dtype=dtype))
+
+    # Same assembly as DataFrame.describe: rows in describe()'s order
+    stat_order = [stat for stat in SUMMARY_COLUMNS
+                  if any(stat in series.index for series in described)]
+    summary = pd.concat([series.reindex(stat_order) for series in described], axis=1,
+                        ignore_index=True, sort=False)
+    summary.columns = df.columns.copy()
+    missing = pd.Series([values[f'{name}|missing'] for name in df.columns], index=df.columns,
+                        dtype='int64')
+    return summary.T, missing
+
+
+def survival_counts(df, keys, target='Survived'):
+    """Group sizes and survivor sums of every grouping in ``keys``, on polars.
+
+    Returns a ``survival_aggregates.SurvivalCounts`` holding the same sums
+    ``survival_tables`` reduces with ``np.bincount``; its ``tables()`` are
+    that function's result. All groupings run as one parallel query.
+    """
+    import polars as pl
+    from survival_aggregates import SurvivalCounts
+
+    counts = SurvivalCounts(keys, target)
+    columns = sorted({column for key in counts.keys
+                      for column in ((key,) if isinstance(key, str) else key)} | {target})
+    frame = to_polars(df[columns])
+    queries = [frame.select(pl.col(target).count().alias('n'), pl.col(target).sum().alias('sum'))]
+    for key in counts.keys:
+        group = [key] if isinstance(key, str) else list(key)
+        queries.append(frame.drop_nulls(group).group_by(group)
+                       .agg(pl.len().alias('count'), pl.col(target).sum().alias('survived')))
+    results = pl.collect_all(queries)
+
+    counts.n = int(results[0]['n'][0])
+    counts.survived = float(results[0]['sum'][0])
+    for column in columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            counts.categories[column] = [label.item() if isinstance(label, np.generic) else label
+                                         for label in df[column].cat.categories]
+        else:
+            counts.dtypes[column] = str(df[column].dtype)
+    for key, result in zip(counts.keys, results[1:]):
+        group = [key] if isinstance(key, str) else list(key)
+        labels = zip(*[[label.item() if isinstance(label, np.generic) else label
+                        for label in _labels(df[column], result[column].to_list())]
+                       for column in group])
+        counts.groups[key] = {tuple(label): [int(count), float(survived)]
+                              for label, count, survived in zip(labels, result['count'],
+                                                                result['survived'])}
+    return counts
+
+
+def _variance(pl, name):
+    # Sample variance as pandas computes it: in two passes, in float64
+    wide = pl.col(name).cast(pl.Float64)
+    return ((wide - wide.mean()) ** 2).sum() / (wide.count() - 1)
+
+
+def outlier_bounds(df, features, method, threshold):
+    """``outliers.outlier_bounds`` on polars: all features in one query.
+
+    Statistics are computed as pandas computes them for the feature's dtype,
+    so both backends flag the same values.
+    """
+    import polars as pl
+
+    frame = to_polars(df[features])
+    wide = [pl.col(name).cast(pl.Float64) for name in features]
+    if method == 'iqr':
+        low = [column.quantile(0.25, 'linear') for column in wide]
+        high = [column.quantile(0.75, 'linear') for column in wide]
+    elif method == 'mad':
+        low = [column.median() for column in wide]
+        high = [(column - column.median()).abs().median() for column in wide]
+    elif method == 'zscore':
+        low = [pl.col(name).mean() for name in features]
+        high = [_variance(pl, name) for name in features]
+    else:
+        raise ValueError(f"Unknown outlier method: {method!r}")
+    first, second = pl.collect_all([frame.select(low), frame.select(high)])
+    rows = []
+    for name, a, b in zip(features, first.row(0), second.row(0)):
+        a = np.nan if a is None else a
+        b = np.nan if b is None else b
+        if method == 'iqr':
+            lower, upper = a - threshold * (b - a), b + threshold * (b - a)
+        elif method == 'mad':
+            # 0.6745 scales the MAD to a standard deviation for normal data
+            spread = threshold * b / 0.6745
+            lower, upper = a - spread, a + spread
+        else:
+            if df[name].dtype == np.float32:
+                # pandas rounds a float32 column's variance to float32
+                b = np.float32(b)
+            std = float(np.sqrt(b))
+            lower, upper = a - threshold * std, a + threshold * std
+        rows.append((lower, upper))
+    return pd.DataFrame(rows, index=features, columns=['lower', 'upper'])
@@ -0,0 +1,324 @@
+import argparse
+import contextlib
+import csv
+import glob
+import multiprocessing
+import os
+import runpy
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from data_loader import COLUMNAR_FORMATS, forget_loaded, load_titanic, parse_filter
+from figure_pool import load_plotting, reset_plotting
+from profiling import take_records
+from render_settings import add_render_argument, render_profile, set_render_profile
+from run_pipeline import STAGES
+from survival_aggregates import survival_tables
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# File types picked up when a directory is given as input
+INPUT_EXTENSIONS = ['.csv'] + list(COLUMNAR_FORMATS)
+
+# Rough peak memory of one dataset's analysis: a fixed cost for the
+# interpreter and plotting libraries plus a multiple of the input file size
+# (typed frame, encoded copies and per-figure temporaries). Used to decide
+# how many datasets may be in flight at once.
+MEMORY_BASE_MB = 600
+MEMORY_PER_INPUT_BYTE = 6
+
+INDEX_FIELDS = ['dataset', 'input', 'output_dir', 'status', 'failed_stages', 'rows', 'seconds']
+COMPARISON_FIELDS = ['dataset', 'rows', 'survival_rate', 'female_share', 'mean_age',
+                     'median_fare', 'missing_age_pct', 'missing_cabin_pct',
+                     'class_1_share', 'class_2_share', 'class_3_share',
+                     'female_survival', 'male_survival',
+                     'class_1_survival', 'class_2_survival', 'class_3_survival']
+
+
+def find_inputs(patterns):
+    """Input files matching ``patterns``: globs, files or directories."""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = [os.path.join(pattern, name) for name in sorted(os.listdir(pattern))
+                       if os.path.splitext(name)[1].lower() in INPUT_EXTENSIONS]
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True))
+        paths.extend(os.path.abspath(path) for path in matches if os.path.isfile(path))
+    return list(dict.fromkeys(paths))
+
+
+def dataset_names(paths):
+    """Unique output directory name for each input, from its file name."""
+    names = {}
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = stem
+        if name in names.values():
+            name = f'{os.path.basename(os.path.dirname(path))}_{stem}'
+        suffix = 2
+        while name in names.values():
+            name = f'{stem}_{suffix}'
+            suffix += 1
+        names[path] = name
+    return names
+
+
+def estimated_memory_mb(path):
+    return MEMORY_BASE_MB + os.path.getsize(path) * MEMORY_PER_INPUT_BYTE / 2 ** 20
+
+
+def default_memory_budget_mb():
+    """Half of the machine's physical memory, or 4 GB when it is unknown."""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 2 ** 20 / 2
+    except (ValueError, OSError, AttributeError):
+        return 4096
+
+
+def _preload():
+    """Import the heavy libraries once, so forked workers start with them loaded."""
+    import pandas  # noqa: F401
+    import pyarrow  # noqa: F401
+    import plotly.graph_objects  # noqa: F401
+    load_plotting()
+
+
+def _run_script(script, args, log_path):
+    """Run a stage script in this process as ``__main__``; return True on success.
+
+    The script's output goes to ``log_path``. Each script starts from
+    matplotlib's default style and an empty set of timing records.
+    """
+    reset_plotting()
+    take_records()
+    saved_argv = sys.argv
+    sys.argv = [script] + args
+    try:
+        with open(log_path, 'w') as log, contextlib.redirect_stdout(log), \
+                contextlib.redirect_stderr(log):
+            try:
+                runpy.run_path(os.path.join(REPO_DIR, script), run_name='__main__')
+            except SystemExit as exc:
+                return exc.code in (None, 0)
+            except Exception:
+                import traceback
+                traceback.print_exc()
+                return False
+        return True
+    finally:
+        sys.argv = saved_argv
+        # Empty the figure pool before closing everything the script left open
+        reset_plotting()
+        import matplotlib.pyplot as plt
+        plt.close('all')
+
+
+def compare_metrics(df):
+    """Headline figures of one dataset for the cross-dataset comparison table."""
+    tables = survival_tables(df, ['Sex', 'Pclass'])
+    sex, pclass = tables['Sex'], tables['Pclass']
+    n_rows = len(df)
+    metrics = {
+        'rows': n_rows,
+        'survival_rate': df['Survived'].mean() * 100,
+        'female_share': sex['count'].get('female', 0) / n_rows * 100,
+        'mean_age': df['Age'].mean(),
+        'median_fare': df['Fare'].median(),
+        'missing_age_pct': df['Age'].isna().mean() * 100,
+        'missing_cabin_pct': df['Cabin'].isna().mean() * 100,
+        'female_survival': sex['rate'].get('female', float('nan')) * 100,
+        'male_survival': sex['rate'].get('male', float('nan')) * 100,
+    }
+    for pclass_value in (1, 2, 3):
+        metrics[f'class_{pclass_value}_share'] = pclass['count'].get(pclass_value, 0) / n_rows * 100
+        metrics[f'class_{pclass_value}_survival'] = (
+            pclass['rate'].get(pclass_value, float('nan')) * 100)
+    return {field: value if field == 'rows' else round(float(value), 2)
+            for field, value in metrics.items()}
+
+
+def analyse_dataset(path, output_dir, where=(), profile='publication'):
+    """Run every stage for one input inside ``output_dir``.
+
+    Stage scripts run in this worker process, so libraries are imported
+    once per worker rather than once per dataset and stage, and the typed
+    frame loaded by the first stage is reused by the later ones. Returns
+    the dataset's index row and comparison metrics.
+    """
+    start = time.perf_counter()
+    os.makedirs(os.path.join(output_dir, 'logs'), exist_ok=True)
+    previous_dir = os.getcwd()
+    os.chdir(output_dir)
+    failed = []
+    metrics = {}
+    try:
+        set_render_profile(profile)
+        data_args = ['--data', path]
+        for text in where:
+            data_args += ['--where', text]
+        for name, stage in STAGES.items():
+            args = list(data_args)
+            if stage['script'] != 'eda.py':
+                args += ['--render-profile', profile]
+            if stage['script'] == 'visualizations.py':
+                # Datasets are already spread over the worker pool
+                args += ['--jobs', '1']
+            if not _run_script(stage['script'], args, os.path.join('logs', f'{name}.log')):
+                failed.append(name)
+        try:
+            metrics = compare_metrics(load_titanic(path, filters=[parse_filter(text)
+                                                                  for text in where]))
+        except Exception as exc:
+            failed.append(f'comparison ({exc})')
+    finally:
+        os.chdir(previous_dir)
+        forget_loaded()
+    row = {
+        'input': path,
+        'output_dir': output_dir,
+        'status': 'failed' if failed else 'ok',
+        'failed_stages': ' '.join(failed),
+        'rows': metrics.get('rows', ''),
+        'seconds': round(time.perf_counter() - start, 2),
+    }
+    return row, metrics
+
+
+def _write_csv(path, fields, rows):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp_path, path)
+
+
+def _markdown_table(fields, rows):
+    lines = ['| ' + ' | '.join(fields) + ' |', '|' + '---|' * len(fields)]
+    lines += ['| ' + ' | '.join(str(row.get(field, '')) for field in fields) + ' |'
+              for row in rows]
+    return '\n'.join(lines)
+
+
+def write_index(output_root, index_rows, comparison_rows):
+    """Write ``index.csv``, ``comparison.csv`` and an ``index.md`` showing both."""
+    _write_csv(os.path.join(output_root, 'index.csv'), INDEX_FIELDS, index_rows)
+    _write_csv(os.path.join(output_root, 'comparison.csv'), COMPARISON_FIELDS, comparison_rows)
+    linked = [{**row, 'dataset': f"[{row['dataset']}]({row['dataset']}/)"} for row in index_rows]
+    with open(os.path.join(output_root, 'index.md'), 'w', encoding='utf-8') as f:
+        f.write(f'# EDA batch run\n\n{len(index_rows)} datasets, '
+                f"{sum(row['status'] == 'ok' for row in index_rows)} succeeded.\n\n")
+        f.write(_markdown_table(['dataset', 'status', 'failed_stages', 'rows', 'seconds'], linked))
+        f.write('\n\n## Comparison\n\n')
+        f.write(_markdown_table(COMPARISON_FIELDS, comparison_rows))
+        f.write('\n')
+
+
+def run_batch(paths, output_root, jobs=None, memory_budget_mb=None, where=(),
+              profile='publication'):
+    """Analyse every input in ``paths`` on a pool of ``jobs`` worker processes.
+
+    Largest inputs are started first. A dataset is only started while the
+    estimated memory of the datasets in flight stays within
+    ``memory_budget_mb`` (one always runs). Returns the index rows.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    memory_budget_mb = memory_budget_mb or default_memory_budget_mb()
+    names = dataset_names(paths)
+    pending = sorted(paths, key=os.path.getsize, reverse=True)
+    os.makedirs(output_root, exist_ok=True)
+
+    if 'fork' in multiprocessing.get_all_start_methods():
+        # Workers inherit the preloaded libraries
+        _preload()
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context()
+
+    index_rows = {}
+    comparison_rows = {}
+    running = {}
+    in_flight_mb = 0.0
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths)) or 1, mp_context=context,
+                             initializer=None if context.get_start_method() == 'fork'
+                             else _preload) as pool:
+        while pending or running:
+            for path in list(pending):
+                if len(running) >= jobs:
+                    break
+                needed = estimated_memory_mb(path)
+                if running and in_flight_mb + needed > memory_budget_mb:
+                    continue
+                pending.remove(path)
+                output_dir = os.path.abspath(os.path.join(output_root, names[path]))
+                future = pool.submit(analyse_dataset, path, output_dir, list(where), profile)
+                running[future] = (path, needed)
+                in_flight_mb += needed
+                print(f"[{names[path]}] started")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, needed = running.pop(future)
+                in_flight_mb -= needed
+                name = names[path]
+                try:
+                    row, metrics = future.result()
+                except Exception as exc:
+                    row = {'input': path, 'output_dir': os.path.join(output_root, name),
+                           'status': 'failed', 'failed_stages': f'worker ({exc})',
+                           'rows': '', 'seconds': ''}
+                    metrics = {}
+                index_rows[path] = {'dataset': name, **row}
+                if metrics:
+                    comparison_rows[path] = {'dataset': name, **metrics}
+                print(f"[{name}] {row['status']} in {row['seconds']}s"
+                      + (f" (failed: {row['failed_stages']})" if row['failed_stages'] else ''))
+
+    ordered = sorted(paths, key=lambda path: names[path])
+    index = [index_rows[path] for path in ordered]
+    write_index(output_root, index, [comparison_rows[path] for path in ordered
+                                     if path in comparison_rows])
+    return index
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Run the full EDA over many datasets, each into its own output directory')
+    parser.add_argument('inputs', nargs='+', metavar='INPUT',
+                        help='input files, glob patterns (quote them) or directories of '
+                             f"{', '.join(INPUT_EXTENSIONS)} files")
+    parser.add_argument('--output', default='batch_output',
+                        help='directory receiving one sub-directory per dataset plus '
+                             'index.csv, comparison.csv and index.md (default: batch_output)')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='worker processes (default: CPU count)')
+    parser.add_argument('--memory-budget', type=float, default=None, metavar='MB',
+                        help='estimated memory the datasets in flight may use together '
+                             '(default: half of physical memory)')
+    parser.add_argument('--where', action='append', default=[], metavar='FILTER',
+                        help="row filter applied to every dataset, e.g. 'Pclass=1'; "
+                             "repeat to combine")
+    add_render_argument(parser)
+    args = parser.parse_args()
+    set_render_profile(args.render_profile)
+    for text in args.where:
+        try:
+            parse_filter(text)
+        except ValueError as exc:
+            parser.error(str(exc))
+
+    paths = find_inputs(args.inputs)
+    if not paths:
+        parser.error(f"no input files match {' '.join(args.inputs)}")
+    print(f"Analysing {len(paths)} dataset(s) into {args.output}/")
+    start = time.perf_counter()
+    index = run_batch(paths, args.output, jobs=args.jobs, memory_budget_mb=args.memory_budget,
+                      where=args.where, profile=render_profile())
+    failed = [row['dataset'] for row in index if row['status'] != 'ok']
+    print(f"\n{len(index) - len(failed)} of {len(index)} datasets analysed in "
+          f"{time.perf_counter() - start:.1f}s; see {os.path.join(args.output, 'index.md')}")
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+    sys.exit(1 if failed else 0)
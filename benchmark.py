@@ -0,0 +1,195 @@
+import argparse
+import csv
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from render_settings import add_render_argument, render_profile, set_render_profile
+from synthetic_data import write_synthetic_csv
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Generated inputs and per-size working directories (not tracked)
+BENCH_DIR = os.path.join(REPO_DIR, 'benchmarks')
+
+# Results of every run are appended here, one row per stage and size
+RESULTS_PATH = os.path.join(REPO_DIR, 'benchmark_results.csv')
+RESULT_FIELDS = ['timestamp', 'commit', 'stage', 'render_profile', 'rows', 'seconds',
+                 'rows_per_s', 'peak_rss_mb', 'returncode']
+
+DEFAULT_SIZES = [10**3, 10**4, 10**5, 10**6]
+
+# Command line of each benchmarked stage, run from the working directory that
+# holds the synthetic titanic.csv. 'load' parses the CSV into the typed cache
+# so the later stages measure their own work rather than the parse.
+STAGES = {
+    'load': ['-c', 'from data_loader import load_titanic; load_titanic()'],
+    'eda': ['eda.py'],
+    'eda_stream': ['eda.py', '--stream'],
+    'eda_pandas': ['eda.py', '--backend', 'pandas'],
+    'eda_polars': ['eda.py', '--backend', 'polars'],
+    'visualizations': ['visualizations.py', '--force'],
+    'feature_relationships': ['feature_relationships.py', '--force'],
+    'patterns_analysis': ['patterns_analysis.py', '--force'],
+    'patterns_analysis_pandas': ['patterns_analysis.py', '--force', '--backend', 'pandas'],
+    'patterns_analysis_polars': ['patterns_analysis.py', '--force', '--backend', 'polars'],
+    'feature_inferences': ['feature_inferences.py'],
+}
+DEFAULT_STAGES = ['load', 'eda', 'eda_stream', 'patterns_analysis', 'feature_relationships']
+
+
+def current_commit():
+    """Short hash of the checked-out commit, suffixed with '+' for local changes."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               cwd=REPO_DIR, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return commit + ('+' if dirty else '')
+
+
+def dataset(rows, seed=0):
+    """Path of the synthetic CSV with ``rows`` rows, generated on first use."""
+    data_dir = os.path.join(BENCH_DIR, 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f'titanic_{rows}_{seed}.csv')
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        write_synthetic_csv(tmp_path, rows, seed=seed)
+        os.replace(tmp_path, path)
+        print(f"Generated {rows:,} rows in {time.perf_counter() - start:.1f}s: {path}")
+    return path
+
+
+def run_measured(args, cwd, log_path, timeout=None):
+    """Run a Python command; return (returncode, seconds, peak RSS in MB)."""
+    env = dict(os.environ, PYTHONPATH=REPO_DIR, MPLBACKEND='Agg')
+    start = time.perf_counter()
+    with open(log_path, 'w') as log:
+        proc = subprocess.Popen([sys.executable] + args, cwd=cwd, stdout=log,
+                                stderr=subprocess.STDOUT, env=env)
+        if not hasattr(os, 'wait4'):
+            return proc.wait(timeout), time.perf_counter() - start, None
+        # wait4 reports the resource usage of this child (and its workers) only
+        deadline = None if timeout is None else start + timeout
+        while True:
+            pid, status, usage = os.wait4(proc.pid, os.WNOHANG if deadline else 0)
+            if pid:
+                break
+            if time.perf_counter() > deadline:
+                proc.kill()
+                pid, status, usage = os.wait4(proc.pid, 0)
+                break
+            time.sleep(0.05)
+    seconds = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is reported in kilobytes on Linux
+    return proc.returncode, seconds, usage.ru_maxrss / 1024
+
+
+def run_size(rows, stages, seed=0, timeout=None):
+    """Run ``stages`` on a fresh working directory for ``rows``; return result rows."""
+    work_dir = os.path.join(BENCH_DIR, 'work', str(rows))
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(os.path.join(work_dir, 'logs'))
+    source = dataset(rows, seed)
+    try:
+        os.symlink(source, os.path.join(work_dir, 'titanic.csv'))
+    except OSError:
+        shutil.copyfile(source, os.path.join(work_dir, 'titanic.csv'))
+
+    commit = current_commit()
+    results = []
+    for stage in stages:
+        args = [os.path.join(REPO_DIR, arg) if arg.endswith('.py') else arg
+                for arg in STAGES[stage]]
+        log_path = os.path.join(work_dir, 'logs', f'{stage}.log')
+        returncode, seconds, peak_rss_mb = run_measured(args, work_dir, log_path, timeout)
+        results.append({
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': commit,
+            'stage': stage,
+            'render_profile': render_profile(),
+            'rows': rows,
+            'seconds': round(seconds, 3),
+            'rows_per_s': round(rows / seconds) if returncode == 0 else '',
+            'peak_rss_mb': '' if peak_rss_mb is None else round(peak_rss_mb, 1),
+            'returncode': returncode,
+        })
+        status = 'ok' if returncode == 0 else f'failed (see {log_path})'
+        rss = '' if peak_rss_mb is None else f'{peak_rss_mb:8.0f} MB'
+        print(f"  {stage:<22} {rows:>11,} rows {seconds:9.2f}s {rss}  {status}")
+    return results
+
+
+def append_results(rows, path=RESULTS_PATH):
+    new_file = not os.path.exists(path)
+    with open(path, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def compare(path=RESULTS_PATH, commits=None):
+    """Print the latest timings of two commits side by side (default: the last two)."""
+    import pandas as pd
+    results = pd.read_csv(path, dtype={'commit': str})
+    results = results[results['returncode'] == 0]
+    order = list(dict.fromkeys(results['commit']))
+    base, head = commits or order[-2:]
+    latest = {commit: results[results['commit'] == commit]
+              .groupby(['stage', 'render_profile', 'rows'], sort=False).last()
+              for commit in (base, head)}
+    table = pd.DataFrame({
+        f'{base} s': latest[base]['seconds'],
+        f'{head} s': latest[head]['seconds'],
+        f'{base} MB': latest[base]['peak_rss_mb'],
+        f'{head} MB': latest[head]['peak_rss_mb'],
+    }).dropna(subset=[f'{base} s', f'{head} s'])
+    table['speedup'] = (table[f'{base} s'] / table[f'{head} s']).round(2)
+    print(table.to_string())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Time the EDA stages on synthetic Titanic-schema data of growing size')
+    parser.add_argument('--sizes', nargs='+', type=float, default=DEFAULT_SIZES,
+                        help='row counts to benchmark, e.g. 1e3 1e6 1e8 (default: 1e3 to 1e6)')
+    parser.add_argument('--stages', nargs='+', default=DEFAULT_STAGES, metavar='STAGE',
+                        help=f"stages to run, from {', '.join(STAGES)}")
+    parser.add_argument('--seed', type=int, default=0)
+    add_render_argument(parser)
+    parser.add_argument('--timeout', type=float, default=None,
+                        help='seconds after which a stage is stopped and counted as failed')
+    parser.add_argument('--compare', nargs='*', metavar='COMMIT',
+                        help=f'compare two commits in {os.path.basename(RESULTS_PATH)} '
+                             '(default: the last two) instead of running')
+    args = parser.parse_args()
+
+    if args.compare is not None:
+        if len(args.compare) not in (0, 2):
+            parser.error('--compare takes no commits or exactly two')
+        compare(commits=args.compare or None)
+        sys.exit(0)
+
+    # Passed on to the stage processes through the environment
+    set_render_profile(args.render_profile)
+    unknown = [stage for stage in args.stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    failed = False
+    for size in args.sizes:
+        rows = int(size)
+        print(f"{rows:,} rows:")
+        results = run_size(rows, args.stages, seed=args.seed, timeout=args.timeout)
+        append_results(results)
+        failed |= any(result['returncode'] != 0 for result in results)
+    print(f"\nResults appended to {RESULTS_PATH}")
+    sys.exit(1 if failed else 0)
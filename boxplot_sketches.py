@@ -0,0 +1,173 @@
+from colorsys import rgb_to_hls
+
+import numpy as np
+import pandas as pd
+
+from streaming_stats import KLLSketch
+
+# Most extreme values kept at each end of a box. Whiskers and fliers are
+# exact while an end has at most this many fliers; beyond that only the most
+# extreme ones are drawn.
+MAX_FLIERS = 1000
+
+
+class BoxAccumulator:
+    """Mergeable one-pass boxplot statistics of one group of values.
+
+    Quartiles come from a ``KLLSketch`` and the ``max_fliers`` smallest and
+    largest values are kept as they are. While the sketch is exact (small
+    inputs) the statistics equal ``matplotlib.cbook.boxplot_stats``, which
+    is what seaborn draws.
+    """
+
+    def __init__(self, k=2048, max_fliers=MAX_FLIERS):
+        self.sketch = KLLSketch(k)
+        self.max_fliers = max_fliers
+        self.low = np.empty(0)
+        self.high = np.empty(0)
+
+    @property
+    def n(self):
+        return self.sketch.n
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.sketch.update(values)
+        self._add_extremes(values, values)
+
+    def merge(self, other):
+        self.sketch.merge(other.sketch)
+        self._add_extremes(other.low, other.high)
+        return self
+
+    def _add_extremes(self, low, high):
+        m = self.max_fliers
+        low = np.concatenate([self.low, low])
+        high = np.concatenate([self.high, high])
+        self.low = np.partition(low, m - 1)[:m] if low.size > m else low
+        self.high = np.partition(high, high.size - m)[-m:] if high.size > m else high
+
+    def _whisker(self, extremes, fence, quartile, upper):
+        # Every value not kept in ``extremes`` lies on the inner side of all
+        # of them, so the whisker is exact when any kept value is inside the
+        # fence; otherwise it falls back to the sketch's own sample values
+        inside = extremes[extremes <= fence] if upper else extremes[extremes >= fence]
+        if inside.size == 0:
+            items = np.concatenate(self.sketch.levels)
+            inside = items[items <= fence] if upper else items[items >= fence]
+        if inside.size == 0:
+            return quartile
+        return max(inside.max(), quartile) if upper else min(inside.min(), quartile)
+
+    def stats(self, whis=1.5, label=None):
+        """Box statistics as the dict ``Axes.bxp`` draws, or None when empty."""
+        if self.n == 0:
+            return None
+        q1, med, q3 = self.sketch.quantile([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        whislo = self._whisker(self.low, q1 - whis * iqr, q1, upper=False)
+        whishi = self._whisker(self.high, q3 + whis * iqr, q3, upper=True)
+        fliers = np.concatenate([self.low[self.low < whislo], self.high[self.high > whishi]])
+        return {'label': label, 'med': med, 'q1': q1, 'q3': q3,
+                'whislo': whislo, 'whishi': whishi, 'fliers': fliers}
+
+
+class BoxplotSketches:
+    """Box statistics of numeric features, overall and per group, from one pass.
+
+    ``update`` takes whole frames or successive chunks; accumulators built
+    on separate chunks combine with ``merge``. Every boxplot family (one box
+    per feature, or one per group of each grouping column) is then drawn
+    from the same sketches.
+    """
+
+    def __init__(self, features, groups=(), k=2048, max_fliers=MAX_FLIERS):
+        self.features = list(features)
+        self.groups = list(groups)
+        self.k = k
+        self.max_fliers = max_fliers
+        # (feature, grouping column or None, group label) -> BoxAccumulator
+        self.boxes = {}
+        # Group labels seen per grouping column, and category order if any
+        self.labels = {column: {} for column in self.groups}
+        self.categories = {}
+
+    def _box(self, key):
+        if key not in self.boxes:
+            self.boxes[key] = BoxAccumulator(self.k, self.max_fliers)
+        return self.boxes[key]
+
+    def update(self, chunk):
+        groupings = {}
+        for column in self.groups:
+            series = chunk[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                self.categories[column] = list(series.cat.categories)
+                codes, labels = series.cat.codes.to_numpy(), series.cat.categories
+            else:
+                codes, labels = pd.factorize(series, sort=True)
+            # One stable sort of the codes splits every feature into the groups
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+            groupings[column] = order, bounds, labels
+        for feature in self.features:
+            values = chunk[feature].to_numpy(dtype=float, na_value=np.nan)
+            self._box((feature, None, None)).update(values)
+            for column, (order, bounds, labels) in groupings.items():
+                for i, label in enumerate(labels):
+                    if bounds[i] == bounds[i + 1]:
+                        continue
+                    self.labels[column][label] = None
+                    self._box((feature, column, label)).update(values[order[bounds[i]:bounds[i + 1]]])
+        return self
+
+    def merge(self, other):
+        for key, box in other.boxes.items():
+            self._box(key).merge(box)
+        for column, labels in other.labels.items():
+            self.labels[column].update(labels)
+        self.categories.update(other.categories)
+        return self
+
+    def stats(self, feature, column=None, whis=1.5):
+        """``Axes.bxp`` statistics of ``feature``: one box, or one per group of ``column``."""
+        if column is None:
+            box = self.boxes.get((feature, None, None))
+            return [box.stats(whis)] if box is not None and box.n else []
+        if column in self.categories:
+            labels = [label for label in self.categories[column] if label in self.labels[column]]
+        else:
+            labels = sorted(self.labels[column])
+        boxes = [(label, self.boxes[(feature, column, label)]) for label in labels]
+        return [box.stats(whis, label) for label, box in boxes if box.n]
+
+
+def draw_boxes(ax, stats, grouped=False, width=0.8):
+    """Draw ``stats`` with ``Axes.bxp`` in the style of ``seaborn.boxplot``.
+
+    Boxes sit at 0, 1, ... like seaborn's categorical axis; with ``grouped``
+    they are labelled with their group labels.
+    """
+    import matplotlib.colors as mcolors
+    from figure_pool import load_plotting
+
+    _, sns = load_plotting()
+    # seaborn's defaults: first palette colour at 0.75 saturation, outlines
+    # in a grey at 60% of its lightness
+    color = sns.desaturate(sns.color_palette()[0], 0.75)
+    lightness = rgb_to_hls(*mcolors.to_rgb(color))[1] * 0.6
+    linecolor = (lightness, lightness, lightness)
+    positions = np.arange(len(stats))
+    ax.bxp(stats, positions=positions, widths=width, capwidths=width / 2, patch_artist=True,
+           manage_ticks=False,
+           boxprops={'facecolor': color, 'edgecolor': linecolor},
+           medianprops={'color': linecolor, 'solid_capstyle': 'butt'},
+           whiskerprops={'color': linecolor, 'solid_capstyle': 'butt'},
+           capprops={'color': linecolor},
+           flierprops={'markeredgecolor': linecolor, 'markersize': 5})
+    ax.set_xlim(-0.5, len(stats) - 0.5)
+    ax.set_xticks(positions, [str(box['label']) if grouped else '' for box in stats])
+    return ax
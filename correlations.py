@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+
+def _as_float_matrix(df, features):
+    """Stack ``features`` into one float64 array (NaN for missing values)."""
+    return np.column_stack([df[feature].to_numpy(dtype=float, na_value=np.nan)
+                            for feature in features])
+
+
+def _pearson_with_vector(X, y):
+    """Pairwise-complete Pearson correlation of every column of ``X`` with ``y``.
+
+    Missing values are handled like ``DataFrame.corr``: each column only uses
+    the rows where both it and ``y`` are present. All columns are reduced
+    together with a handful of matrix-vector products.
+    """
+    valid = ~np.isnan(X) & ~np.isnan(y)[:, None]
+    w = valid.astype(float)
+    # Centre first so the sums of squares do not lose precision
+    Xc = np.where(valid, X - np.nanmean(X, axis=0), 0.0)
+    yc = np.where(np.isnan(y), 0.0, y - np.nanmean(y))
+
+    n = w.sum(axis=0)
+    sx = Xc.sum(axis=0)
+    sy = w.T @ yc
+    sxx = (Xc ** 2).sum(axis=0)
+    syy = w.T @ (yc ** 2)
+    sxy = Xc.T @ yc
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx ** 2 / n
+        var_y = syy - sy ** 2 / n
+        r = cov / np.sqrt(var_x * var_y)
+    r[n < 2] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+
+def target_correlations(df, target, features, method='pearson'):
+    """Signed correlation of each feature with ``target``.
+
+    ``method`` is ``'pearson'``, ``'pointbiserial'`` (Pearson against a binary
+    target, which is the same statistic) or ``'spearman'`` (Pearson on
+    average ranks). For Spearman the target is ranked over all rows, which
+    matches pandas exactly when the target is binary or the features have no
+    missing values. Returns a Series indexed by feature.
+    """
+    if method in ('pearson', 'pointbiserial'):
+        X = _as_float_matrix(df, features)
+        y = df[target].to_numpy(dtype=float, na_value=np.nan)
+    elif method == 'spearman':
+        X = _as_float_matrix(df, features)
+        X = pd.DataFrame(X).rank().to_numpy()
+        y = pd.Series(df[target].to_numpy(dtype=float, na_value=np.nan)).rank().to_numpy()
+    else:
+        raise ValueError(f"Unknown correlation method: {method!r}")
+    return pd.Series(_pearson_with_vector(X, y), index=features, name=target)
+
+
+def cramers_v(df, target, features):
+    """Cramér's V association between each categorical feature and ``target``.
+
+    The contingency tables are built with ``np.bincount`` over integer codes;
+    rows with a missing feature or target value are skipped. Values are in
+    [0, 1] and carry no sign.
+    """
+    target_codes, target_labels = pd.factorize(df[target])
+    result = {}
+    for feature in features:
+        codes, labels = pd.factorize(df[feature])
+        valid = (codes >= 0) & (target_codes >= 0)
+        shape = (len(labels), len(target_labels))
+        table = np.bincount(codes[valid] * shape[1] + target_codes[valid],
+                            minlength=shape[0] * shape[1]).reshape(shape).astype(float)
+        # Drop empty categories so they do not count towards the degrees of freedom
+        table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+        n = table.sum()
+        k = min(table.shape) - 1
+        if k < 1:
+            result[feature] = np.nan
+            continue
+        expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+        chi2 = ((table - expected) ** 2 / expected).sum()
+        result[feature] = np.sqrt(chi2 / (n * k))
+    return pd.Series(result, name=target)
+
+
+class CorrelationAccumulator:
+    """Pearson correlation matrix accumulated over chunks in one pass.
+
+    Per column pair it keeps the number of rows where both are present and,
+    over those rows, the sums, sums of squares and cross-products, all as
+    k x k matrix products of the chunk. ``mode='pairwise'`` uses every row
+    where a pair is present, like ``DataFrame.corr``; ``mode='listwise'``
+    only uses rows where every column is present, like
+    ``df.dropna().corr()``, without making the copy. Values are shifted by
+    the first chunk's column means before summing, so the sums of squares
+    keep their precision. Accumulators over the same columns can be merged.
+    """
+
+    def __init__(self, features, mode='pairwise'):
+        if mode not in ('pairwise', 'listwise'):
+            raise ValueError(f"Unknown correlation mode: {mode!r}")
+        self.features = list(features)
+        self.mode = mode
+        k = len(self.features)
+        self.shift = None
+        # n[i, j]: rows where i and j are present; sx[i, j]: sum of column i
+        # over those rows; sxx[i, j]: its sum of squares; sxy: cross-products
+        self.n = np.zeros((k, k))
+        self.sx = np.zeros((k, k))
+        self.sxx = np.zeros((k, k))
+        self.sxy = np.zeros((k, k))
+
+    @property
+    def rows(self):
+        """Rows used by the listwise matrix, or per column by the pairwise one."""
+        return int(self.n.max()) if self.mode == 'listwise' else np.diag(self.n).astype(int)
+
+    def update(self, chunk):
+        X = _as_float_matrix(chunk, self.features)
+        present = ~np.isnan(X)
+        if self.mode == 'listwise':
+            complete = present.all(axis=1)
+            X, present = X[complete], present[complete]
+        if self.shift is None:
+            if not present.any():
+                return self
+            with np.errstate(invalid='ignore'):
+                self.shift = np.nan_to_num(np.nanmean(X, axis=0))
+        w = present.astype(float)
+        X = np.where(present, X - self.shift, 0.0)
+        self.n += w.T @ w
+        self.sx += X.T @ w
+        self.sxx += (X ** 2).T @ w
+        self.sxy += X.T @ X
+        return self
+
+    def merge(self, other):
+        if other.features != self.features or other.mode != self.mode:
+            raise ValueError('Can only merge accumulators over the same columns and mode')
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift
+        # Re-centre the other's sums on this accumulator's shift
+        d = (self.shift - other.shift)[:, None]
+        sx = other.sx - other.n * d
+        self.sxx += other.sxx - 2 * d * other.sx + other.n * d ** 2
+        self.sxy += other.sxy - d * other.sx.T - d.T * other.sx + other.n * d * d.T
+        self.sx += sx
+        self.n += other.n
+        return self
+
+    def to_frame(self):
+        """The correlation matrix as a DataFrame; pairs with under 2 rows are NaN."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = self.sxy - self.sx * self.sx.T / self.n
+            var = self.sxx - self.sx ** 2 / self.n
+            r = cov / np.sqrt(var * var.T)
+        r[self.n < 2] = np.nan
+        # A column present with itself in 2+ rows correlates perfectly unless constant
+        diagonal = np.diag(r).copy()
+        np.fill_diagonal(r, np.where(np.isnan(diagonal), np.nan, 1.0))
+        return pd.DataFrame(np.clip(r, -1.0, 1.0), index=self.features, columns=self.features)
@@ -0,0 +1,406 @@
+import argparse
+import hashlib
+import json
+import operator
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+from profiling import profiled
+
+# Default input file shared by every EDA script
+DATA_PATH = 'titanic.csv'
+
+# Directory holding the typed on-disk copies of parsed CSV files
+CACHE_DIR = '.cache'
+
+# Explicit schema for the Titanic passenger manifest. Low-cardinality string
+# columns become categoricals, counts become small ints and the continuous
+# columns are stored as float32. Categories are listed in the order the
+# raw string columns sort in, so groupby reports keep their row order.
+SCHEMA = {
+    'PassengerId': 'int32',
+    'Survived': 'int8',
+    'Pclass': pd.CategoricalDtype([1, 2, 3], ordered=True),
+    'Name': 'object',
+    'Sex': pd.CategoricalDtype(['female', 'male']),
+    'Age': 'float32',
+    'SibSp': 'int8',
+    'Parch': 'int8',
+    'Ticket': 'category',
+    'Fare': 'float32',
+    'Cabin': 'category',
+    'Embarked': pd.CategoricalDtype(['C', 'Q', 'S']),
+}
+
+# Columnar input formats, by file extension, as named by ``pyarrow.dataset``.
+# Feather v2 is the Arrow IPC file format.
+COLUMNAR_FORMATS = {
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'ipc',
+    '.arrow': 'ipc',
+    '.ipc': 'ipc',
+}
+
+# Row filter operators, in the (column, op, value) form used by pyarrow and
+# ``pd.read_parquet``
+FILTER_OPS = {
+    '=': operator.eq,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda series, values: series.isin(values),
+    'not in': lambda series, values: ~series.isin(values),
+}
+
+# Frames already loaded by this process, keyed by absolute CSV path
+_loaded = {}
+
+
+def forget_loaded():
+    """Drop the frames ``load_titanic`` keeps in memory for this process.
+
+    For long-lived processes that analyse one dataset after another.
+    """
+    _loaded.clear()
+
+
+def _file_digest(path, block_size=1 << 20):
+    """Return the SHA-1 hex digest of a file's contents."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_format():
+    """Pick the on-disk cache format: Parquet when pyarrow is available."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return 'pickle'
+    return 'parquet'
+
+
+def _cache_stem(path):
+    """Prefix of the cache files of ``path``: its base name and a hash of its absolute path.
+
+    Inputs with the same name in different directories get separate caches.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f'{stem}-{hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8]}'
+
+
+def _remove_stale_copies(cache_dir, path, extension):
+    """Delete the cached copies of older versions of ``path`` with ``extension``."""
+    pattern = re.compile(rf'{re.escape(_cache_stem(path))}-[0-9a-f]{{16}}\.{extension}')
+    for name in os.listdir(cache_dir):
+        if pattern.fullmatch(name):
+            os.remove(os.path.join(cache_dir, name))
+
+
+def _source_key(path, cache_dir):
+    """Return a key identifying the current contents of ``path``.
+
+    The content hash is only recomputed when the file's mtime or size differ
+    from what was recorded the last time it was parsed, so an unchanged
+    multi-GB export is not re-read just to prove it is unchanged.
+    """
+    stat = os.stat(path)
+    index_path = os.path.join(cache_dir, f'{_cache_stem(path)}.json')
+
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+
+    if index.get('mtime_ns') == stat.st_mtime_ns and index.get('size') == stat.st_size:
+        return index['sha1']
+
+    sha1 = _file_digest(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f'{index_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha1': sha1}, f)
+    os.replace(tmp_path, index_path)
+    return sha1
+
+
+def input_format(path):
+    """``'csv'`` or the ``pyarrow.dataset`` format of a columnar input file."""
+    return COLUMNAR_FORMATS.get(os.path.splitext(path)[1].lower(), 'csv')
+
+
+def apply_schema(df):
+    """Cast the columns of ``df`` named in ``SCHEMA`` to their schema dtypes.
+
+    Columnar files carry their own types (e.g. ``int64`` counts or plain
+    string classes); this brings them in line with what the CSV loader
+    produces, so every script sees the same dtypes whatever the input.
+    """
+    casts = {col: SCHEMA[col] for col in df.columns
+             if col in SCHEMA and df[col].dtype != SCHEMA[col]}
+    return df.astype(casts) if casts else df
+
+
+def parse_filter(text):
+    """Turn ``'Pclass=1'``, ``'Embarked=C,Q'`` or ``'Fare>=100'`` into a filter tuple.
+
+    Values are converted to the column's type from ``SCHEMA``; several
+    comma-separated values after ``=`` or ``!=`` mean ``in``/``not in``.
+    """
+    match = re.fullmatch(r'\s*(\w+)\s*(==|=|!=|<=|>=|<|>)\s*(.+?)\s*', text)
+    if match is None:
+        raise ValueError(f"Cannot parse filter {text!r}; expected e.g. 'Pclass=1' or 'Fare>100'")
+    column, op, value = match.groups()
+    dtype = SCHEMA.get(column)
+    if isinstance(dtype, pd.CategoricalDtype):
+        dtype = dtype.categories.dtype
+    convert = str
+    if dtype is not None and pd.api.types.is_integer_dtype(dtype):
+        convert = int
+    elif dtype is not None and pd.api.types.is_float_dtype(dtype):
+        convert = float
+    values = [convert(v.strip()) for v in value.split(',')]
+    if len(values) > 1:
+        if op not in ('=', '==', '!='):
+            raise ValueError(f'Filter {text!r}: a list of values needs = or !=')
+        return column, 'not in' if op == '!=' else 'in', values
+    return column, op, values[0]
+
+
+def filter_mask(df, filters):
+    """Boolean mask of the rows of ``df`` matching every filter in ``filters``."""
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, value in filters:
+        if op not in FILTER_OPS:
+            raise ValueError(f'Unknown filter operator {op!r}; expected one of {list(FILTER_OPS)}')
+        mask &= np.asarray(FILTER_OPS[op](df[column], value), dtype=bool)
+    return mask
+
+
+def select(df, columns=None, filters=None):
+    """Rows of ``df`` matching ``filters``, restricted to ``columns``."""
+    if filters:
+        df = df[filter_mask(df, filters)]
+    if columns is not None:
+        df = df[list(columns)]
+    return df
+
+
+def require_rows(n_rows, filters):
+    """Exit with a message when ``filters`` leave no rows to analyse."""
+    if not n_rows:
+        where = ', '.join(f'{column} {op} {value!r}' for column, op, value in filters)
+        sys.exit(f"No rows match --where {where}" if filters else "The input has no rows")
+
+
+def _filter_argument(text):
+    try:
+        return parse_filter(text)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc))
+
+
+def add_data_arguments(parser):
+    """Add the ``--data`` and ``--where`` options to a script's argument parser."""
+    parser.add_argument('--data', default=DATA_PATH,
+                        help='input file: CSV, Parquet (.parquet) or Arrow/Feather '
+                             f'(.feather, .arrow) (default: {DATA_PATH})')
+    parser.add_argument('--where', action='append', type=_filter_argument, default=[],
+                        metavar='FILTER',
+                        help="only analyse matching rows, e.g. 'Pclass=1', 'Embarked=C,Q' "
+                             "or 'Fare>100'; repeat to combine")
+
+
+def _read_columnar(path, columns=None, filters=None):
+    """Read a Parquet or Arrow file, pushing column and row selection into pyarrow.
+
+    For Parquet only the requested column chunks are decoded and row groups
+    whose statistics rule out the filters are skipped entirely. Arrow files
+    are memory-mapped (see ``materialize_arrow``).
+    """
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    if input_format(path) == 'ipc':
+        return _map_arrow(path, columns, filters)
+    dataset = ds.dataset(path, format=input_format(path))
+    expression = pq.filters_to_expression(filters) if filters else None
+    table = dataset.to_table(columns=list(columns) if columns is not None else None,
+                             filter=expression)
+    return apply_schema(table.to_pandas())
+
+
+def _map_arrow(path, columns=None, filters=None):
+    """Memory-map an Arrow IPC file and convert the selection to pandas.
+
+    Numeric columns of an uncompressed file written in one record batch
+    without validity bitmaps become numpy views of the mapped pages, so
+    every process mapping the file shares a single copy in the page cache.
+    Categorical codes and string columns are still copied, as are the rows
+    kept by ``filters``.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # The table's buffers keep the mapping open for as long as they are used
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    # Filter before selecting, since the filters may use columns not selected
+    if filters:
+        table = table.filter(pq.filters_to_expression(filters))
+    if columns is not None:
+        table = table.select(list(columns))
+    # split_blocks keeps pandas from consolidating columns into new 2D blocks
+    return apply_schema(table.to_pandas(split_blocks=True))
+
+
+def _arrow_table(df):
+    """Arrow table of ``df`` whose float columns keep NaN instead of null.
+
+    Without a validity bitmap a float column converts back to pandas
+    without a copy.
+    """
+    import pyarrow as pa
+
+    arrays = [pa.array(df[col].to_numpy(), from_pandas=False) if df[col].dtype.kind == 'f'
+              else pa.Array.from_pandas(df[col]) for col in df.columns]
+    return pa.Table.from_arrays(arrays, names=list(df.columns))
+
+
+def materialize_arrow(path=DATA_PATH, cache_dir=CACHE_DIR):
+    """Write the typed dataset once to an Arrow IPC file and return its path.
+
+    The file is uncompressed and holds a single record batch, so stages and
+    render workers that load it memory-map it zero-copy: N processes cost
+    one dataset's worth of RAM instead of N. Like the CSV cache it is keyed
+    by the contents of ``path`` and only rewritten when they change.
+    """
+    import pyarrow as pa
+
+    key = _source_key(path, cache_dir)
+    arrow_path = os.path.join(cache_dir, f'{_cache_stem(path)}-{key[:16]}.arrow')
+    if os.path.exists(arrow_path):
+        return arrow_path
+
+    table = _arrow_table(load_titanic(path, cache_dir=cache_dir))
+    _remove_stale_copies(cache_dir, path, 'arrow')
+    tmp_path = f'{arrow_path}.{os.getpid()}.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+    os.replace(tmp_path, arrow_path)
+    return arrow_path
+
+
+def read_typed_csv(path=DATA_PATH, columns=None, **kwargs):
+    """Parse a Titanic-schema CSV with the explicit dtypes from ``SCHEMA``.
+
+    With ``columns``, only those columns are parsed.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    dtype = {col: SCHEMA[col] for col in header if col in SCHEMA}
+    if columns is not None:
+        kwargs['usecols'] = list(columns)
+    return pd.read_csv(path, dtype=dtype, **kwargs)
+
+
+def iter_batches(path=DATA_PATH, columns=None, filters=None, batch_size=100_000, offset=0):
+    """Yield typed frames of at most ``batch_size`` rows of the selected data.
+
+    CSV files are parsed in chunks; columnar files are streamed record batch
+    by record batch, with the selection pushed into the reader. For a CSV,
+    ``offset`` is the byte position of the first row to read, which must be
+    the start of a line (e.g. the file's size before rows were appended).
+    """
+    if input_format(path) == 'csv':
+        # Filters may use columns that are not returned; read them too and
+        # drop them once the rows are selected
+        read_columns = columns
+        if columns is not None and filters:
+            read_columns = list(columns) + [column for column, _, _ in filters
+                                            if column not in columns]
+        if offset:
+            with open(path, 'rb') as f:
+                header = pd.read_csv(f, nrows=0).columns
+                f.seek(offset)
+                dtype = {col: SCHEMA[col] for col in header if col in SCHEMA}
+                for chunk in pd.read_csv(f, names=list(header), header=None, dtype=dtype,
+                                         usecols=read_columns, chunksize=batch_size):
+                    yield select(chunk, columns, filters)
+            return
+        for chunk in read_typed_csv(path, columns=read_columns, chunksize=batch_size):
+            yield select(chunk, columns, filters)
+        return
+
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    dataset = ds.dataset(path, format=input_format(path))
+    expression = pq.filters_to_expression(filters) if filters else None
+    for batch in dataset.to_batches(columns=list(columns) if columns is not None else None,
+                                    filter=expression, batch_size=batch_size):
+        yield apply_schema(batch.to_pandas())
+
+
+@profiled('load')
+def load_titanic(path=DATA_PATH, columns=None, filters=None, cache=True, cache_dir=CACHE_DIR):
+    """Load the Titanic dataset with the shared typed schema.
+
+    ``columns`` limits the frame to the columns a script declares it needs
+    and ``filters`` keeps only matching rows; filters are ``(column, op,
+    value)`` tuples (see ``FILTER_OPS`` and ``parse_filter``) that must all
+    hold.
+
+    Parquet and Arrow/Feather inputs are read directly, with the column and
+    row selection pushed into pyarrow. A CSV is parsed once; the typed frame
+    is written to ``cache_dir`` and reused by later runs until the CSV's
+    contents change, and a Parquet cache is itself read with the selection
+    pushed down. Within a single process the full frame is also kept in
+    memory, so scripts run from the same interpreter share one parse.
+    Callers get a shallow copy and may add columns freely.
+    """
+    if input_format(path) != 'csv':
+        return _read_columnar(path, columns, filters)
+
+    abs_path = os.path.abspath(path)
+    if not cache:
+        return select(read_typed_csv(path), columns, filters)
+
+    key = _source_key(path, cache_dir)
+    if abs_path in _loaded and _loaded[abs_path][0] == key:
+        return select(_loaded[abs_path][1], columns, filters).copy(deep=False)
+
+    fmt = _cache_format()
+    cache_path = os.path.join(cache_dir, f'{_cache_stem(path)}-{key[:16]}.{fmt}')
+
+    if os.path.exists(cache_path):
+        if fmt == 'parquet':
+            if columns is not None or filters:
+                # Only the selection is read; the full frame is not memoised
+                return _read_columnar(cache_path, columns, filters)
+            df = apply_schema(pd.read_parquet(cache_path))
+        else:
+            df = pd.read_pickle(cache_path)
+    else:
+        df = read_typed_csv(path)
+        # Drop copies of older versions of this file before writing the new one
+        _remove_stale_copies(cache_dir, path, fmt)
+        # Write under a temporary name so concurrent readers never see a partial file
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        if fmt == 'parquet':
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_pickle(tmp_path)
+        os.replace(tmp_path, cache_path)
+
+    _loaded[abs_path] = (key, df)
+    return select(df, columns, filters).copy(deep=False)
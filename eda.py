@@ -1,47 +1,97 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import argparse
 
-# Set style for matplotlib plots
-plt.style.use('seaborn-v0_8-whitegrid')
-sns.set_palette('viridis')
+from backends import add_backend_argument, describe, resolve_backend
+from data_loader import add_data_arguments, iter_batches, load_titanic
+from incremental import load_state, new_rows, save_state, state_path
+from profiling import profile_stage, write_report
+from streaming_stats import StreamingSummary
 
-# Load the dataset
-df = pd.read_csv('titanic.csv')
+# Mergeable statistics behind summary_statistics.csv, for --incremental runs
+STATE_PATH = state_path('summary_statistics.csv')
+
+parser = argparse.ArgumentParser(description='Summary statistics for the Titanic dataset')
+parser.add_argument('--stream', action='store_true',
+                    help='read the data in chunks instead of loading it into memory')
+parser.add_argument('--chunksize', type=int, default=1_000_000,
+                    help='rows per chunk in streaming and incremental mode')
+parser.add_argument('--incremental', action='store_true',
+                    help=f'update the statistics saved in {STATE_PATH} with the rows '
+                         'appended to the CSV since the last run')
+parser.add_argument('--new-rows', action='store_true',
+                    help='with --incremental, --data holds only new rows to add to the '
+                         'saved statistics')
+parser.add_argument('--rebuild', action='store_true',
+                    help='with --incremental, discard the saved statistics and start over')
+add_backend_argument(parser)
+add_data_arguments(parser)
+args = parser.parse_args()
 
 # Create a directory for saving plots
 import os
 if not os.path.exists('plots'):
     os.makedirs('plots')
 
+with profile_stage('summary_statistics'):
+    if args.incremental:
+        # Merge only the new rows into the saved accumulators; the summary is
+        # then computed from the merged state
+        state = None if args.rebuild else load_state(STATE_PATH)
+        batches, position, resume = new_rows(args.data, state, filters=args.where,
+                                             batch_size=args.chunksize, delta=args.new_rows)
+        summary = StreamingSummary.from_dict(state['summary']) if resume else StreamingSummary()
+        added = 0
+        for chunk in batches:
+            added += len(chunk)
+            summary.update(chunk)
+        save_state(STATE_PATH, {'source': position, 'filters': args.where,
+                                'summary': summary.to_dict()})
+        print(f"Added {added} rows to the saved statistics ({summary.n_rows} rows in total)")
+        n_rows = summary.n_rows
+        summary_stats = summary.to_frame()
+        # The first rows of the dataset, for the overview below
+        head = next((chunk.head() for chunk in iter_batches(args.data, filters=args.where,
+                                                             batch_size=1000) if len(chunk)),
+                    None)
+    elif args.stream:
+        # Accumulate all statistics in a single pass over the chunks; quantiles
+        # come from a mergeable sketch and are exact for small inputs
+        summary = StreamingSummary()
+        head = None
+        for chunk in iter_batches(args.data, filters=args.where, batch_size=args.chunksize):
+            if head is None:
+                head = chunk.head()
+            summary.update(chunk)
+        n_rows = summary.n_rows
+        summary_stats = summary.to_frame()
+    else:
+        # Load the dataset
+        df = load_titanic(args.data, filters=args.where)
+        n_rows = len(df)
+        head = df.head()
+        summary_stats = describe(df, resolve_backend(args.backend))
+
 # Display basic information about the dataset
 print("Dataset Information:")
-print(f"Shape: {df.shape}")
+print(f"Shape: {(n_rows, len(head.columns))}")
 print("\nData Types:")
-print(df.dtypes)
+print(head.dtypes)
 print("\nFirst 5 rows:")
-print(df.head())
+print(head)
 
 # Check for missing values
 print("\nMissing Values:")
-missing_values = df.isnull().sum()
-missing_percentage = (df.isnull().sum() / len(df)) * 100
-missing_data = pd.DataFrame({'Missing Values': missing_values, 
-                            'Percentage': missing_percentage})
+missing_data = pd.DataFrame({'Missing Values': summary_stats['missing'], 
+                            'Percentage': summary_stats['missing_percentage']})
 print(missing_data[missing_data['Missing Values'] > 0])
 
 # Generate summary statistics
 print("\nSummary Statistics:")
-summary_stats = df.describe(include='all').T
-summary_stats['missing'] = df.isnull().sum()
-summary_stats['missing_percentage'] = (df.isnull().sum() / len(df)) * 100
 print(summary_stats)
 
 # Save summary statistics to CSV
 summary_stats.to_csv('summary_statistics.csv')
 
+write_report(__file__)
 print("\nEDA completed and summary statistics saved to 'summary_statistics.csv'")
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+# Numeric code of every label of the categorical columns used in
+# correlation analysis. Labels missing from a mapping encode as missing.
+ENCODINGS = {
+    'Pclass': {1: 1, 2: 2, 3: 3},
+    'Sex': {'male': 0, 'female': 1},
+    'Embarked': {'C': 0, 'Q': 1, 'S': 2},
+}
+
+# Indicator columns derived from another column: name -> (source, test)
+DERIVED = {
+    'HasCabin': ('Cabin', 'notna'),
+}
+
+
+def code_labels(column):
+    """Map the codes of an encoded column back to their labels, for plot labels."""
+    return {code: label for label, code in ENCODINGS[column].items()}
+
+
+def encode_column(series, mapping):
+    """Nullable ``Int8`` codes of ``series`` under ``mapping``.
+
+    Categorical input is translated through its category codes with one
+    lookup, so the labels themselves are never compared.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(pd.CategoricalDtype(list(mapping)))
+    categories = series.cat.categories
+    lookup = np.array([mapping.get(label, -1) for label in categories] + [-1], dtype=np.int8)
+    # Category code -1 (missing) picks the trailing -1 entry of the lookup
+    codes = lookup[series.cat.codes.to_numpy()]
+    return pd.Series(pd.arrays.IntegerArray(codes, codes == -1), index=series.index,
+                     name=series.name)
+
+
+def encode(df, columns):
+    """Compact numeric view of ``columns`` of ``df``.
+
+    Columns in ``ENCODINGS`` become nullable ``Int8`` codes, columns in
+    ``DERIVED`` become ``int8`` indicators, and numeric columns are passed
+    through as they are. Other columns of ``df`` are not copied. The
+    code-to-label mappings are kept in ``attrs['labels']``.
+    """
+    data = {}
+    for column in columns:
+        if column in ENCODINGS:
+            data[column] = encode_column(df[column], ENCODINGS[column])
+        elif column in DERIVED:
+            source, test = DERIVED[column]
+            data[column] = getattr(df[source], test)().astype(np.int8)
+        else:
+            data[column] = df[column]
+    encoded = pd.DataFrame(data, index=df.index)
+    encoded.attrs['labels'] = {column: code_labels(column) for column in columns
+                               if column in ENCODINGS}
+    return encoded
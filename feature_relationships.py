@@ -1,104 +1,179 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import argparse
+import hashlib
 import os
 
-# Set style for matplotlib plots
-plt.style.use('seaborn-v0_8-whitegrid')
-sns.set_palette('viridis')
-plt.rcParams['figure.figsize'] = (12, 8)
+from correlations import CorrelationAccumulator
+from data_loader import add_data_arguments, iter_batches, load_titanic, require_rows
+from encoding import encode
+from figure_pool import load_plotting
+from html_export import report_sizes, scatter_figure, write_html
+from output_cache import OutputCache
+from pairplots import SCATTER_SAMPLE_SIZE, draw_pairplot, shared_bin_edges
+from profiling import profile_stage, write_report
+from render_settings import add_render_argument, savefig, set_render_profile
+
+parser = argparse.ArgumentParser(description='Correlation analysis and feature relationships')
+parser.add_argument('--force', action='store_true',
+                    help='re-render figures even if their inputs are unchanged')
+parser.add_argument('--pairplot-mode', choices=['auto', 'seaborn', 'scalable'], default='auto',
+                    help="'scalable' samples scatter panels and bins dense ones; "
+                         "'auto' uses it once the data outgrow a plain seaborn pairplot")
+parser.add_argument('--correlation-mode', choices=['listwise', 'pairwise'], default='listwise',
+                    help="'listwise' only uses rows with every feature present; 'pairwise' "
+                         "uses every row where both features of a pair are present")
+parser.add_argument('--chunksize', type=int, default=1_000_000,
+                    help='rows encoded and accumulated at a time for the correlation matrix')
+parser.add_argument('--matrix-only', action='store_true',
+                    help='only draw the correlation heatmaps, reading the data from disk in '
+                         '--chunksize chunks instead of loading it; the pairplots and scatter '
+                         'plots need every row in memory and are skipped')
+add_data_arguments(parser)
+add_render_argument(parser)
+args = parser.parse_args()
+set_render_profile(args.render_profile)
 
 # Create directory for saving plots
 if not os.path.exists('plots/correlations'):
     os.makedirs('plots/correlations')
 
-# Load the dataset
-df = pd.read_csv('titanic.csv')
-
-# Convert categorical variables to numeric for correlation analysis
-df_encoded = df.copy()
-df_encoded['Sex'] = df_encoded['Sex'].map({'male': 0, 'female': 1})
-df_encoded['Embarked'] = df_encoded['Embarked'].map({'C': 0, 'Q': 1, 'S': 2})
-
-# Select relevant features for correlation analysis
+# Select relevant features for correlation analysis; they are the only
+# columns read from the dataset
 features_for_correlation = ['Survived', 'Pclass', 'Sex', 'Age', 'SibSp', 'Parch', 'Fare', 'Embarked']
-df_corr = df_encoded[features_for_correlation].dropna()
 
-# Create correlation matrix
-print("Generating correlation matrix...")
-plt.figure(figsize=(12, 10))
-corr_matrix = df_corr.corr()
-mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
-sns.heatmap(corr_matrix, mask=mask, annot=True, fmt='.2f', cmap='coolwarm', 
-            linewidths=0.5, cbar_kws={'shrink': .8})
-plt.title('Correlation Matrix of Titanic Dataset Features', fontsize=16)
-plt.tight_layout()
-plt.savefig('plots/correlations/correlation_matrix.png', dpi=300, bbox_inches='tight')
-plt.close()
+# Load the dataset, unless only the correlation matrix is needed
+df = None
+if not args.matrix_only:
+    df = load_titanic(args.data, columns=features_for_correlation, filters=args.where)
 
-# Create an interactive correlation matrix with plotly
-fig = px.imshow(corr_matrix, 
-                text_auto=True, 
-                color_continuous_scale='RdBu_r',
-                title='Interactive Correlation Matrix')
-fig.write_html('plots/correlations/correlation_matrix_interactive.html')
+# Create correlation matrix in one pass over chunks of the data, with the
+# categorical features as numeric codes; both heatmaps use it
+with profile_stage('correlation_matrix'):
+    correlations = CorrelationAccumulator(features_for_correlation, args.correlation_mode)
+    if df is None:
+        chunks = iter_batches(args.data, columns=features_for_correlation, filters=args.where,
+                              batch_size=args.chunksize)
+    else:
+        chunks = (df.iloc[start:start + args.chunksize]
+                  for start in range(0, len(df), args.chunksize))
+    n_rows = 0
+    for chunk in chunks:
+        n_rows += len(chunk)
+        correlations.update(encode(chunk, features_for_correlation))
+    require_rows(n_rows, args.where)
+    corr_matrix = correlations.to_frame()
+if args.correlation_mode == 'listwise':
+    print(f"Correlations use the {correlations.rows:,} of {n_rows:,} rows with every feature present")
 
-# Create pairplot for numeric features
-print("Generating pairplot...")
-plt.figure(figsize=(16, 14))
-numeric_features = ['Age', 'Fare', 'SibSp', 'Parch']
-pairplot = sns.pairplot(df, vars=numeric_features, hue='Survived', palette='viridis', 
-                        diag_kind='kde', plot_kws={'alpha': 0.6})
-plt.suptitle('Pairplot of Numeric Features by Survival Status', y=1.02, fontsize=16)
-pairplot.savefig('plots/correlations/pairplot.png', dpi=300, bbox_inches='tight')
-plt.close()
+# Figures are only redrawn when their data, parameters or this script changed
+if df is None:
+    # The heatmaps are drawn from the matrix alone, so it stands in for the
+    # column hashes
+    cache = OutputCache(None, __file__, force=args.force,
+                        data_key=hashlib.sha1(corr_matrix.to_json().encode()).hexdigest())
+else:
+    cache = OutputCache(df, __file__, force=args.force)
+correlation_params = {'correlation_mode': args.correlation_mode}
+if cache.stale(['plots/correlations/correlation_matrix.png',
+                'plots/correlations/correlation_matrix_interactive.html'], features_for_correlation,
+               correlation_params):
+    with profile_stage('figure:correlation_matrix'):
+        print("Generating correlation matrix...")
+        plt, sns = load_plotting()
+        plt.figure(figsize=(12, 10))
+        mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
+        sns.heatmap(corr_matrix, mask=mask, annot=True, fmt='.2f', cmap='coolwarm', 
+                    linewidths=0.5, cbar_kws={'shrink': .8})
+        plt.title('Correlation Matrix of Titanic Dataset Features', fontsize=16)
+        plt.tight_layout()
+        savefig('plots/correlations/correlation_matrix.png')
+        plt.close()
 
-# Create pairplot with passenger class
-print("Generating pairplot by passenger class...")
-pairplot_class = sns.pairplot(df, vars=numeric_features, hue='Pclass', palette='viridis', 
-                              diag_kind='kde', plot_kws={'alpha': 0.6})
-plt.suptitle('Pairplot of Numeric Features by Passenger Class', y=1.02, fontsize=16)
-pairplot_class.savefig('plots/correlations/pairplot_by_class.png', dpi=300, bbox_inches='tight')
-plt.close()
+        # Create an interactive correlation matrix with plotly
+        import plotly.express as px
+        fig = px.imshow(corr_matrix, 
+                        text_auto=True, 
+                        color_continuous_scale='RdBu_r',
+                        title='Interactive Correlation Matrix')
+        write_html(fig, 'plots/correlations/correlation_matrix_interactive.html')
 
-# Create pairplot with gender
-print("Generating pairplot by gender...")
-pairplot_sex = sns.pairplot(df, vars=numeric_features, hue='Sex', palette='viridis', 
-                            diag_kind='kde', plot_kws={'alpha': 0.6})
-plt.suptitle('Pairplot of Numeric Features by Gender', y=1.02, fontsize=16)
-pairplot_sex.savefig('plots/correlations/pairplot_by_gender.png', dpi=300, bbox_inches='tight')
-plt.close()
+# Pairplots and scatter plots draw every row, so they need the loaded frame
+if df is not None:
+    # Create pairplots of the numeric features by survival, passenger class and gender
+    numeric_features = ['Age', 'Fare', 'SibSp', 'Parch']
+    pairplot_mode = args.pairplot_mode
+    if pairplot_mode == 'auto':
+        pairplot_mode = 'scalable' if len(df) > SCATTER_SAMPLE_SIZE else 'seaborn'
+    pairplots = [
+        ('Survived', 'Survival Status', 'plots/correlations/pairplot.png', "Generating pairplot..."),
+        ('Pclass', 'Passenger Class', 'plots/correlations/pairplot_by_class.png',
+         "Generating pairplot by passenger class..."),
+        ('Sex', 'Gender', 'plots/correlations/pairplot_by_gender.png', "Generating pairplot by gender..."),
+    ]
+    # Bin edges for the scalable diagonals are shared by all three pairplots
+    pairplot_edges = None
+    for hue, label, path, message in pairplots:
+        if not cache.stale(path, numeric_features + [hue], {'mode': pairplot_mode}):
+            continue
+        print(message)
+        title = f'Pairplot of Numeric Features by {label}'
+        with profile_stage(f'figure:pairplot:{hue}'):
+            if pairplot_mode == 'scalable':
+                if pairplot_edges is None:
+                    pairplot_edges = shared_bin_edges(df, numeric_features)
+                draw_pairplot(df, numeric_features, hue, title, path, edges=pairplot_edges)
+            else:
+                plt, sns = load_plotting()
+                pairplot = sns.pairplot(df, vars=numeric_features, hue=hue, palette='viridis', 
+                                        diag_kind='kde', plot_kws={'alpha': 0.6})
+                plt.suptitle(title, y=1.02, fontsize=16)
+                savefig(path, fig=pairplot.figure, bbox_inches='tight')
+                plt.close()
 
-# Create scatter plots for key relationships
-print("Generating scatter plots for key relationships...")
-# Age vs Fare with survival coloring
-plt.figure(figsize=(12, 8))
-sns.scatterplot(x='Age', y='Fare', hue='Survived', data=df, palette='viridis', alpha=0.7)
-plt.title('Age vs Fare by Survival Status', fontsize=16)
-plt.xlabel('Age', fontsize=12)
-plt.ylabel('Fare', fontsize=12)
-plt.grid(True, alpha=0.3)
-plt.savefig('plots/correlations/age_vs_fare_by_survival.png', dpi=300, bbox_inches='tight')
-plt.close()
+    # Create scatter plots for key relationships
+    # Age vs Fare with survival coloring
+    if cache.stale('plots/correlations/age_vs_fare_by_survival.png', ['Age', 'Fare', 'Survived']):
+        with profile_stage('figure:age_vs_fare_by_survival'):
+            print("Generating scatter plots for key relationships...")
+            plt, sns = load_plotting()
+            plt.figure(figsize=(12, 8))
+            sns.scatterplot(x='Age', y='Fare', hue='Survived', data=df, palette='viridis', alpha=0.7)
+            plt.title('Age vs Fare by Survival Status', fontsize=16)
+            plt.xlabel('Age', fontsize=12)
+            plt.ylabel('Fare', fontsize=12)
+            plt.grid(True, alpha=0.3)
+            savefig('plots/correlations/age_vs_fare_by_survival.png')
+            plt.close()
 
-# Interactive scatter plot with plotly
-fig = px.scatter(df, x='Age', y='Fare', color='Survived', 
-                 size='Fare', hover_data=['Pclass', 'Sex', 'SibSp', 'Parch'],
-                 title='Interactive Scatter Plot: Age vs Fare by Survival Status')
-fig.write_html('plots/correlations/age_vs_fare_interactive.html')
+    # Interactive scatter plot with plotly
+    if cache.stale('plots/correlations/age_vs_fare_interactive.html',
+                   ['Age', 'Fare', 'Survived', 'Pclass', 'Sex', 'SibSp', 'Parch']):
+        with profile_stage('figure:age_vs_fare_interactive'):
+            fig = scatter_figure(df, x='Age', y='Fare', color='Survived', 
+                                 size='Fare', hover_data=['Pclass', 'Sex', 'SibSp', 'Parch'],
+                                 title='Interactive Scatter Plot: Age vs Fare by Survival Status')
+            write_html(fig, 'plots/correlations/age_vs_fare_interactive.html')
 
 # Create a correlation heatmap focused on survival
-plt.figure(figsize=(10, 8))
-survival_corr = corr_matrix['Survived'].sort_values(ascending=False)
-sns.heatmap(pd.DataFrame(survival_corr), annot=True, fmt='.2f', cmap='coolwarm', 
-            linewidths=0.5, cbar_kws={'shrink': .8})
-plt.title('Correlation with Survival', fontsize=16)
-plt.tight_layout()
-plt.savefig('plots/correlations/survival_correlation.png', dpi=300, bbox_inches='tight')
-plt.close()
+if cache.stale('plots/correlations/survival_correlation.png', features_for_correlation,
+               correlation_params):
+    with profile_stage('figure:survival_correlation'):
+        plt, sns = load_plotting()
+        plt.figure(figsize=(10, 8))
+        survival_corr = corr_matrix['Survived'].sort_values(ascending=False)
+        sns.heatmap(pd.DataFrame(survival_corr), annot=True, fmt='.2f', cmap='coolwarm', 
+                    linewidths=0.5, cbar_kws={'shrink': .8})
+        plt.title('Correlation with Survival', fontsize=16)
+        plt.tight_layout()
+        savefig('plots/correlations/survival_correlation.png')
+        plt.close()
+
+cache.save()
+
+print("Interactive exports:")
+report_sizes(['plots/correlations/correlation_matrix_interactive.html',
+              'plots/correlations/age_vs_fare_interactive.html'])
 
+write_report(__file__)
 print("All correlation analyses and pairplots have been generated and saved to the 'plots/correlations' directory.")
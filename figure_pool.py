@@ -0,0 +1,129 @@
+from contextlib import contextmanager
+
+# Idle figures kept per figure size
+MAX_PER_SIZE = 2
+
+SUBPLOT_PARAMS = ['left', 'right', 'bottom', 'top', 'wspace', 'hspace']
+
+_plotting = None
+
+
+def load_plotting():
+    """Import pyplot and seaborn on first use and apply the project's plot style.
+
+    pyplot and seaborn take seconds to import, so scripts only load them
+    once a figure actually has to be drawn. Returns ``(plt, sns)``.
+    """
+    global _plotting
+    if _plotting is None:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        plt.style.use('seaborn-v0_8-whitegrid')
+        sns.set_palette('viridis')
+        plt.rcParams['figure.figsize'] = (12, 8)
+        _plotting = plt, sns
+    return _plotting
+
+
+def reset_plotting():
+    """Undo ``load_plotting``'s style so the next call applies it afresh.
+
+    Restores matplotlib's default rcParams, for runners that execute several
+    scripts in one process: a script that draws with matplotlib's defaults
+    must not inherit the style set up by one that ran before it.
+
+    Idle pooled figures are closed and dropped as well, so that closing
+    every figure afterwards (``plt.close('all')``) cannot leave dead figures
+    in the pool for the next script.
+    """
+    global _plotting
+    if _plotting is not None:
+        plt, _ = _plotting
+        for idle in _pool._idle.values():
+            for fig in idle:
+                plt.close(fig)
+    _pool._idle.clear()
+    import matplotlib
+    matplotlib.rcdefaults()
+    _plotting = None
+
+
+class FigurePool:
+    """Hand out matplotlib figures and take them back for reuse.
+
+    A returned figure keeps its canvas and its axes. Each axes is cleared,
+    not rebuilt, before the figure is used again. Because the canvas is
+    kept, Agg reuses the same renderer for every save at the same size and
+    DPI, so matplotlib's per-renderer text and tick metrics cache stays warm
+    between plots.
+    """
+
+    def __init__(self, max_per_size=MAX_PER_SIZE):
+        self.max_per_size = max_per_size
+        self.created = 0
+        self.reused = 0
+        self._idle = {}
+
+    @contextmanager
+    def figure(self, figsize):
+        """Make a figure of ``figsize`` current for the duration of the block.
+
+        Code inside the block draws through pyplot or on the yielded figure,
+        but must not close it. Subplots requested with ``plt.subplot`` at the
+        same grid positions come back as the cleared axes from the last use.
+        """
+        plt, _ = load_plotting()
+        key = tuple(figsize)
+        idle = self._idle.setdefault(key, [])
+        if idle:
+            fig = idle.pop()
+            plt.figure(fig.number)
+            self.reused += 1
+        else:
+            fig = plt.figure(figsize=figsize)
+            self.created += 1
+        try:
+            yield fig
+        except BaseException:
+            plt.close(fig)
+            raise
+        if len(idle) < self.max_per_size:
+            self._reset(fig)
+            idle.append(fig)
+        else:
+            plt.close(fig)
+
+    def _reset(self, fig):
+        plt, _ = load_plotting()
+        # Grid axes are cleared in place; colorbars and other free-floating
+        # axes, figure legends and figure texts are dropped
+        for ax in fig.axes:
+            if ax.get_subplotspec() is None:
+                ax.remove()
+            else:
+                ax.cla()
+        for artist in fig.legends + fig.texts:
+            artist.remove()
+        # Undo tight_layout so the next plot starts from the default margins
+        fig.subplots_adjust(**{name: plt.rcParams[f'figure.subplot.{name}']
+                               for name in SUBPLOT_PARAMS})
+
+    def close(self):
+        """Close every idle figure."""
+        plt, _ = load_plotting()
+        for idle in self._idle.values():
+            for fig in idle:
+                plt.close(fig)
+        self._idle.clear()
+
+
+# Pool shared by the plotting functions of this process (each render worker
+# gets its own)
+_pool = FigurePool()
+
+
+def pooled_figure(figsize):
+    """``FigurePool.figure`` on the process-wide pool."""
+    return _pool.figure(figsize)
@@ -0,0 +1,160 @@
+import numpy as np
+
+# Points of the grid the KDE is evaluated on
+GRID_SIZE = 2048
+
+# The Gaussian kernel is truncated this many bandwidths from its centre
+KERNEL_CUTOFF = 5
+
+
+def binned_kde(grid_counts, dx, bandwidth):
+    """Gaussian KDE on an evenly spaced grid from linearly binned counts.
+
+    The counts are convolved with the kernel sampled at the grid spacing
+    through an FFT, so the cost depends on the grid size, not on the number
+    of values. Returns densities at the grid points that integrate to one.
+    """
+    m = grid_counts.size
+    half = int(min(m - 1, np.ceil(KERNEL_CUTOFF * bandwidth / dx)))
+    offsets = np.arange(-half, half + 1) * dx
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    # Zero-pad to a power of two at least as long as the full convolution
+    n_fft = 1 << (m + kernel.size - 2).bit_length()
+    density = np.fft.irfft(np.fft.rfft(grid_counts, n_fft) * np.fft.rfft(kernel, n_fft), n_fft)
+    density = density[half:half + m] / grid_counts.sum()
+    # Clip the FFT's rounding noise around zero
+    return np.clip(density, 0, None)
+
+
+class HistogramAccumulator:
+    """Bin counts of one numeric column on fixed edges, built chunk by chunk.
+
+    Values are counted on ``bins`` display bins over ``[lo, hi]`` and, with
+    linear binning, on a ``grid_size``-point grid over the same range that
+    the KDE is computed from. Count, mean and variance are kept as well for
+    Scott's bandwidth. ``[lo, hi]`` must cover every value passed to
+    ``update``; accumulators over the same range can be merged.
+    """
+
+    def __init__(self, lo, hi, bins=30, grid_size=GRID_SIZE, name=None):
+        self.name = name
+        # Same edges as np.histogram(values, bins) on values spanning [lo, hi]
+        self.edges = np.histogram_bin_edges(np.array([lo, hi], dtype=float), bins=bins)
+        self.grid = np.linspace(lo, hi, grid_size)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.grid_counts = np.zeros(grid_size)
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        counts, _ = np.histogram(values, bins=self.edges)
+        self.counts += counts
+
+        # Linear binning: each value is split between its two nearest grid
+        # points in proportion to its distance from them
+        m = self.grid.size
+        dx = self.grid[1] - self.grid[0]
+        if dx > 0:
+            position = (values - self.grid[0]) / dx
+            left = np.clip(np.floor(position).astype(np.int64), 0, m - 2)
+            right_share = np.clip(position - left, 0, 1)
+            self.grid_counts += np.bincount(left, 1 - right_share, minlength=m)
+            self.grid_counts += np.bincount(left + 1, right_share, minlength=m)
+
+        self._combine(values.size, values.mean(), ((values - values.mean()) ** 2).sum())
+        return self
+
+    def _combine(self, n_b, mean_b, m2_b):
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta ** 2 * self.n * n_b / n
+        self.n = n
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.grid_counts += other.grid_counts
+        if other.n:
+            self._combine(other.n, other.mean, other.m2)
+        return self
+
+    @property
+    def bandwidth(self):
+        """Scott's rule, as used by ``scipy.stats.gaussian_kde`` and seaborn."""
+        if self.n < 2:
+            return np.nan
+        return np.sqrt(self.m2 / (self.n - 1)) * self.n ** -0.2
+
+    def kde(self):
+        """KDE densities at ``self.grid``, or None when the data are constant."""
+        bandwidth = self.bandwidth
+        dx = self.grid[1] - self.grid[0]
+        if not bandwidth > 0 or not dx > 0:
+            return None
+        return binned_kde(self.grid_counts, dx, bandwidth)
+
+    def kde_counts(self):
+        """The KDE scaled to the histogram's counts, as ``sns.histplot`` draws it."""
+        density = self.kde()
+        if density is None:
+            return None
+        return density * (self.counts * np.diff(self.edges)).sum()
+
+
+class HistogramEngine:
+    """Histograms and KDEs of several numeric columns from one pass.
+
+    ``ranges`` maps each column to the ``(lo, hi)`` its bins span. For an
+    in-memory frame ``from_frame`` takes them from the data; for chunked
+    input they must be known up front, after which ``update`` is called per
+    chunk.
+    """
+
+    def __init__(self, ranges, bins=30, grid_size=GRID_SIZE):
+        self.histograms = {feature: HistogramAccumulator(lo, hi, bins, grid_size, name=feature)
+                           for feature, (lo, hi) in ranges.items()}
+
+    @classmethod
+    def from_frame(cls, df, features, bins=30, grid_size=GRID_SIZE):
+        extremes = df[features].agg(['min', 'max'])
+        ranges = {feature: (float(extremes.at['min', feature]), float(extremes.at['max', feature]))
+                  for feature in features}
+        return cls(ranges, bins, grid_size).update(df)
+
+    def update(self, chunk):
+        for feature, histogram in self.histograms.items():
+            histogram.update(chunk[feature].to_numpy(dtype=float, na_value=np.nan))
+        return self
+
+    def merge(self, other):
+        for feature, histogram in other.histograms.items():
+            self.histograms[feature].merge(histogram)
+        return self
+
+    def __getitem__(self, feature):
+        return self.histograms[feature]
+
+
+def draw_histogram(ax, histogram, kde=True):
+    """Draw precomputed bins (and their KDE) like ``sns.histplot(..., kde=True)``."""
+    from matplotlib.colors import to_rgba
+    from figure_pool import load_plotting
+
+    _, sns = load_plotting()
+    centres = (histogram.edges[:-1] + histogram.edges[1:]) / 2
+    # One weighted point per bin reproduces the bars of the raw histogram
+    sns.histplot(x=centres, weights=histogram.counts, bins=len(histogram.counts),
+                 binrange=(histogram.edges[0], histogram.edges[-1]), ax=ax,
+                 alpha=0.5 if kde else 0.75)
+    density = histogram.kde_counts() if kde else None
+    if density is not None:
+        bars = ax.patches[-1]
+        line, = ax.plot(histogram.grid, density, color=to_rgba(bars.get_facecolor(), 1))
+        line.sticky_edges.y[:] = (0, np.inf)
+    ax.set_xlabel(histogram.name)
+    return ax
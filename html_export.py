@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+
+from profiling import profile_stage
+
+# File name plotly uses for the shared bundle with include_plotlyjs='directory'
+PLOTLYJS_NAME = 'plotly.min.js'
+
+# Scatter traces with more points than this are downsampled and drawn with WebGL
+SCATTER_MAX_POINTS = 20000
+
+
+def _ensure_plotlyjs(directory):
+    """Write plotly.js once per output directory (atomically, for parallel workers)."""
+    path = os.path.join(directory, PLOTLYJS_NAME)
+    if os.path.exists(path):
+        return
+    from plotly.offline import get_plotlyjs
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(get_plotlyjs())
+    os.replace(tmp_path, path)
+
+
+def write_html(fig, path):
+    """Write ``fig`` as HTML that loads plotly.js from a shared file next to it.
+
+    Returns the size of the written file in bytes.
+    """
+    _ensure_plotlyjs(os.path.dirname(path) or '.')
+    with profile_stage(f'write_html:{path}', outputs=[path]):
+        fig.write_html(path, include_plotlyjs='directory')
+    return os.path.getsize(path)
+
+
+def histogram_figure(histogram, title, box):
+    """Interactive histogram with its KDE and a box marginal, from precomputed data.
+
+    ``histogram`` is a ``histograms.HistogramAccumulator`` and ``box`` the
+    ``Axes.bxp`` statistics of the same column, so the page shows the same
+    numbers as the static figures. Only the bin counts, the KDE curve and
+    the five box statistics are embedded, so its size does not depend on the
+    number of rows.
+    """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    edges, name = histogram.edges, histogram.name
+
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8],
+                        vertical_spacing=0.02)
+    fig.add_trace(go.Box(q1=[box['q1']], median=[box['med']], q3=[box['q3']],
+                         lowerfence=[box['whislo']], upperfence=[box['whishi']],
+                         orientation='h', name=name, showlegend=False), row=1, col=1)
+    fig.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=histogram.counts,
+                         width=np.diff(edges), name=name, showlegend=False), row=2, col=1)
+    density = histogram.kde_counts()
+    if density is not None:
+        # Every 8th grid point is plenty for a smooth line in the browser
+        fig.add_trace(go.Scatter(x=histogram.grid[::8], y=density[::8], mode='lines',
+                                 name='KDE', showlegend=False), row=2, col=1)
+    fig.update_yaxes(showticklabels=False, row=1, col=1)
+    fig.update_xaxes(title_text=name, row=2, col=1)
+    fig.update_yaxes(title_text='count', row=2, col=1)
+    fig.update_layout(title=title, bargap=0)
+    return fig
+
+
+def scatter_figure(df, x, y, max_points=SCATTER_MAX_POINTS, seed=0, **kwargs):
+    """``px.scatter`` that downsamples to ``max_points`` rows and uses WebGL.
+
+    Extra keyword arguments are passed to ``plotly.express.scatter``.
+    """
+    import plotly.express as px
+    if len(df) > max_points:
+        df = df.sample(n=max_points, random_state=seed)
+        kwargs.setdefault('render_mode', 'webgl')
+    return px.scatter(df, x=x, y=y, **kwargs)
+
+
+def report_sizes(paths):
+    """Print the size of each exported file and of the shared plotly.js bundles."""
+    paths = [path for path in paths if os.path.exists(path)]
+    bundles = {os.path.join(os.path.dirname(path) or '.', PLOTLYJS_NAME) for path in paths}
+    total = 0
+    for path in paths + sorted(bundle for bundle in bundles if os.path.exists(bundle)):
+        size = os.path.getsize(path)
+        total += size
+        print(f"  {path}: {size / 1024:.1f} KB")
+    print(f"  Total interactive export size: {total / 1024 / 1024:.2f} MB")
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+
+from data_loader import input_format, iter_batches
+
+# Bump when the layout of the saved state changes; older files are rebuilt
+STATE_VERSION = 4
+
+# Bytes before the end of the rows already read that are hashed to check
+# that the input has only grown by appending since the last run
+TAIL_BYTES = 1 << 16
+
+
+def state_path(output_path):
+    """Where the mergeable state behind ``output_path`` is kept, next to it."""
+    return f'{os.path.splitext(output_path)[0]}.state.json'
+
+
+def _tail_digest(path, size):
+    with open(path, 'rb') as f:
+        f.seek(max(0, size - TAIL_BYTES))
+        return hashlib.sha1(f.read(size - max(0, size - TAIL_BYTES))).hexdigest()
+
+
+def _file_digest(path, block_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_position(path, deltas=()):
+    """How far into ``path`` a run has read: all of it, as it is now.
+
+    ``deltas`` are the digests of separate files of new rows merged on top.
+    """
+    size = os.path.getsize(path)
+    return {'path': os.path.abspath(path), 'bytes': size, 'tail': _tail_digest(path, size),
+            'deltas': list(deltas)}
+
+
+def load_state(path):
+    """The state saved at ``path``, or None when there is none (or it is outdated)."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    return state if state.get('version') == STATE_VERSION else None
+
+
+def save_state(path, state):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': STATE_VERSION, **state}, f)
+    os.replace(tmp_path, path)
+
+
+def new_rows(path, state, columns=None, filters=None, batch_size=100_000, delta=False):
+    """Work out which rows of ``path`` the saved ``state`` has not seen yet.
+
+    Returns ``(batches, position, resume)``. When ``resume`` is True the
+    batches hold only rows to merge into the saved state: the rows appended
+    to the CSV since it was last read, nothing for an unchanged file, or
+    all of ``path`` when ``delta`` says it is a file of new rows (nothing
+    when that file has already been merged). Otherwise the state cannot be
+    extended (there is none, it was built from another file or with other
+    filters, or the input was rewritten rather than appended to) and the
+    batches hold every row. ``position`` is the source to save with the
+    updated state; merging a file of new rows only adds its digest to the
+    saved source, so later runs still extend it from the main input.
+    """
+    filters = json.loads(json.dumps(list(filters or [])))
+    source = state and state['source']
+    reason = None
+    if state is None:
+        reason = 'no saved state'
+    elif state['filters'] != filters:
+        reason = 'the saved state was built with other --where filters'
+    elif delta:
+        digest = _file_digest(path)
+        if digest in source['deltas']:
+            print(f"The rows of {path} are already in the saved state")
+            return iter([]), source, True
+        return (iter_batches(path, columns, filters, batch_size),
+                {**source, 'deltas': source['deltas'] + [digest]}, True)
+    if reason is not None:
+        position = source_position(path)
+    else:
+        position = source_position(path, source['deltas'])
+        if source['path'] != position['path']:
+            reason = f"the saved state was built from {source['path']}"
+        elif position['bytes'] < source['bytes'] or \
+                _tail_digest(path, source['bytes']) != source['tail']:
+            reason = f'{path} changed other than by appending rows'
+        elif position['bytes'] == source['bytes']:
+            return iter([]), position, True
+        elif input_format(path) != 'csv':
+            reason = f'{path} changed; only CSV files can be read from where the last run stopped'
+        else:
+            print(f"Reading the {position['bytes'] - source['bytes']} bytes appended to {path}")
+            return (iter_batches(path, columns, filters, batch_size, offset=source['bytes']),
+                    position, True)
+        # Starting over drops the merged files of new rows too
+        position['deltas'] = []
+    print(f"Computing from every row: {reason}")
+    return iter_batches(path, columns, filters, batch_size), position, False
@@ -0,0 +1,203 @@
+import os
+
+import numpy as np
+
+from outliers import detect_outliers
+from survival_aggregates import add_group_columns, survival_tables
+
+# Markdown template of the feature-level inference report; placeholders are
+# filled from the statistics returned by ``profile_features``
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'inference_template.md')
+
+CLASS_NAMES = {1: '1st class', 2: '2nd class', 3: '3rd class'}
+SEX_NAMES = {'male': 'Males', 'female': 'Females'}
+PORT_NAMES = {'C': 'Cherbourg', 'Q': 'Queenstown', 'S': 'Southampton'}
+AGE_GROUP_NAMES = {'Child': 'Children', 'Teenager': 'Teenagers', 'Young Adult': 'Young Adults',
+                   'Adult': 'Adults', 'Senior': 'Seniors'}
+CABIN_NAMES = {False: 'Passengers without a recorded cabin', True: 'Passengers with a recorded cabin'}
+
+# Words for the strength of a correlation, by lower bound of |r|
+CORRELATION_STRENGTHS = [(0.5, 'Strong'), (0.3, 'Moderate'), (0.1, 'Weak'), (0.0, 'Negligible')]
+
+
+def _percent_list(values, names=None, by_value=False):
+    """Format a Series of percentages as 'label (12.3%), ...'."""
+    if by_value:
+        values = values.sort_values(ascending=False)
+    names = names or {}
+    return ', '.join(f'{names.get(label, label)} ({value:.1f}%)' for label, value in values.items())
+
+
+def describe_correlation(correlations, feature):
+    """Strength, sign and rank of ``feature``'s correlation with survival."""
+    r = correlations[feature]
+    if np.isnan(r):
+        return 'Not defined (constant or missing values)'
+    strength = _strength(r)
+    direction = 'positive' if r >= 0 else 'negative'
+    rank = int((correlations.abs() > abs(r)).sum()) + 1
+    return (f'{strength} {direction} correlation with survival (r = {r:+.2f}, '
+            f'rank {rank} of {len(correlations)} features)')
+
+
+def _strength(r):
+    return next(word for bound, word in CORRELATION_STRENGTHS if abs(r) >= bound)
+
+
+def describe_predictor(correlations, feature):
+    """How ``feature`` ranks as a predictor of survival, by its |r|."""
+    r = correlations[feature]
+    if np.isnan(r):
+        return f'{feature} has no defined correlation with survival in this data'
+    rank = int((correlations.abs() > abs(r)).sum()) + 1
+    if rank == 1:
+        return f'{feature} is the strongest predictor of survival of the {len(correlations)} features'
+    return (f'{feature} is a {_strength(r).lower()} predictor of survival, '
+            f'ranked {rank} of {len(correlations)} features')
+
+
+def describe_extremes(rates, names=None):
+    """Which groups of a survival-rate Series fared best and worst."""
+    names = names or {}
+    if len(rates) < 2:
+        return 'Only one group is present, so survival cannot be compared across groups'
+    if rates.max() == rates.min():
+        return f'Every group had the same survival rate ({rates.iloc[0]:.1f}%)'
+    high, low = rates.idxmax(), rates.idxmin()
+    return (f'{names.get(high, high)} had the highest survival rate ({rates[high]:.1f}%) '
+            f'and {names.get(low, low)} the lowest ({rates[low]:.1f}%)')
+
+
+def describe_trend(rates, noun):
+    """Whether survival rises, falls or neither as a count feature grows."""
+    steps = np.diff(rates.to_numpy())
+    if len(steps) == 0:
+        return f'Only one value of {noun} is present'
+    if (steps >= 0).all():
+        return f'Survival rises steadily with {noun}, so a linear term can capture it'
+    if (steps <= 0).all():
+        return f'Survival falls steadily with {noun}, so a linear term can capture it'
+    return (f'Survival does not change steadily with {noun}; '
+            'binning or a categorical transformation may capture it better than a linear term')
+
+
+def describe_outliers(row, unit='', prefix='', fmt='g'):
+    """One-line summary of a feature's outliers from ``detect_outliers``."""
+    if row['count'] == 0:
+        return 'No outliers under the IQR rule'
+    if row['min'] > row['upper']:
+        side = 'at the upper end'
+    elif row['max'] < row['lower']:
+        side = 'at the lower end'
+    else:
+        side = 'at both ends'
+    return (f"{row['count']:,} values ({row['percentage']:.2f}%) are outliers {side} "
+            f"({prefix}{row['min']:{fmt}}-{prefix}{row['max']:{fmt}}{unit})")
+
+
+def describe_skew(skew):
+    if abs(skew) < 0.5:
+        return 'Roughly symmetric'
+    shape = 'right-skewed' if skew > 0 else 'left-skewed'
+    return f"{'Highly' if abs(skew) >= 1 else 'Moderately'} {shape}"
+
+
+def profile_features(df, correlations):
+    """Every figure quoted in the inference report, from one pass over ``df``.
+
+    Group shares and survival rates come from a single ``survival_tables``
+    call, outliers from one ``detect_outliers`` call and missing counts from
+    one ``isna`` reduction. ``correlations`` is the signed correlation of
+    each feature with survival (``target_correlations``).
+    """
+    df = add_group_columns(df.copy(deep=False))
+    df['HasCabin'] = df['Cabin'].notna()
+    tables = survival_tables(df, ['Pclass', 'Sex', 'AgeGroup', 'SibSp', 'Parch', 'Embarked',
+                                  'HasCabin', 'FamilySize'])
+    shares = {key: table['count'] / table['count'].sum() * 100 for key, table in tables.items()}
+    rates = {key: table['rate'] * 100 for key, table in tables.items()}
+    missing = df[['Age', 'Cabin', 'Embarked']].isna().sum()
+    outliers, _ = detect_outliers(df, ['Age', 'SibSp', 'Parch', 'Fare'])
+    n_rows = len(df)
+
+    age = df['Age'].to_numpy(dtype=float, na_value=np.nan)
+    fare = df['Fare'].to_numpy(dtype=float, na_value=np.nan)
+    fare_skew = df['Fare'].skew()
+    ranking = correlations.reindex(correlations.abs().sort_values(ascending=False).index)
+    fare_pclass = df['Fare'].astype(float).corr(df['Pclass'].astype(float))
+
+    return {
+        'n_rows': n_rows,
+        'pclass_distribution': _percent_list(shares['Pclass'], CLASS_NAMES, by_value=True),
+        'pclass_rates': _percent_list(rates['Pclass'], CLASS_NAMES),
+        'pclass_correlation': describe_correlation(correlations, 'Pclass'),
+        'pclass_extremes': describe_extremes(rates['Pclass'], CLASS_NAMES),
+        'pclass_predictor': describe_predictor(correlations, 'Pclass'),
+        'sex_distribution': _percent_list(shares['Sex'], SEX_NAMES, by_value=True),
+        'sex_rates': _percent_list(rates['Sex'], SEX_NAMES, by_value=True),
+        'sex_correlation': describe_correlation(correlations, 'Sex'),
+        'sex_extremes': describe_extremes(rates['Sex'], SEX_NAMES),
+        'sex_predictor': describe_predictor(correlations, 'Sex'),
+        'age_mean': np.nanmean(age),
+        'age_std': np.nanstd(age, ddof=1),
+        'age_missing_pct': missing['Age'] / n_rows * 100,
+        'age_outliers': describe_outliers(outliers.loc['Age'], unit=' years'),
+        'age_correlation': describe_correlation(correlations, 'Age'),
+        'age_group_rates': _percent_list(rates['AgeGroup'], AGE_GROUP_NAMES),
+        'age_extremes': describe_extremes(rates['AgeGroup'], AGE_GROUP_NAMES),
+        'age_predictor': describe_predictor(correlations, 'Age'),
+        'sibsp_none_pct': (df['SibSp'] == 0).mean() * 100,
+        'sibsp_outliers': describe_outliers(outliers.loc['SibSp']),
+        'sibsp_correlation': describe_correlation(correlations, 'SibSp'),
+        'sibsp_rates': _percent_list(rates['SibSp']),
+        'sibsp_extremes': describe_extremes(
+            rates['SibSp'], {n: f'Passengers with {n} siblings/spouses' for n in rates['SibSp'].index}),
+        'sibsp_trend': describe_trend(rates['SibSp'], 'the number of siblings/spouses'),
+        'sibsp_predictor': describe_predictor(correlations, 'SibSp'),
+        'parch_none_pct': (df['Parch'] == 0).mean() * 100,
+        'parch_outliers': describe_outliers(outliers.loc['Parch']),
+        'parch_correlation': describe_correlation(correlations, 'Parch'),
+        'parch_rates': _percent_list(rates['Parch']),
+        'parch_extremes': describe_extremes(
+            rates['Parch'], {n: f'Passengers with {n} parents/children' for n in rates['Parch'].index}),
+        'parch_trend': describe_trend(rates['Parch'], 'the number of parents/children'),
+        'parch_predictor': describe_predictor(correlations, 'Parch'),
+        'fare_mean': np.nanmean(fare),
+        'fare_median': np.nanmedian(fare),
+        'fare_skew': fare_skew,
+        'fare_shape': describe_skew(fare_skew),
+        'fare_outliers': describe_outliers(outliers.loc['Fare'], prefix='£', fmt='.1f'),
+        'fare_correlation': describe_correlation(correlations, 'Fare'),
+        'fare_predictor': describe_predictor(correlations, 'Fare'),
+        'fare_transform': ('Log transformation recommended due to the high skewness'
+                           if abs(fare_skew) >= 1 else 'No transformation needed for the skewness'),
+        'fare_pclass_correlation': (f'{_strength(fare_pclass)} correlation with Pclass '
+                                    f'(r = {fare_pclass:+.2f})' if not np.isnan(fare_pclass)
+                                    else 'No defined correlation with Pclass'),
+        'cabin_missing_pct': missing['Cabin'] / n_rows * 100,
+        'cabin_unique': df['Cabin'].nunique(),
+        'cabin_present': n_rows - int(missing['Cabin']),
+        'hascabin_correlation': describe_correlation(correlations, 'HasCabin'),
+        'hascabin_extremes': describe_extremes(rates['HasCabin'], CABIN_NAMES),
+        'embarked_distribution': _percent_list(shares['Embarked'], PORT_NAMES, by_value=True),
+        'embarked_missing': int(missing['Embarked']),
+        'embarked_missing_pct': missing['Embarked'] / n_rows * 100,
+        'embarked_rates': _percent_list(rates['Embarked'], PORT_NAMES),
+        'embarked_mode': PORT_NAMES.get(shares['Embarked'].idxmax(), shares['Embarked'].idxmax()),
+        'embarked_correlation': describe_correlation(correlations, 'Embarked'),
+        'embarked_extremes': describe_extremes(rates['Embarked'], PORT_NAMES),
+        'embarked_predictor': describe_predictor(correlations, 'Embarked'),
+        'ticket_unique': df['Ticket'].nunique(),
+        'name_unique': df['Name'].nunique(),
+        'family_rates': _percent_list(rates['FamilySize']),
+        'family_extremes': describe_extremes(
+            rates['FamilySize'], {n: f'Passengers with {n} relatives aboard' for n in rates['FamilySize'].index}),
+        'family_trend': describe_trend(rates['FamilySize'], 'family size'),
+        'correlation_ranking': ', '.join(f'{feature} ({r:+.2f})' for feature, r in ranking.items()),
+    }
+
+
+def render_inferences(stats, template_path=TEMPLATE_PATH):
+    """Fill the report template with ``stats``; returns the markdown text."""
+    with open(template_path, encoding='utf-8') as f:
+        return f.read().format_map(stats)
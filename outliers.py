@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+# Default cut-offs for each detection method
+DEFAULT_THRESHOLDS = {
+    'iqr': 1.5,     # multiples of the IQR beyond the quartiles
+    'mad': 3.5,     # modified z-score (Iglewicz and Hoaglin)
+    'zscore': 3.0,  # standard deviations from the mean
+}
+
+
+def _as_stored(value):
+    """Python scalar that prints like the stored value (float32 66.6, not 66.5999...)."""
+    if isinstance(value, np.floating):
+        return float(str(value))
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def outlier_bounds(df, features, method='iqr', threshold=None, backend='pandas'):
+    """Lower and upper outlier bounds for every feature.
+
+    All features are handled together: the IQR method uses a single
+    ``quantile([0.25, 0.75])`` call over the selected columns. Returns a
+    DataFrame indexed by feature with ``lower`` and ``upper`` columns.
+    """
+    if threshold is None:
+        threshold = DEFAULT_THRESHOLDS[method]
+    if backend == 'polars':
+        from backends import outlier_bounds as polars_bounds
+        return polars_bounds(df, features, method, threshold)
+    data = df[features]
+    if method == 'iqr':
+        quartiles = data.quantile([0.25, 0.75])
+        q1, q3 = quartiles.loc[0.25], quartiles.loc[0.75]
+        iqr = q3 - q1
+        lower, upper = q1 - threshold * iqr, q3 + threshold * iqr
+    elif method == 'mad':
+        median = data.median()
+        mad = (data - median).abs().median()
+        # 0.6745 scales the MAD to a standard deviation for normal data
+        spread = threshold * mad / 0.6745
+        lower, upper = median - spread, median + spread
+    elif method == 'zscore':
+        mean, std = data.mean(), data.std()
+        lower, upper = mean - threshold * std, mean + threshold * std
+    else:
+        raise ValueError(f"Unknown outlier method: {method!r}")
+    return pd.DataFrame({'lower': lower, 'upper': upper})
+
+
+def detect_outliers(df, features, method='iqr', threshold=None, backend='pandas'):
+    """Flag outliers without copying the rows that contain them.
+
+    Returns ``(summary, masks)``. ``masks`` maps each feature to a boolean
+    array over the rows of ``df``. ``summary`` is indexed by feature with the
+    bounds, the number and percentage of outliers and their range.
+    """
+    bounds = outlier_bounds(df, features, method, threshold, backend)
+    masks = {}
+    rows = []
+    for feature in features:
+        values = df[feature].to_numpy()
+        lower, upper = bounds.loc[feature, 'lower'], bounds.loc[feature, 'upper']
+        mask = (values < lower) | (values > upper)
+        flagged = values[mask]
+        masks[feature] = mask
+        rows.append({
+            'lower': lower,
+            'upper': upper,
+            'count': int(mask.sum()),
+            'percentage': mask.sum() / len(df) * 100,
+            'min': _as_stored(flagged.min()) if flagged.size else np.nan,
+            'max': _as_stored(flagged.max()) if flagged.size else np.nan,
+        })
+    summary = pd.DataFrame(rows, index=pd.Index(features, name='feature'), dtype=object)
+    return summary, masks
+
+
+def _weighted_median(items, weights):
+    # Linear interpolation between the sorted items, like np.median when
+    # every weight is one
+    ranks = (np.cumsum(weights) - weights / 2) / weights.sum()
+    return float(np.interp(0.5, ranks, items))
+
+
+def sketch_outliers(accumulators, method='iqr', threshold=None, dtypes=None):
+    """The summary of ``detect_outliers``, from ``NumericAccumulator`` objects.
+
+    ``accumulators`` maps each feature to an accumulator over all of its
+    rows, so the summary can be kept up to date as rows are added without
+    revisiting the old ones. Bounds, counts and ranges come from each
+    accumulator's quantile sketch; while the sketch holds every value (up to
+    its ``k`` values) they are exact, beyond that they are estimates.
+    ``dtypes`` gives each feature's stored dtype so that outlier ranges are
+    printed as the stored values are.
+    """
+    if threshold is None:
+        threshold = DEFAULT_THRESHOLDS[method]
+    dtypes = dtypes or {}
+    rows = []
+    for feature, acc in accumulators.items():
+        sketch = acc.sketch
+        items, weights = sketch.weighted_items()
+        if method == 'iqr':
+            q1, q3 = sketch.quantile([0.25, 0.75])
+            iqr = q3 - q1
+            lower, upper = q1 - threshold * iqr, q3 + threshold * iqr
+        elif method == 'mad':
+            median = float(sketch.quantile(0.5))
+            deviations = np.abs(items - median)
+            order = np.argsort(deviations, kind='stable')
+            mad = _weighted_median(deviations[order], weights[order]) if items.size else np.nan
+            spread = threshold * mad / 0.6745
+            lower, upper = median - spread, median + spread
+        elif method == 'zscore':
+            lower, upper = acc.mean - threshold * acc.std, acc.mean + threshold * acc.std
+        else:
+            raise ValueError(f"Unknown outlier method: {method!r}")
+        mask = (items < lower) | (items > upper)
+        flagged = items[mask].astype(dtypes.get(feature, float))
+        count = int(round(weights[mask].sum()))
+        n_rows = acc.count + acc.nulls
+        rows.append({
+            'lower': lower,
+            'upper': upper,
+            'count': count,
+            'percentage': count / n_rows * 100,
+            'min': _as_stored(flagged.min()) if flagged.size else np.nan,
+            'max': _as_stored(flagged.max()) if flagged.size else np.nan,
+        })
+    summary = pd.DataFrame(rows, index=pd.Index(list(accumulators), name='feature'),
+                           dtype=object)
+    return summary
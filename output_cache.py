@@ -0,0 +1,144 @@
+import ast
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from data_loader import CACHE_DIR
+from render_settings import figure_path, render_profile
+
+# Directory holding one fingerprint manifest per script
+MANIFEST_DIR = os.path.join(CACHE_DIR, 'outputs')
+
+
+def _sha1(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def local_imports(script):
+    """Paths of ``script`` and every module next to it that it imports, directly or not.
+
+    Imports inside functions count too, since the drawing modules are often
+    only imported once a figure has to be drawn.
+    """
+    directory = os.path.dirname(os.path.abspath(script))
+    seen = []
+    pending = [os.path.abspath(script)]
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.append(path)
+        with open(path, 'rb') as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module_path = os.path.join(directory, f"{name.split('.')[0]}.py")
+                if os.path.exists(module_path):
+                    pending.append(module_path)
+    return sorted(seen)
+
+
+class OutputCache:
+    """Skip re-rendering artifacts whose inputs have not changed.
+
+    Each artifact is fingerprinted by the hashes of the dataframe columns it
+    reads, its plot parameters and the source of the script that draws it
+    along with the local modules it imports (drawing helpers, figure pool,
+    render settings).
+    Figure outputs are named as ``.png`` and mapped to the active rendering
+    profile's format, whose name is part of their fingerprint.
+    Fingerprints of rendered files are kept in a JSON manifest per script;
+    an artifact is only redrawn when its fingerprint differs from the one
+    recorded for the file on disk, or when ``force`` is set.
+
+    Typical use::
+
+        cache = OutputCache(df, __file__, force=args.force)
+        if cache.stale('plots/x.png', ['Age', 'Survived']):
+            ...draw and save plots/x.png...
+        cache.save()
+
+    When the rows are not at hand (outputs computed from saved statistics),
+    pass ``df=None`` and a ``data_key`` identifying the data; it then stands
+    in for every column hash.
+    """
+
+    def __init__(self, df, script, manifest_dir=MANIFEST_DIR, force=False, data_key=None):
+        self.df = df
+        self.data_key = data_key
+        self.force = force
+        name = os.path.splitext(os.path.basename(script))[0]
+        self.manifest_path = os.path.join(manifest_dir, f'{name}.json')
+        sources = {}
+        for path in local_imports(script):
+            with open(path, 'rb') as f:
+                sources[os.path.basename(path)] = _sha1(f.read())
+        self.source_hash = _sha1(json.dumps(sources, sort_keys=True).encode())
+        self._column_hashes = {}
+        self._pending = {}
+
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+
+    def column_hash(self, column):
+        """Content hash of one dataframe column (computed once per run)."""
+        if self.df is None:
+            return self.data_key
+        if column not in self._column_hashes:
+            values = pd.util.hash_pandas_object(self.df[column], index=False).to_numpy()
+            self._column_hashes[column] = _sha1(values.tobytes())
+        return self._column_hashes[column]
+
+    def fingerprint(self, columns, params=None):
+        payload = {
+            'columns': {col: self.column_hash(col) for col in columns},
+            'params': params or {},
+            'sources': self.source_hash,
+        }
+        return _sha1(json.dumps(payload, sort_keys=True, default=str).encode())
+
+    def stale(self, outputs, columns, params=None):
+        """Return True when ``outputs`` must be (re)rendered.
+
+        ``outputs`` is a path or list of paths produced together. Stale
+        outputs are remembered so that ``save`` can record their new
+        fingerprint once they have been written.
+        """
+        if isinstance(outputs, str):
+            outputs = [outputs]
+        if any(path.endswith('.png') for path in outputs):
+            params = {**(params or {}), 'render_profile': render_profile()}
+            outputs = [figure_path(path) for path in outputs]
+        key = self.fingerprint(columns, params)
+        fresh = not self.force and all(
+            os.path.exists(path)
+            and self.manifest.get(path, {}).get('key') == key
+            and self.manifest[path].get('size') == os.path.getsize(path)
+            for path in outputs
+        )
+        if not fresh:
+            for path in outputs:
+                self._pending[path] = key
+        return not fresh
+
+    def save(self):
+        """Record the fingerprints of every stale output that now exists."""
+        for path, key in self._pending.items():
+            if os.path.exists(path):
+                self.manifest[path] = {'key': key, 'size': os.path.getsize(path)}
+        self._pending = {}
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        tmp_path = f'{self.manifest_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+from figure_pool import load_plotting
+from render_settings import savefig
+
+# Points drawn per scatter panel before sampling kicks in
+SCATTER_SAMPLE_SIZE = 5000
+
+# Above this many rows the lower-triangle panels switch to hexbin density
+DENSE_THRESHOLD = 50000
+
+
+def shared_bin_edges(df, features, bins=30):
+    """Histogram bin edges per feature, computed once for every pairplot."""
+    edges = {}
+    for feature in features:
+        values = df[feature].to_numpy(dtype=float, na_value=np.nan)
+        values = values[~np.isnan(values)]
+        edges[feature] = np.histogram_bin_edges(values, bins=bins)
+    return edges
+
+
+def hue_histograms(df, features, hue, edges):
+    """Density histograms of every feature for each level of ``hue``.
+
+    Returns ``{level: {feature: densities}}`` using the shared ``edges``.
+    """
+    codes, levels = pd.factorize(df[hue], sort=True)
+    histograms = {level: {} for level in levels}
+    for feature in features:
+        values = df[feature].to_numpy(dtype=float, na_value=np.nan)
+        present = ~np.isnan(values)
+        for i, level in enumerate(levels):
+            rows = present & (codes == i)
+            histograms[level][feature], _ = np.histogram(values[rows], bins=edges[feature],
+                                                         density=True)
+    return histograms
+
+
+def stratified_sample(df, hue, size=SCATTER_SAMPLE_SIZE, seed=0):
+    """Sample at most ``size`` rows, keeping every hue level represented.
+
+    Levels are sampled in proportion to their size, but each keeps at least
+    a handful of points so small groups stay visible.
+    """
+    if len(df) <= size:
+        return df
+    fraction = size / len(df)
+    parts = []
+    for _, group in df.groupby(hue, observed=True, sort=False):
+        n = min(len(group), max(int(round(len(group) * fraction)), 50))
+        parts.append(group.sample(n=n, random_state=seed))
+    return pd.concat(parts)
+
+
+def draw_pairplot(df, features, hue, title, path, edges=None, histograms=None,
+                  sample_size=SCATTER_SAMPLE_SIZE, dense_threshold=DENSE_THRESHOLD):
+    """Pairplot that stays cheap on very large frames.
+
+    Diagonal panels are histograms from precomputed counts (``histograms``
+    from ``hue_histograms``), scatter panels show a stratified sample of at
+    most ``sample_size`` rows, and when the frame has more than
+    ``dense_threshold`` rows the lower-triangle panels show a hexbin of all
+    rows instead of points.
+    """
+    plt, sns = load_plotting()
+    if edges is None:
+        edges = shared_bin_edges(df, features)
+    if histograms is None:
+        histograms = hue_histograms(df, features, hue, edges)
+
+    levels = list(histograms)
+    colors = dict(zip(levels, sns.color_palette('viridis', len(levels))))
+    sample = stratified_sample(df[features + [hue]], hue, sample_size)
+    dense = len(df) > dense_threshold
+
+    k = len(features)
+    fig, axes = plt.subplots(k, k, figsize=(2.5 * k, 2.5 * k), sharex='col', squeeze=False)
+    for i, y_feature in enumerate(features):
+        for j, x_feature in enumerate(features):
+            ax = axes[i, j]
+            if i == j:
+                for level in levels:
+                    ax.stairs(histograms[level][x_feature], edges[x_feature],
+                              color=colors[level], fill=True, alpha=0.4)
+                ax.set_yticks([])
+            elif dense and i > j:
+                x = df[x_feature].to_numpy(dtype=float, na_value=np.nan)
+                y = df[y_feature].to_numpy(dtype=float, na_value=np.nan)
+                present = ~np.isnan(x) & ~np.isnan(y)
+                ax.hexbin(x[present], y[present], gridsize=40, cmap='viridis',
+                          mincnt=1, bins='log')
+            else:
+                for level in levels:
+                    points = sample[sample[hue] == level]
+                    ax.scatter(points[x_feature], points[y_feature], s=8, alpha=0.6,
+                               color=colors[level], linewidths=0)
+            if i == k - 1:
+                ax.set_xlabel(x_feature)
+            if j == 0:
+                ax.set_ylabel(y_feature)
+
+    handles = [plt.Line2D([], [], marker='o', linestyle='', color=colors[level], label=str(level))
+               for level in levels]
+    fig.legend(handles=handles, title=hue, loc='center left', bbox_to_anchor=(1.0, 0.5))
+    fig.suptitle(title, y=1.02, fontsize=16)
+    fig.tight_layout()
+    # The legend and title sit outside the axes, so always crop to the content
+    savefig(path, fig=fig, bbox_inches='tight')
+    plt.close(fig)
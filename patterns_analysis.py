@@ -1,149 +1,244 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import argparse
+import hashlib
+import json
 import os
 
-# Set style for matplotlib plots
-plt.style.use('seaborn-v0_8-whitegrid')
-sns.set_palette('viridis')
-plt.rcParams['figure.figsize'] = (12, 8)
+from backends import add_backend_argument, resolve_backend
+from data_loader import add_data_arguments, load_titanic, require_rows
+from figure_pool import load_plotting, pooled_figure
+from html_export import report_sizes, write_html
+from incremental import load_state, new_rows, save_state, state_path
+from output_cache import OutputCache
+from outliers import DEFAULT_THRESHOLDS, detect_outliers, sketch_outliers
+from profiling import profile_stage, write_report
+from render_settings import add_render_argument, savefig, set_render_profile
+from streaming_stats import NumericAccumulator
+from survival_aggregates import SurvivalCounts, add_group_columns, survival_rate, survival_tables
+
+# Mergeable statistics behind the report, for --incremental runs
+STATE_PATH = state_path('analysis/patterns_and_anomalies.txt')
+
+parser = argparse.ArgumentParser(description='Survival patterns, trends and anomalies')
+parser.add_argument('--force', action='store_true',
+                    help='re-render charts even if their inputs are unchanged')
+parser.add_argument('--outlier-method', choices=sorted(DEFAULT_THRESHOLDS), default='iqr',
+                    help='rule used to flag outliers in the numeric features')
+parser.add_argument('--incremental', action='store_true',
+                    help=f'update the group sums and sketches saved in {STATE_PATH} with the '
+                         'rows appended to the CSV since the last run instead of recomputing '
+                         'them from every row')
+parser.add_argument('--new-rows', action='store_true',
+                    help='with --incremental, --data holds only new rows to add to the '
+                         'saved state')
+parser.add_argument('--rebuild', action='store_true',
+                    help='with --incremental, discard the saved state and start over')
+parser.add_argument('--chunksize', type=int, default=1_000_000,
+                    help='rows per chunk in incremental mode')
+add_backend_argument(parser)
+add_data_arguments(parser)
+add_render_argument(parser)
+args = parser.parse_args()
+set_render_profile(args.render_profile)
+backend = resolve_backend(args.backend)
 
 # Create directory for saving analysis
 if not os.path.exists('analysis'):
     os.makedirs('analysis')
 
-# Load the dataset
-df = pd.read_csv('titanic.csv')
+# Columns the analysis uses, the groupings it reports on (and the class/gender
+# interaction) and the numeric features checked for outliers
+columns = ['Survived', 'Pclass', 'Sex', 'Age', 'SibSp', 'Parch', 'Fare', 'Embarked']
+groupings = ['Sex', 'Pclass', 'AgeGroup', 'Embarked', 'FamilySize',
+             ('Pclass', 'Sex'), ('Sex', 'Pclass', 'Survived')]
+numeric_features = ['Age', 'Fare', 'SibSp', 'Parch']
+
+if args.incremental:
+    # Merge only the new rows into the saved group sums and sketches; every
+    # table, chart and outlier figure is then computed from the merged state
+    state = None if args.rebuild else load_state(STATE_PATH)
+    batches, position, resume = new_rows(args.data, state, columns=columns, filters=args.where,
+                                         batch_size=args.chunksize, delta=args.new_rows)
+    with profile_stage('survival_tables'):
+        if resume:
+            counts = SurvivalCounts.from_dict(state['survival'])
+            accumulators = {feature: NumericAccumulator.from_dict(state['numeric'][feature])
+                            for feature in numeric_features}
+            dtypes = state['dtypes']
+        else:
+            counts = SurvivalCounts(groupings)
+            accumulators = {feature: NumericAccumulator() for feature in numeric_features}
+            dtypes = {}
+        added = 0
+        for chunk in batches:
+            added += len(chunk)
+            add_group_columns(chunk)
+            counts.update(chunk)
+            for feature in numeric_features:
+                accumulators[feature].update(chunk[feature])
+                dtypes[feature] = str(chunk[feature].dtype)
+        require_rows(counts.n, args.where)
+        survival = counts.tables()
+    merged = {'survival': counts.to_dict(), 'dtypes': dtypes,
+              'numeric': {feature: acc.to_dict() for feature, acc in accumulators.items()}}
+    save_state(STATE_PATH, {'source': position, 'filters': args.where, **merged})
+    print(f"Added {added} rows to the saved state ({counts.n} rows in total)")
+    # Every chart is drawn from the merged state, so a hash of it stands in
+    # for the column hashes
+    merged_key = hashlib.sha1(json.dumps(merged, sort_keys=True).encode()).hexdigest()
+    cache = OutputCache(None, __file__, force=args.force, data_key=merged_key)
+else:
+    # Load the dataset, with only the columns the analysis uses
+    df = load_titanic(args.data, columns=columns, filters=args.where)
+    require_rows(len(df), args.where)
+
+    # Charts are only redrawn when their data, parameters or this script changed
+    cache = OutputCache(df, __file__, force=args.force)
 
-# Convert categorical variables to numeric for analysis
-df_encoded = df.copy()
-df_encoded['Sex'] = df_encoded['Sex'].map({'male': 0, 'female': 1})
-df_encoded['Embarked'] = df_encoded['Embarked'].map({'C': 0, 'Q': 1, 'S': 2})
+    # Derived grouping columns: age groups and family size (SibSp + Parch)
+    add_group_columns(df)
+
+    # Aggregate survivors and counts for every grouping in one pass; the
+    # report and the charts both use these tables
+    with profile_stage('survival_tables'):
+        survival = survival_tables(df, groupings, backend=backend)
 
 # Analyze survival rates by different features
 print("Analyzing survival patterns...")
 
 # Overall survival rate
-overall_survival = df['Survived'].mean() * 100
+overall_survival = (counts.rate if args.incremental else df['Survived'].mean()) * 100
 print(f"Overall survival rate: {overall_survival:.2f}%")
 
 # Survival by gender
-survival_by_gender = df.groupby('Sex')['Survived'].mean() * 100
+survival_by_gender = survival_rate(survival['Sex'])
 print("\nSurvival rate by gender:")
 print(survival_by_gender)
 
 # Survival by class
-survival_by_class = df.groupby('Pclass')['Survived'].mean() * 100
+survival_by_class = survival_rate(survival['Pclass'])
 print("\nSurvival rate by passenger class:")
 print(survival_by_class)
 
 # Survival by age groups
-df['AgeGroup'] = pd.cut(df['Age'], bins=[0, 12, 18, 35, 60, 100], 
-                        labels=['Child', 'Teenager', 'Young Adult', 'Adult', 'Senior'])
-survival_by_age = df.groupby('AgeGroup')['Survived'].mean() * 100
+survival_by_age = survival_rate(survival['AgeGroup'])
 print("\nSurvival rate by age group:")
 print(survival_by_age)
 
 # Survival by embarkation point
-survival_by_embarked = df.groupby('Embarked')['Survived'].mean() * 100
+survival_by_embarked = survival_rate(survival['Embarked'])
 print("\nSurvival rate by embarkation point:")
 print(survival_by_embarked)
 
-# Survival by family size (SibSp + Parch)
-df['FamilySize'] = df['SibSp'] + df['Parch']
-survival_by_family = df.groupby('FamilySize')['Survived'].mean() * 100
+# Survival by family size
+survival_by_family = survival_rate(survival['FamilySize'])
 print("\nSurvival rate by family size:")
 print(survival_by_family)
 
 # Identify outliers in numeric features
 print("\nIdentifying outliers in numeric features...")
-numeric_features = ['Age', 'Fare', 'SibSp', 'Parch']
+with profile_stage('outliers'):
+    if args.incremental:
+        outlier_summary = sketch_outliers(accumulators, method=args.outlier_method, dtypes=dtypes)
+    else:
+        outlier_summary, _ = detect_outliers(df, numeric_features, method=args.outlier_method,
+                                             backend=backend)
 
-for feature in numeric_features:
-    Q1 = df[feature].quantile(0.25)
-    Q3 = df[feature].quantile(0.75)
-    IQR = Q3 - Q1
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
-    outliers = df[(df[feature] < lower_bound) | (df[feature] > upper_bound)]
+for feature, row in outlier_summary.iterrows():
     print(f"\nOutliers in {feature}:")
-    print(f"Number of outliers: {len(outliers)}")
-    print(f"Percentage of outliers: {len(outliers) / len(df) * 100:.2f}%")
-    print(f"Range of outliers: {outliers[feature].min()} to {outliers[feature].max()}")
+    print(f"Number of outliers: {row['count']}")
+    print(f"Percentage of outliers: {row['percentage']:.2f}%")
+    print(f"Range of outliers: {row['min']} to {row['max']}")
 
 # Create visualizations for identified patterns
 
+# Draw survival rates with their Wilson 95% intervals from a precomputed table.
+# A two-level table is drawn as grouped bars, one colour per inner level.
+def plot_survival_rates(table, title, xlabel, path, figsize=(10, 6)):
+    plt, sns = load_plotting()
+    with pooled_figure(figsize):
+        if table.index.nlevels == 1:
+            x = np.arange(len(table))
+            errors = [table['rate'] - table['ci_low'], table['ci_high'] - table['rate']]
+            plt.bar(x, table['rate'], color=sns.color_palette('viridis', len(table)),
+                    yerr=errors, capsize=4)
+            plt.xticks(x, [str(label) for label in table.index])
+        else:
+            groups = table.index.get_level_values(0).unique()
+            hues = table.index.get_level_values(1).unique()
+            width = 0.8 / len(hues)
+            colors = sns.color_palette('viridis', len(hues))
+            for i, hue in enumerate(hues):
+                part = table.xs(hue, level=1).reindex(groups)
+                x = np.arange(len(groups)) - 0.4 + width * (i + 0.5)
+                errors = [part['rate'] - part['ci_low'], part['ci_high'] - part['rate']]
+                plt.bar(x, part['rate'], width=width, color=colors[i], yerr=errors,
+                        capsize=4, label=str(hue))
+            plt.xticks(np.arange(len(groups)), [str(label) for label in groups])
+            plt.legend(title=table.index.names[1])
+        plt.title(title, fontsize=16)
+        plt.xlabel(xlabel, fontsize=12)
+        plt.ylabel('Survival Rate', fontsize=12)
+        plt.grid(True, alpha=0.3)
+        savefig(path)
+
 # Survival by gender visualization
-plt.figure(figsize=(10, 6))
-sns.barplot(x='Sex', y='Survived', data=df, palette='viridis')
-plt.title('Survival Rate by Gender', fontsize=16)
-plt.xlabel('Gender', fontsize=12)
-plt.ylabel('Survival Rate', fontsize=12)
-plt.grid(True, alpha=0.3)
-plt.savefig('analysis/survival_by_gender.png', dpi=300, bbox_inches='tight')
-plt.close()
+if cache.stale('analysis/survival_by_gender.png', ['Sex', 'Survived']):
+    with profile_stage('figure:survival_by_gender'):
+        plot_survival_rates(survival['Sex'], 'Survival Rate by Gender', 'Gender',
+                            'analysis/survival_by_gender.png')
 
 # Survival by class visualization
-plt.figure(figsize=(10, 6))
-sns.barplot(x='Pclass', y='Survived', data=df, palette='viridis')
-plt.title('Survival Rate by Passenger Class', fontsize=16)
-plt.xlabel('Passenger Class', fontsize=12)
-plt.ylabel('Survival Rate', fontsize=12)
-plt.grid(True, alpha=0.3)
-plt.savefig('analysis/survival_by_class.png', dpi=300, bbox_inches='tight')
-plt.close()
+if cache.stale('analysis/survival_by_class.png', ['Pclass', 'Survived']):
+    with profile_stage('figure:survival_by_class'):
+        plot_survival_rates(survival['Pclass'], 'Survival Rate by Passenger Class', 'Passenger Class',
+                            'analysis/survival_by_class.png')
 
 # Survival by age group visualization
-plt.figure(figsize=(12, 6))
-sns.barplot(x='AgeGroup', y='Survived', data=df, palette='viridis')
-plt.title('Survival Rate by Age Group', fontsize=16)
-plt.xlabel('Age Group', fontsize=12)
-plt.ylabel('Survival Rate', fontsize=12)
-plt.grid(True, alpha=0.3)
-plt.savefig('analysis/survival_by_age.png', dpi=300, bbox_inches='tight')
-plt.close()
+if cache.stale('analysis/survival_by_age.png', ['AgeGroup', 'Survived']):
+    with profile_stage('figure:survival_by_age'):
+        plot_survival_rates(survival['AgeGroup'], 'Survival Rate by Age Group', 'Age Group',
+                            'analysis/survival_by_age.png', figsize=(12, 6))
 
 # Survival by embarkation point visualization
-plt.figure(figsize=(10, 6))
-sns.barplot(x='Embarked', y='Survived', data=df, palette='viridis')
-plt.title('Survival Rate by Embarkation Point', fontsize=16)
-plt.xlabel('Embarkation Point (C=Cherbourg, Q=Queenstown, S=Southampton)', fontsize=12)
-plt.ylabel('Survival Rate', fontsize=12)
-plt.grid(True, alpha=0.3)
-plt.savefig('analysis/survival_by_embarked.png', dpi=300, bbox_inches='tight')
-plt.close()
+if cache.stale('analysis/survival_by_embarked.png', ['Embarked', 'Survived']):
+    with profile_stage('figure:survival_by_embarked'):
+        plot_survival_rates(survival['Embarked'], 'Survival Rate by Embarkation Point',
+                            'Embarkation Point (C=Cherbourg, Q=Queenstown, S=Southampton)',
+                            'analysis/survival_by_embarked.png')
 
 # Survival by family size visualization
-plt.figure(figsize=(12, 6))
-family_survival = df.groupby('FamilySize')['Survived'].mean().reset_index()
-sns.barplot(x='FamilySize', y='Survived', data=family_survival, palette='viridis')
-plt.title('Survival Rate by Family Size', fontsize=16)
-plt.xlabel('Family Size (SibSp + Parch)', fontsize=12)
-plt.ylabel('Survival Rate', fontsize=12)
-plt.grid(True, alpha=0.3)
-plt.savefig('analysis/survival_by_family_size.png', dpi=300, bbox_inches='tight')
-plt.close()
+if cache.stale('analysis/survival_by_family_size.png', ['FamilySize', 'Survived']):
+    with profile_stage('figure:survival_by_family_size'):
+        plot_survival_rates(survival['FamilySize'], 'Survival Rate by Family Size',
+                            'Family Size (SibSp + Parch)', 'analysis/survival_by_family_size.png',
+                            figsize=(12, 6))
 
 # Class and gender combined effect on survival
-plt.figure(figsize=(12, 6))
-sns.barplot(x='Pclass', y='Survived', hue='Sex', data=df, palette='viridis')
-plt.title('Survival Rate by Class and Gender', fontsize=16)
-plt.xlabel('Passenger Class', fontsize=12)
-plt.ylabel('Survival Rate', fontsize=12)
-plt.grid(True, alpha=0.3)
-plt.savefig('analysis/survival_by_class_and_gender.png', dpi=300, bbox_inches='tight')
-plt.close()
+if cache.stale('analysis/survival_by_class_and_gender.png', ['Pclass', 'Sex', 'Survived']):
+    with profile_stage('figure:survival_by_class_and_gender'):
+        plot_survival_rates(survival[('Pclass', 'Sex')], 'Survival Rate by Class and Gender',
+                            'Passenger Class', 'analysis/survival_by_class_and_gender.png',
+                            figsize=(12, 6))
 
 # Interactive visualization of survival patterns
-fig = px.sunburst(df, path=['Sex', 'Pclass', 'Survived'], 
-                  color='Survived', 
-                  color_continuous_scale='viridis',
-                  title='Hierarchical View of Survival Patterns')
-fig.write_html('analysis/survival_patterns_sunburst.html')
+if cache.stale('analysis/survival_patterns_sunburst.html', ['Sex', 'Pclass', 'Survived']):
+    with profile_stage('figure:survival_patterns_sunburst'):
+        import plotly.express as px
+        # Feed plotly the per-group counts rather than one record per passenger
+        sunburst_counts = survival[('Sex', 'Pclass', 'Survived')]['count'].reset_index()
+        fig = px.sunburst(sunburst_counts, path=['Sex', 'Pclass', 'Survived'], 
+                          values='count',
+                          color='Survived', 
+                          color_continuous_scale='viridis',
+                          title='Hierarchical View of Survival Patterns')
+        write_html(fig, 'analysis/survival_patterns_sunburst.html')
+
+cache.save()
+
+print("\nInteractive exports:")
+report_sizes(['analysis/survival_patterns_sunburst.html'])
 
 # Save analysis results to file
 with open('analysis/patterns_and_anomalies.txt', 'w') as f:
@@ -178,17 +273,11 @@ with open('analysis/patterns_and_anomalies.txt', 'w') as f:
     f.write("- Passengers traveling alone or with very large families had lower survival rates\n\n")
     
     f.write("## Outliers and Anomalies\n")
-    for feature in numeric_features:
-        Q1 = df[feature].quantile(0.25)
-        Q3 = df[feature].quantile(0.75)
-        IQR = Q3 - Q1
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
-        outliers = df[(df[feature] < lower_bound) | (df[feature] > upper_bound)]
+    for feature, row in outlier_summary.iterrows():
         f.write(f"### Outliers in {feature}\n")
-        f.write(f"- Number of outliers: {len(outliers)}\n")
-        f.write(f"- Percentage of outliers: {len(outliers) / len(df) * 100:.2f}%\n")
-        f.write(f"- Range of outliers: {outliers[feature].min()} to {outliers[feature].max()}\n\n")
+        f.write(f"- Number of outliers: {row['count']}\n")
+        f.write(f"- Percentage of outliers: {row['percentage']:.2f}%\n")
+        f.write(f"- Range of outliers: {row['min']} to {row['max']}\n\n")
     
     f.write("## Key Trends and Patterns\n")
     f.write("1. Gender was the strongest predictor of survival, with women having much higher survival rates\n")
@@ -198,4 +287,5 @@ with open('analysis/patterns_and_anomalies.txt', 'w') as f:
     f.write("5. The port of embarkation correlated with survival rates\n")
     f.write("6. There is a significant interaction effect between gender and class\n")
 
+write_report(__file__)
 print("Analysis of patterns, trends, and anomalies completed and saved to 'analysis/patterns_and_anomalies.txt'")
@@ -0,0 +1,171 @@
+import cProfile
+import csv
+import functools
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Directory receiving the timing reports and cProfile dumps
+TIMINGS_DIR = 'timings'
+
+# Set EDA_CPROFILE=1 to also dump a cProfile file for every profiled stage
+CPROFILE = os.environ.get('EDA_CPROFILE', '') not in ('', '0')
+
+# Linux counters of this process's resident memory; writing 5 to
+# clear_refs restarts the peak (VmHWM) from the current size
+PROC_STATUS = '/proc/self/status'
+PROC_CLEAR_REFS = '/proc/self/clear_refs'
+
+REPORT_FIELDS = ['script', 'stage', 'wall_s', 'cpu_s', 'peak_rss_increase_mb', 'output_bytes']
+
+# Records collected by this process
+_records = []
+
+# Highest resident memory seen so far by each stage currently open, in MB
+_open_peaks = []
+
+
+def _cpu_seconds():
+    """CPU time of this process plus any finished child processes."""
+    if resource is None:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _memory_mb():
+    """``(current, peak)`` resident memory of this process in MB, or None off Linux."""
+    try:
+        with open(PROC_STATUS) as f:
+            fields = dict(line.split(':', 1) for line in f)
+    except OSError:
+        return None
+    return tuple(int(fields[key].split()[0]) / 1024 for key in ('VmRSS', 'VmHWM'))
+
+
+def _reset_peak():
+    """Restart the peak memory counter at the current size; False if not allowed."""
+    try:
+        with open(PROC_CLEAR_REFS, 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+
+def _raise_open_peaks(peak):
+    for i, open_peak in enumerate(_open_peaks):
+        _open_peaks[i] = max(open_peak, peak)
+
+
+@contextmanager
+def profile_stage(stage, outputs=()):
+    """Record wall time, CPU time, memory growth and output size of a block.
+
+    Memory is the highest resident size reached during the block minus the
+    size at its start, i.e. what the block itself added at its peak. The
+    process-wide peak is reset when the block starts, so it is measured on
+    Linux only; enclosing blocks still see the peaks of nested ones.
+    ``outputs`` lists the files the block writes; their sizes are summed
+    once it finishes. With ``EDA_CPROFILE=1`` a cProfile dump of the block
+    is written to ``timings/``.
+    """
+    profiler = cProfile.Profile() if CPROFILE else None
+    memory_start = _memory_mb()
+    if memory_start is not None:
+        # Keep the peak reached so far for the enclosing blocks
+        _raise_open_peaks(memory_start[1])
+        if not _reset_peak():
+            memory_start = None
+    _open_peaks.append(memory_start[0] if memory_start is not None else 0.0)
+    wall_start = time.perf_counter()
+    cpu_start = _cpu_seconds()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        wall_s = time.perf_counter() - wall_start
+        cpu_s = _cpu_seconds() - cpu_start
+        peak = _open_peaks.pop()
+        memory_end = _memory_mb() if memory_start is not None else None
+        increase = None
+        if memory_end is not None:
+            peak = max(peak, memory_end[1])
+            _raise_open_peaks(peak)
+            increase = peak - memory_start[0]
+        record = {
+            'stage': stage,
+            'wall_s': wall_s,
+            'cpu_s': cpu_s,
+            'peak_rss_increase_mb': increase,
+            'output_bytes': sum(os.path.getsize(path) for path in outputs if os.path.exists(path)),
+        }
+        _records.append(record)
+        if profiler is not None:
+            os.makedirs(TIMINGS_DIR, exist_ok=True)
+            name = re.sub(r'[^\w.-]+', '_', stage)
+            profiler.dump_stats(os.path.join(TIMINGS_DIR, f'{name}.{os.getpid()}.prof'))
+
+
+def profiled(stage=None):
+    """Decorator form of ``profile_stage``; defaults to the function name."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_stage(stage or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def take_records():
+    """Return and clear the records collected so far (used by worker processes)."""
+    records = list(_records)
+    _records.clear()
+    return records
+
+
+def add_records(records):
+    """Merge records collected in another process."""
+    _records.extend(records)
+
+
+def write_report(script):
+    """Write this process's records to ``timings/<script>.json`` and ``.csv``."""
+    name = os.path.splitext(os.path.basename(script))[0]
+    rows = [{'script': name, **record} for record in _records]
+    os.makedirs(TIMINGS_DIR, exist_ok=True)
+    with open(os.path.join(TIMINGS_DIR, f'{name}.json'), 'w') as f:
+        json.dump(rows, f, indent=1)
+    with open(os.path.join(TIMINGS_DIR, f'{name}.csv'), 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
+
+
+def merge_reports(scripts, name='pipeline'):
+    """Concatenate the reports of ``scripts`` into ``timings/<name>.csv``."""
+    rows = []
+    for script in scripts:
+        path = os.path.join(TIMINGS_DIR, f'{script}.json')
+        if os.path.exists(path):
+            with open(path) as f:
+                rows.extend(json.load(f))
+    os.makedirs(TIMINGS_DIR, exist_ok=True)
+    with open(os.path.join(TIMINGS_DIR, f'{name}.csv'), 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
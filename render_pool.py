@@ -0,0 +1,81 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from profiling import add_records, profile_stage, take_records
+
+# Read-only data shared with the rendering workers. With the fork start
+# method children inherit it from the parent without any copying or pickling.
+_shared_data = None
+
+
+def _init_worker(data=None, source=None):
+    """Prepare a worker process: headless backend and the shared data."""
+    global _shared_data
+    import matplotlib
+    matplotlib.use('Agg')
+    # Forked workers inherit the parent's records; only report their own
+    take_records()
+    if source is not None:
+        from data_loader import load_titanic
+        _shared_data = load_titanic(**source)
+    elif data is not None:
+        _shared_data = data
+
+
+def _job_name(func, args):
+    return ':'.join([func.__name__] + [str(arg) for arg in args])
+
+
+def _run_job(job):
+    # Worker processes hand their profiling records back with the result
+    func, args = job
+    with profile_stage(_job_name(func, args)):
+        result = func(_shared_data, *args)
+    return result, take_records()
+
+
+def default_jobs():
+    """Number of worker processes to use when none is requested."""
+    return os.cpu_count() or 1
+
+
+def run_jobs(jobs, data, n_jobs=None, source=None):
+    """Render independent figure jobs, in parallel when ``n_jobs`` > 1.
+
+    Each job is a ``(func, args)`` tuple and is executed as
+    ``func(data, *args)``; the return values are given back in job order.
+    Job functions must be defined at module level so they can be sent to
+    the worker processes. ``source`` holds the ``load_titanic`` arguments
+    that produced ``data``; workers that cannot be forked load it themselves
+    (memory-mapped for an Arrow file) instead of each unpickling a copy.
+    """
+    global _shared_data
+    jobs = list(jobs)
+    n_jobs = min(n_jobs or default_jobs(), len(jobs))
+    if n_jobs <= 1:
+        results = []
+        for func, args in jobs:
+            with profile_stage(_job_name(func, args)):
+                results.append(func(data, *args))
+        return results
+
+    _shared_data = data
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+        initargs = ()
+    else:
+        # Without fork every worker receives its own pickled copy once,
+        # unless it can load the data from its source
+        context = multiprocessing.get_context()
+        initargs = (None, source) if source is not None else (data,)
+    try:
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context,
+                                 initializer=_init_worker, initargs=initargs) as pool:
+            results = []
+            for result, records in pool.map(_run_job, jobs):
+                add_records(records)
+                results.append(result)
+            return results
+    finally:
+        _shared_data = None
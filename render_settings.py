@@ -0,0 +1,73 @@
+import os
+
+from profiling import profile_stage
+
+# Environment variable holding the rendering profile; child processes and
+# render workers inherit it
+PROFILE_ENV = 'EDA_RENDER_PROFILE'
+
+# savefig settings per rendering profile. 'preview' is for quick iterations
+# and CI: low resolution, no tight-bbox pass and light PNG compression.
+# 'publication' is the original 300 dpi output; 'svg' and 'pdf' write vector
+# files instead of PNGs.
+RENDER_PROFILES = {
+    'preview': {'format': 'png', 'dpi': 72, 'bbox_inches': None,
+                'pil_kwargs': {'compress_level': 1}},
+    'publication': {'format': 'png', 'dpi': 300, 'bbox_inches': 'tight'},
+    'svg': {'format': 'svg', 'bbox_inches': 'tight'},
+    'pdf': {'format': 'pdf', 'bbox_inches': 'tight'},
+}
+DEFAULT_PROFILE = 'publication'
+
+_active = os.environ.get(PROFILE_ENV) or DEFAULT_PROFILE
+if _active not in RENDER_PROFILES:
+    raise ValueError(f"{PROFILE_ENV}={_active!r} is not one of {sorted(RENDER_PROFILES)}")
+
+
+def add_render_argument(parser):
+    """Add the ``--render-profile`` option to a script's argument parser."""
+    parser.add_argument('--render-profile', choices=list(RENDER_PROFILES), default=_active,
+                        help=f'figure resolution and format (default: {_active}; '
+                             f'also settable with {PROFILE_ENV})')
+
+
+def set_render_profile(name):
+    """Select the rendering profile for this process and the ones it starts."""
+    global _active
+    if name not in RENDER_PROFILES:
+        raise ValueError(f"Unknown render profile {name!r}; expected one of {sorted(RENDER_PROFILES)}")
+    _active = name
+    os.environ[PROFILE_ENV] = name
+
+
+def render_profile():
+    """Name of the active rendering profile."""
+    return _active
+
+
+def figure_path(path):
+    """Map a ``.png`` output path to the active profile's file format."""
+    stem, ext = os.path.splitext(path)
+    if ext != '.png':
+        return path
+    return f"{stem}.{RENDER_PROFILES[_active]['format']}"
+
+
+def savefig(path, fig=None, **kwargs):
+    """Save ``fig`` (default: the current figure) with the active profile.
+
+    ``path`` is given as ``.png`` and is renamed for vector profiles; keyword
+    arguments override the profile's settings, e.g. ``bbox_inches='tight'``
+    for figures with legends or titles outside the axes. Returns the path
+    actually written.
+    """
+    if fig is None:
+        import matplotlib.pyplot as plt
+        fig = plt.gcf()
+    path = figure_path(path)
+    options = {**RENDER_PROFILES[_active], **kwargs}
+    if options['format'] != 'png':
+        options.pop('pil_kwargs', None)
+    with profile_stage(f'savefig:{path}', outputs=[path]):
+        fig.savefig(path, **options)
+    return path
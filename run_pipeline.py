@@ -0,0 +1,237 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from data_loader import (CACHE_DIR, DATA_PATH, input_format, load_titanic, materialize_arrow,
+                         parse_filter)
+from profiling import TIMINGS_DIR, merge_reports
+from render_settings import add_render_argument, figure_path, render_profile, set_render_profile
+
+# Modules shared by the stage scripts; a change to any of them makes every
+# stage out of date
+SHARED_MODULES = ['data_loader.py', 'output_cache.py', 'render_pool.py', 'html_export.py',
+                  'profiling.py', 'render_settings.py', 'figure_pool.py']
+
+# Rendering profile and data options each stage last completed with
+STATE_PATH = os.path.join(CACHE_DIR, 'pipeline.json')
+
+numeric_features = ['Age', 'Fare', 'SibSp', 'Parch']
+
+# Every stage of the EDA with the files it reads and writes. A stage runs
+# once all stages in ``after`` have finished; stages without a path
+# between them run concurrently. ``cached`` stages skip outputs whose
+# fingerprint is unchanged and accept ``--force`` to redraw them all.
+STAGES = {
+    'eda': {
+        'script': 'eda.py',
+        'inputs': [DATA_PATH, 'streaming_stats.py', 'incremental.py', 'backends.py'],
+        'outputs': ['summary_statistics.csv'],
+        'after': [],
+        'cached': False,
+    },
+    'visualizations': {
+        'script': 'visualizations.py',
+        'inputs': [DATA_PATH, 'boxplot_sketches.py', 'histograms.py', 'streaming_stats.py'],
+        'outputs': ([f'plots/histograms/{feature}_histogram.png' for feature in numeric_features]
+                    + [f'plots/boxplots/{feature}_{kind}boxplot.png' for feature in numeric_features
+                       for kind in ['', 'by_survival_', 'by_class_', 'by_gender_']]
+                    + ['plots/combined_distributions.png', 'plots/combined_boxplots.png']),
+        'after': [],
+        'cached': True,
+    },
+    'feature_relationships': {
+        'script': 'feature_relationships.py',
+        'inputs': [DATA_PATH, 'pairplots.py', 'encoding.py', 'correlations.py'],
+        'outputs': ['plots/correlations/correlation_matrix.png',
+                    'plots/correlations/pairplot.png',
+                    'plots/correlations/pairplot_by_class.png',
+                    'plots/correlations/pairplot_by_gender.png',
+                    'plots/correlations/age_vs_fare_by_survival.png',
+                    'plots/correlations/survival_correlation.png'],
+        'after': [],
+        'cached': True,
+    },
+    'patterns_analysis': {
+        'script': 'patterns_analysis.py',
+        'inputs': [DATA_PATH, 'survival_aggregates.py', 'outliers.py', 'streaming_stats.py',
+                   'incremental.py', 'backends.py'],
+        'outputs': ['analysis/patterns_and_anomalies.txt'],
+        'after': [],
+        'cached': True,
+    },
+    'feature_inferences': {
+        'script': 'feature_inferences.py',
+        'inputs': [DATA_PATH, 'correlations.py', 'encoding.py', 'inference_report.py',
+                   'inference_template.md', 'survival_aggregates.py', 'outliers.py'],
+        'outputs': ['inferences/feature_inferences.md', 'inferences/feature_importance.png'],
+        'after': [],
+        'cached': False,
+    },
+}
+
+
+def is_up_to_date(stage):
+    """True when every output exists and is newer than every input."""
+    inputs = stage['inputs'] + [stage['script']] + SHARED_MODULES
+    outputs = [figure_path(path) for path in stage['outputs']]
+    if not all(os.path.exists(path) for path in outputs):
+        return False
+    newest_input = max(os.path.getmtime(path) for path in inputs if os.path.exists(path))
+    return min(os.path.getmtime(path) for path in outputs) >= newest_input
+
+
+def run_stage(name, stage, script_args=()):
+    """Run one stage script in its own interpreter; return (returncode, seconds)."""
+    start = time.perf_counter()
+    log_path = os.path.join('logs', f'{name}.log')
+    with open(log_path, 'w') as log:
+        result = subprocess.run([sys.executable, stage['script'], *script_args], stdout=log,
+                                stderr=subprocess.STDOUT)
+    return result.returncode, time.perf_counter() - start
+
+
+def run_pipeline(stages, jobs=None, force=False, script_args=()):
+    """Run ``stages`` in dependency order, independent ones concurrently.
+
+    ``script_args`` (e.g. ``--data`` and ``--where``) are passed to every
+    stage script; a stage last run with other arguments is not skipped.
+    ``force`` runs every stage and passes ``--force`` to the cached ones.
+    Returns ``{name: (status, seconds)}`` with status ``'ok'``, ``'skipped'``
+    (outputs up to date), ``'failed'`` or ``'blocked'`` (a dependency failed).
+    """
+    for name, stage in stages.items():
+        unknown = [dep for dep in stage['after'] if dep not in stages]
+        if unknown:
+            raise ValueError(f"Stage {name!r} depends on unknown stage(s): {unknown}")
+
+    os.makedirs('logs', exist_ok=True)
+    signature = [render_profile(), *script_args]
+    state = {}
+    if os.path.exists(STATE_PATH):
+        with open(STATE_PATH) as f:
+            state = json.load(f)
+    results = {}
+    pending = dict(stages)
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                statuses = [results.get(dep, (None,))[0] for dep in stage['after']]
+                if any(status in ('failed', 'blocked') for status in statuses):
+                    results[name] = ('blocked', 0.0)
+                    print(f"[{name}] blocked by a failed dependency")
+                    del pending[name]
+                elif all(status in ('ok', 'skipped') for status in statuses):
+                    del pending[name]
+                    if not force and state.get(name) == signature and is_up_to_date(stage):
+                        results[name] = ('skipped', 0.0)
+                        print(f"[{name}] up to date, skipped")
+                        continue
+                    print(f"[{name}] started")
+                    args = list(script_args)
+                    if force and stage['cached']:
+                        args.append('--force')
+                    running[pool.submit(run_stage, name, stage, args)] = name
+            if not running:
+                if pending:
+                    raise ValueError(f"Dependency cycle between stages: {sorted(pending)}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                returncode, seconds = future.result()
+                status = 'ok' if returncode == 0 else 'failed'
+                results[name] = (status, seconds)
+                if status == 'ok':
+                    state[name] = signature
+                print(f"[{name}] {status} in {seconds:.2f}s (log: logs/{name}.log)")
+
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    tmp_path = f'{STATE_PATH}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, STATE_PATH)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the EDA stages as a dependency graph')
+    parser.add_argument('stages', nargs='*', metavar='stage',
+                        help=f"stages to run, from {', '.join(STAGES)} (default: all); "
+                             "their dependencies are included")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='maximum number of stages running at once (default: CPU count)')
+    parser.add_argument('--force', action='store_true',
+                        help='run stages even when their outputs are up to date, and redraw '
+                             'figures their output caches would skip')
+    parser.add_argument('--data', default=DATA_PATH,
+                        help='input file passed to every stage: CSV, Parquet or Arrow/Feather '
+                             f'(default: {DATA_PATH})')
+    parser.add_argument('--where', action='append', default=[], metavar='FILTER',
+                        help="row filter passed to every stage, e.g. 'Pclass=1'; repeat to combine")
+    parser.add_argument('--arrow', action='store_true',
+                        help='write the typed dataset once to an Arrow file that every stage '
+                             'and render worker memory-maps, instead of each loading a copy')
+    add_render_argument(parser)
+    parser.add_argument('--cprofile', action='store_true',
+                        help=f'also write a cProfile dump per stage block to {TIMINGS_DIR}/')
+    args = parser.parse_args()
+    # Inherited by the stage subprocesses through the environment
+    set_render_profile(args.render_profile)
+    if args.cprofile:
+        # Inherited by the stage subprocesses
+        os.environ['EDA_CPROFILE'] = '1'
+    for text in args.where:
+        try:
+            parse_filter(text)
+        except ValueError as exc:
+            parser.error(str(exc))
+    unknown = [name for name in args.stages if name not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    # Pull in the dependencies of the requested stages
+    selected = set(args.stages or STAGES)
+    queue = list(selected)
+    while queue:
+        for dep in STAGES[queue.pop()]['after']:
+            if dep not in selected:
+                selected.add(dep)
+                queue.append(dep)
+    # Stages read --data in place of the default CSV
+    stages = {name: {**stage, 'inputs': [args.data if path == DATA_PATH else path
+                                         for path in stage['inputs']]}
+              for name, stage in STAGES.items() if name in selected}
+    data = args.data
+    if args.arrow:
+        # Stages read the shared memory-mapped copy instead of the input
+        start = time.perf_counter()
+        data = materialize_arrow(args.data)
+        print(f"[load] Arrow dataset {data} ready in {time.perf_counter() - start:.2f}s")
+    elif input_format(args.data) == 'csv':
+        # Parse a CSV once up front so every stage starts from the typed
+        # cache; columnar inputs are read directly by each stage
+        start = time.perf_counter()
+        load_titanic(args.data)
+        print(f"[load] typed dataset ready in {time.perf_counter() - start:.2f}s")
+    script_args = ['--data', data]
+    for text in args.where:
+        script_args += ['--where', text]
+
+    start = time.perf_counter()
+    results = run_pipeline(stages, jobs=args.jobs, force=args.force, script_args=script_args)
+
+    print("\nStage timings:")
+    for name, (status, seconds) in results.items():
+        print(f"  {name:<22} {status:<8} {seconds:8.2f}s")
+    print(f"  {'total':<22} {'':<8} {time.perf_counter() - start:8.2f}s")
+
+    rows = merge_reports([os.path.splitext(stage['script'])[0] for stage in stages.values()])
+    print(f"\nPer-block timings ({len(rows)} records): {TIMINGS_DIR}/pipeline.csv")
+
+    sys.exit(0 if all(status in ('ok', 'skipped') for status, _ in results.values()) else 1)
@@ -0,0 +1,390 @@
+import numpy as np
+import pandas as pd
+
+# Column order of ``DataFrame.describe(include='all').T`` plus the two
+# missing-value columns that eda.py appends
+SUMMARY_COLUMNS = ['count', 'unique', 'top', 'freq', 'mean', 'std', 'min',
+                   '25%', '50%', '75%', 'max', 'missing', 'missing_percentage']
+
+
+# Statistics that are values of the column (or interpolated between two)
+ORDER_STATISTICS = ['min', '25%', '50%', '75%', 'max']
+
+
+def report_frame(df):
+    """``df`` with its columns as the summary statistics are computed for them.
+
+    The typed loader stores Age and Fare as float32 and Pclass as an ordered
+    categorical. Statistics are computed in float64: float32 columns are
+    widened, and categoricals with numeric labels become those numbers, so
+    that Pclass keeps its mean, spread and quartiles. See ``as_stored`` for
+    how the float32 columns' order statistics are then written.
+    """
+    columns = {}
+    for name, series in df.items():
+        if series.dtype == np.float32:
+            columns[name] = series.astype(np.float64)
+        elif isinstance(series.dtype, pd.CategoricalDtype) and \
+                pd.api.types.is_numeric_dtype(series.cat.categories):
+            columns[name] = series.astype(np.float64)
+    return df.assign(**columns) if columns else df
+
+
+def float32_columns(df):
+    return [name for name, series in df.items() if series.dtype == np.float32]
+
+
+def as_stored(summary, columns):
+    """Write the order statistics of the float32 ``columns`` of ``summary`` as stored.
+
+    Widening a float32 value to float64 exposes its binary error (0.42 is
+    0.41999998688697815). float32 holds about 7 significant digits, so the
+    minimum, quartiles and maximum are rounded to 7 significant digits,
+    which gives back the CSV's values and the midpoints between them. Mean
+    and spread keep their float64 value.
+    """
+    columns = [name for name in columns if name in summary.index]
+    stats = [stat for stat in ORDER_STATISTICS if stat in summary.columns]
+    for name in columns:
+        for stat in stats:
+            value = summary.at[name, stat]
+            if not pd.isna(value):
+                summary.at[name, stat] = float(f'{value:.7g}')
+    return summary
+
+
+def _json_float(value):
+    # JSON has no infinities; the extrema of an empty column are stored as null
+    return float(value) if np.isfinite(value) else None
+
+
+def _json_value(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class KLLSketch:
+    """Mergeable approximate quantile sketch (KLL-style compactor stack).
+
+    Level ``h`` holds items that each stand for ``2**h`` original values.
+    While nothing has been compacted the sketch is exact, so small inputs get
+    the same quantiles as pandas.
+    """
+
+    def __init__(self, k=2048, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.n += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if items.size > self.k:
+                items = np.sort(items)
+                # Keep an odd leftover at this level so the weights stay exact
+                keep = items[:items.size % 2]
+                pairs = items[items.size % 2:]
+                promoted = pairs[self._rng.integers(2)::2]
+                self.levels[h] = keep
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    @property
+    def exact(self):
+        return len(self.levels) == 1 or all(level.size == 0 for level in self.levels[1:])
+
+    def quantile(self, q):
+        """Return the approximate value at quantile(s) ``q`` in [0, 1]."""
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        if self.exact:
+            return np.quantile(self.levels[0], q)
+
+        items, weights = self.weighted_items()
+        # Midpoint ranks give a linear interpolation comparable to pandas'
+        ranks = (np.cumsum(weights) - weights / 2) / weights.sum()
+        return np.interp(q, ranks, items)
+
+    def weighted_items(self):
+        """Sorted retained items and the number of original values each stands for."""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level.size, 2.0 ** h)
+                                  for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], weights[order]
+
+    def to_dict(self):
+        return {'k': self.k, 'n': self.n, 'levels': [level.tolist() for level in self.levels]}
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(k=state['k'])
+        sketch.n = state['n']
+        sketch.levels = [np.asarray(level, dtype=float) for level in state['levels']]
+        return sketch
+
+
+class NumericAccumulator:
+    """Running count, mean, variance (Welford/Chan), extrema and quantiles."""
+
+    def __init__(self, k=2048):
+        self.count = 0
+        self.nulls = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = KLLSketch(k)
+
+    def update(self, series):
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        present = values[~np.isnan(values)]
+        self.nulls += values.size - present.size
+        if present.size == 0:
+            return
+        # Combine the chunk's moments with the running ones in one step
+        n_b = present.size
+        mean_b = present.mean()
+        m2_b = ((present - mean_b) ** 2).sum()
+        self._combine(n_b, mean_b, m2_b)
+        self.min = min(self.min, present.min())
+        self.max = max(self.max, present.max())
+        self.sketch.update(present)
+
+    def _combine(self, n_b, mean_b, m2_b):
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta ** 2 * self.count * n_b / n
+        self.count = n
+
+    def merge(self, other):
+        self.nulls += other.nulls
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def to_dict(self):
+        return {'count': self.count, 'nulls': self.nulls, 'mean': self.mean, 'm2': self.m2,
+                'min': _json_float(self.min), 'max': _json_float(self.max),
+                'sketch': self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state):
+        acc = cls(state['sketch']['k'])
+        acc.count = state['count']
+        acc.nulls = state['nulls']
+        acc.mean = state['mean']
+        acc.m2 = state['m2']
+        acc.min = np.inf if state['min'] is None else state['min']
+        acc.max = -np.inf if state['max'] is None else state['max']
+        acc.sketch = KLLSketch.from_dict(state['sketch'])
+        return acc
+
+    def summary(self):
+        q25, q50, q75 = self.sketch.quantile([0.25, 0.5, 0.75])
+        present = self.count > 0
+        return {
+            'count': float(self.count),
+            'mean': self.mean if present else np.nan,
+            'std': self.std,
+            'min': self.min if present else np.nan,
+            '25%': q25,
+            '50%': q50,
+            '75%': q75,
+            'max': self.max if present else np.nan,
+        }
+
+
+class CategoricalAccumulator:
+    """Running count, distinct values and most frequent value of a column.
+
+    Value counts are exact until more than ``max_tracked`` distinct values
+    have been seen (e.g. a Name column). After that only the most frequent
+    values are kept, so ``top``/``freq`` become approximate and ``unique`` is
+    estimated with a k-minimum-values sketch of the value hashes.
+    """
+
+    def __init__(self, max_tracked=100_000, kmv_size=4096):
+        self.count = 0
+        self.nulls = 0
+        self.counts = pd.Series(dtype='int64')
+        self.max_tracked = max_tracked
+        self.kmv_size = kmv_size
+        self.kmv = np.empty(0, dtype=np.uint64)
+        self.truncated = False
+        self.categories = None
+
+    def update(self, series):
+        present = series.dropna()
+        self.nulls += len(series) - len(present)
+        self.count += len(present)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            self._track_categories(list(series.dtype.categories))
+        if len(present) == 0:
+            return
+        chunk_counts = present.astype(object).value_counts(sort=False)
+        hashes = pd.util.hash_array(chunk_counts.index.to_numpy(dtype=object))
+        self._add(chunk_counts, hashes)
+
+    def _add(self, chunk_counts, hashes):
+        # Keep values in first-seen order so ties for ``top`` resolve like pandas
+        self.counts = pd.concat([self.counts, chunk_counts]).groupby(level=0, sort=False).sum()
+        if len(self.kmv) == self.kmv_size:
+            hashes = hashes[hashes < self.kmv[-1]]
+        self.kmv = np.unique(np.concatenate([self.kmv, hashes]))[:self.kmv_size]
+        if len(self.counts) > self.max_tracked:
+            self.counts = self.counts.nlargest(self.max_tracked // 2)
+            self.truncated = True
+
+    def _track_categories(self, categories):
+        # pandas breaks ties for ``top`` by category order; chunks with
+        # inferred categories disagree on it, and then sorted order applies
+        if self.categories is None:
+            self.categories = categories
+        elif self.categories != categories:
+            self.categories = []
+
+    def merge(self, other):
+        self.count += other.count
+        self.nulls += other.nulls
+        self.truncated |= other.truncated
+        if other.categories is not None:
+            self._track_categories(other.categories)
+        self._add(other.counts, other.kmv)
+        return self
+
+    @property
+    def unique(self):
+        if not self.truncated:
+            return len(self.counts)
+        if len(self.kmv) < self.kmv_size:
+            return len(self.kmv)
+        # k-th smallest normalised hash estimates the density of distinct values
+        return int((self.kmv_size - 1) / (float(self.kmv[-1]) / 2.0 ** 64))
+
+    def to_dict(self):
+        return {'count': self.count, 'nulls': self.nulls,
+                'counts': [[_json_value(value), int(n)] for value, n in self.counts.items()],
+                'max_tracked': self.max_tracked, 'kmv_size': self.kmv_size,
+                'kmv': self.kmv.tolist(), 'truncated': self.truncated,
+                'categories': (None if self.categories is None
+                               else [_json_value(value) for value in self.categories])}
+
+    @classmethod
+    def from_dict(cls, state):
+        acc = cls(state['max_tracked'], state['kmv_size'])
+        acc.count = state['count']
+        acc.nulls = state['nulls']
+        values = [value for value, _ in state['counts']]
+        acc.counts = pd.Series([n for _, n in state['counts']],
+                               index=pd.Index(values, dtype=object), dtype='int64')
+        acc.kmv = np.array(state['kmv'], dtype=np.uint64)
+        acc.truncated = state['truncated']
+        acc.categories = state['categories']
+        return acc
+
+    def summary(self):
+        if len(self.counts):
+            freq = self.counts.max()
+            top = self.counts.idxmax()
+            if self.categories is not None:
+                ties = self.counts.index[self.counts == freq]
+                order = {value: i for i, value in enumerate(self.categories)}
+                top = min(ties, key=lambda value: (order.get(value, len(order)), value))
+        else:
+            top = freq = np.nan
+        return {'count': self.count, 'unique': self.unique, 'top': top, 'freq': freq}
+
+
+class StreamingSummary:
+    """One-pass equivalent of ``describe(include='all')`` plus missing counts.
+
+    Feed it DataFrame chunks with ``update`` and read the result with
+    ``to_frame``, which has the same layout eda.py writes to
+    ``summary_statistics.csv``.
+    """
+
+    def __init__(self, k=2048):
+        self.k = k
+        self.columns = {}
+        self.n_rows = 0
+        self.float32 = []
+
+    def update(self, chunk):
+        self.float32 += [name for name in float32_columns(chunk) if name not in self.float32]
+        chunk = report_frame(chunk)
+        self.n_rows += len(chunk)
+        for name, series in chunk.items():
+            if name not in self.columns:
+                is_numeric = (pd.api.types.is_numeric_dtype(series)
+                              and not isinstance(series.dtype, pd.CategoricalDtype))
+                self.columns[name] = NumericAccumulator(self.k) if is_numeric else CategoricalAccumulator()
+            self.columns[name].update(series)
+        return self
+
+    def merge(self, other):
+        self.n_rows += other.n_rows
+        for name, acc in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(acc)
+            else:
+                self.columns[name] = acc
+        return self
+
+    def to_dict(self):
+        """JSON-serialisable state; ``from_dict`` restores it for further updates."""
+        return {'k': self.k, 'n_rows': self.n_rows, 'float32': self.float32,
+                'columns': {name: {'kind': 'numeric' if isinstance(acc, NumericAccumulator)
+                                   else 'categorical', **acc.to_dict()}
+                            for name, acc in self.columns.items()}}
+
+    @classmethod
+    def from_dict(cls, state):
+        summary = cls(state['k'])
+        summary.n_rows = state['n_rows']
+        summary.float32 = state['float32']
+        for name, column in state['columns'].items():
+            kind = NumericAccumulator if column['kind'] == 'numeric' else CategoricalAccumulator
+            summary.columns[name] = kind.from_dict(column)
+        return summary
+
+    def to_frame(self):
+        rows = {}
+        for name, acc in self.columns.items():
+            row = acc.summary()
+            row['missing'] = acc.nulls
+            row['missing_percentage'] = acc.nulls / self.n_rows * 100 if self.n_rows else np.nan
+            rows[name] = row
+        summary = pd.DataFrame(list(rows.values()), index=list(rows), dtype=object)
+        # Only keep the describe() columns that apply to the data seen
+        columns = [col for col in SUMMARY_COLUMNS if col in summary.columns]
+        return as_stored(summary[columns], self.float32)
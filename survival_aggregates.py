@@ -0,0 +1,202 @@
+import numpy as np
+import pandas as pd
+
+# Two-sided 95% normal quantile used for the Wilson intervals
+Z_95 = 1.959963984540054
+
+# Age bands used by the age-group survival analysis
+AGE_BINS = [0, 12, 18, 35, 60, 100]
+AGE_LABELS = ['Child', 'Teenager', 'Young Adult', 'Adult', 'Senior']
+
+
+def wilson_interval(successes, n, z=Z_95):
+    """Wilson score interval for binomial proportions.
+
+    Works element-wise on arrays; groups with ``n == 0`` get NaN bounds.
+    """
+    successes = np.asarray(successes, dtype=float)
+    n = np.asarray(n, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = successes / n
+        denom = 1 + z ** 2 / n
+        centre = (p + z ** 2 / (2 * n)) / denom
+        half = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denom
+    # Clip rounding noise so the bounds always bracket the observed rate
+    return np.clip(centre - half, 0, p), np.clip(centre + half, p, 1)
+
+
+def add_group_columns(df):
+    """Add the derived ``AgeGroup`` and ``FamilySize`` (SibSp + Parch) columns."""
+    df['AgeGroup'] = pd.cut(df['Age'], bins=AGE_BINS, labels=AGE_LABELS)
+    df['FamilySize'] = df['SibSp'] + df['Parch']
+    return df
+
+
+def _codes(series):
+    """Integer codes (-1 for missing) and labels of a grouping column."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    codes, labels = pd.factorize(series, sort=True)
+    return codes, labels
+
+
+def survival_tables(df, keys, target='Survived', backend='pandas'):
+    """Survivor counts and rates for several groupings of ``df`` at once.
+
+    ``keys`` holds column names and tuples of column names (interactions,
+    e.g. ``('Pclass', 'Sex')``). Every column is integer-coded once and each
+    grouping is reduced with ``np.bincount`` over the shared target array,
+    instead of one groupby per grouping. Rows with a missing key are left
+    out, like ``groupby`` does.
+
+    Returns a dict mapping each key to a DataFrame indexed by the group
+    labels with columns ``count``, ``survived``, ``rate``, ``ci_low`` and
+    ``ci_high``. Only observed groups are kept. With ``backend='polars'``
+    the groupings are summed by polars (see ``backends.survival_counts``).
+    """
+    if backend == 'polars':
+        from backends import survival_counts
+        return survival_counts(df, keys, target).tables()
+    outcome = df[target].to_numpy(dtype=float)
+    coded = {}
+    tables = {}
+    for key in keys:
+        columns = (key,) if isinstance(key, str) else tuple(key)
+        for column in columns:
+            if column not in coded:
+                coded[column] = _codes(df[column])
+
+        # Combine the per-column codes into one mixed-radix group code
+        group = np.zeros(len(df), dtype=np.int64)
+        valid = np.ones(len(df), dtype=bool)
+        for column in columns:
+            codes, labels = coded[column]
+            group = group * len(labels) + codes
+            valid &= codes >= 0
+        sizes = [len(coded[column][1]) for column in columns]
+        n_groups = int(np.prod(sizes))
+
+        count = np.bincount(group[valid], minlength=n_groups)
+        survived = np.bincount(group[valid], weights=outcome[valid], minlength=n_groups)
+        low, high = wilson_interval(survived, count)
+
+        if len(columns) == 1:
+            index = pd.Index(coded[columns[0]][1], name=columns[0])
+        else:
+            index = pd.MultiIndex.from_product([coded[column][1] for column in columns],
+                                               names=list(columns))
+        table = pd.DataFrame({
+            'count': count,
+            'survived': survived,
+            'rate': survived / np.maximum(count, 1),
+            'ci_low': low,
+            'ci_high': high,
+        }, index=index)
+        tables[key] = table[table['count'] > 0]
+    return tables
+
+
+def survival_rate(table):
+    """Survival percentage per group, shaped like ``groupby(...).mean() * 100``."""
+    return table['rate'].rename('Survived') * 100
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class SurvivalCounts:
+    """Group counts and survivors of several groupings, accumulated chunk by chunk.
+
+    ``update`` adds the ``survival_tables`` of a chunk to the running sums
+    and ``tables`` returns the tables of everything seen so far, identical
+    to ``survival_tables`` over all the rows. The state is plain data
+    (``to_dict``/``from_dict``), so it can be saved and extended later.
+    """
+
+    def __init__(self, keys, target='Survived'):
+        self.keys = [key if isinstance(key, str) else tuple(key) for key in keys]
+        self.target = target
+        self.n = 0
+        self.survived = 0.0
+        # key -> {group labels: [count, survived]}
+        self.groups = {key: {} for key in self.keys}
+        # Category order of categorical grouping columns, dtype of the others
+        self.categories = {}
+        self.dtypes = {}
+
+    def update(self, chunk):
+        outcome = chunk[self.target]
+        self.n += int(outcome.count())
+        self.survived += float(outcome.sum())
+        for key, table in survival_tables(chunk, self.keys, self.target).items():
+            columns = (key,) if isinstance(key, str) else key
+            for column in columns:
+                if isinstance(chunk[column].dtype, pd.CategoricalDtype):
+                    self.categories[column] = [_plain(label)
+                                               for label in chunk[column].cat.categories]
+                else:
+                    self.dtypes[column] = str(chunk[column].dtype)
+            groups = self.groups[key]
+            for labels, count, survived in zip(table.index, table['count'], table['survived']):
+                labels = tuple(_plain(label) for label in
+                               (labels if isinstance(labels, tuple) else (labels,)))
+                total = groups.setdefault(labels, [0, 0.0])
+                total[0] += int(count)
+                total[1] += float(survived)
+        return self
+
+    @property
+    def rate(self):
+        """Share of survivors over every row, like ``df[target].mean()``."""
+        return self.survived / self.n if self.n else np.nan
+
+    def tables(self):
+        tables = {}
+        for key in self.keys:
+            columns = (key,) if isinstance(key, str) else key
+            groups = self.groups[key]
+            # Order groups like survival_tables: category order for
+            # categorical columns, sorted labels otherwise
+            orders = []
+            for i, column in enumerate(columns):
+                labels = self.categories.get(column) or sorted({group[i] for group in groups})
+                orders.append({label: position for position, label in enumerate(labels)})
+            ordered = sorted(groups, key=lambda group: [order[label]
+                                                        for order, label in zip(orders, group)])
+            levels = [pd.Index([group[i] for group in ordered], dtype=self.dtypes.get(column))
+                      for i, column in enumerate(columns)]
+            if len(columns) == 1:
+                index = levels[0].rename(columns[0])
+            else:
+                index = pd.MultiIndex.from_arrays(levels, names=list(columns))
+            count = np.array([groups[group][0] for group in ordered], dtype=np.int64)
+            survived = np.array([groups[group][1] for group in ordered], dtype=float)
+            low, high = wilson_interval(survived, count)
+            tables[key] = pd.DataFrame({
+                'count': count,
+                'survived': survived,
+                'rate': survived / np.maximum(count, 1),
+                'ci_low': low,
+                'ci_high': high,
+            }, index=index)
+        return tables
+
+    def to_dict(self):
+        return {'keys': [key if isinstance(key, str) else list(key) for key in self.keys],
+                'target': self.target, 'n': self.n, 'survived': self.survived,
+                'groups': [[[list(labels), *totals] for labels, totals in self.groups[key].items()]
+                           for key in self.keys],
+                'categories': self.categories, 'dtypes': self.dtypes}
+
+    @classmethod
+    def from_dict(cls, state):
+        counts = cls(state['keys'], state['target'])
+        counts.n = state['n']
+        counts.survived = state['survived']
+        for key, groups in zip(counts.keys, state['groups']):
+            counts.groups[key] = {tuple(labels): [count, survived]
+                                  for labels, count, survived in groups}
+        counts.categories = state['categories']
+        counts.dtypes = state.get('dtypes', {})
+        return counts
@@ -0,0 +1,122 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from data_loader import SCHEMA
+
+# Rows generated and written per block, so large files never sit in memory
+BLOCK_ROWS = 1_000_000
+
+SURNAMES = np.array(['Smith', 'Johnson', 'Andersson', 'Brown', 'Williams', 'Kelly', 'Sage',
+                     'Goodwin', 'Panula', 'Skoog', 'Rice', 'Asplund', 'Fortune', 'Carter',
+                     'Palsson', 'Baxter', 'Harper', 'Lefebre', 'Ford', 'Hart', 'Allison',
+                     'Becker', 'Collyer', 'Davies', 'Elias', 'Moran', 'Nasser', 'Olsen'])
+MALE_NAMES = np.array(['John', 'William', 'James', 'Charles', 'George', 'Thomas', 'Edward',
+                       'Henry', 'Frederick', 'Arthur', 'Owen', 'Karl', 'Johan'])
+FEMALE_NAMES = np.array(['Mary', 'Anna', 'Elizabeth', 'Margaret', 'Alice', 'Helen', 'Ellen',
+                         'Florence', 'Laina', 'Bertha', 'Marguerite', 'Emily', 'Edith'])
+TICKET_PREFIXES = np.array(['', '', '', '', 'PC ', 'A/5 ', 'C.A. ', 'STON/O2. ', 'SOTON/O.Q. '])
+DECKS = np.array(list('ABCDEFG'))
+
+# Marginal distributions observed in the original 891-row manifest
+PCLASS_P = [0.24, 0.21, 0.55]
+FEMALE_P = 0.35
+AGE_NULL_P = 0.20
+SIBSP_VALUES, SIBSP_P = [0, 1, 2, 3, 4, 5, 8], [0.682, 0.235, 0.031, 0.018, 0.020, 0.006, 0.008]
+PARCH_VALUES, PARCH_P = [0, 1, 2, 3, 4, 5, 6], [0.761, 0.132, 0.090, 0.006, 0.004, 0.006, 0.001]
+CABIN_P = {1: 0.80, 2: 0.10, 3: 0.03}
+EMBARKED_VALUES, EMBARKED_P = ['C', 'Q', 'S'], [0.19, 0.09, 0.72]
+EMBARKED_NULL_P = 0.002
+
+
+def _ticket_groups(rng, n, first_group):
+    """Group ids with geometric group sizes, so tickets repeat like family bookings."""
+    sizes = rng.geometric(0.7, size=n)
+    groups = np.repeat(np.arange(first_group, first_group + n), sizes)[:n]
+    return groups[rng.permutation(n)]
+
+
+def synthetic_block(n, rng, first_id=1):
+    """Generate ``n`` passengers with the Titanic schema.
+
+    Null rates, class and port mix and the family-size distribution follow
+    the original data; Fare is log-normal per class and Tickets are shared
+    by small groups of passengers.
+    """
+    pclass = rng.choice([1, 2, 3], size=n, p=PCLASS_P)
+    female = rng.random(n) < FEMALE_P
+
+    age = np.clip(rng.normal(38 - 4 * pclass, 14), 0.42, 80)
+    age = np.where(age < 1, np.round(age, 2), np.round(age))
+    age[rng.random(n) < AGE_NULL_P] = np.nan
+
+    sibsp = rng.choice(SIBSP_VALUES, size=n, p=SIBSP_P)
+    parch = rng.choice(PARCH_VALUES, size=n, p=PARCH_P)
+
+    # Right-skewed fares averaging about 84 / 21 / 13 per class
+    fare_median = np.array([0, 66.0, 16.5, 10.0])[pclass]
+    fare = np.round(fare_median * rng.lognormal(0, 0.7, size=n), 4)
+    fare[rng.random(n) < 0.017] = 0.0
+
+    # Women, first class and children were more likely to survive
+    logit = -2.0 + 2.5 * female + np.array([0, 1.4, 0.6, 0.0])[pclass] \
+        - 0.02 * (np.nan_to_num(age, nan=30.0) - 30)
+    survived = (rng.random(n) < 1 / (1 + np.exp(-logit))).astype(np.int8)
+
+    groups = _ticket_groups(rng, n, first_id)
+    prefix = TICKET_PREFIXES[groups % len(TICKET_PREFIXES)]
+    ticket = pd.Series(prefix, dtype=object) + pd.Series(100000 + groups).astype(str)
+
+    has_cabin = rng.random(n) < np.array([0, CABIN_P[1], CABIN_P[2], CABIN_P[3]])[pclass]
+    cabin = pd.Series(DECKS[rng.integers(0, len(DECKS), n)], dtype=object) \
+        + pd.Series(rng.integers(1, 130, n)).astype(str)
+    cabin[~has_cabin] = np.nan
+
+    embarked = pd.Series(rng.choice(EMBARKED_VALUES, size=n, p=EMBARKED_P), dtype=object)
+    embarked[rng.random(n) < EMBARKED_NULL_P] = np.nan
+
+    adult = np.nan_to_num(age, nan=30.0) >= 14
+    title = np.where(female, np.where(adult & (sibsp + parch > 0), 'Mrs.', 'Miss.'),
+                     np.where(adult, 'Mr.', 'Master.'))
+    first = np.where(female, FEMALE_NAMES[rng.integers(0, len(FEMALE_NAMES), n)],
+                     MALE_NAMES[rng.integers(0, len(MALE_NAMES), n)])
+    name = (pd.Series(SURNAMES[groups % len(SURNAMES)], dtype=object) + ', '
+            + pd.Series(title, dtype=object) + ' ' + pd.Series(first, dtype=object))
+
+    df = pd.DataFrame({
+        'PassengerId': np.arange(first_id, first_id + n),
+        'Survived': survived,
+        'Pclass': pclass,
+        'Name': name,
+        'Sex': np.where(female, 'female', 'male'),
+        'Age': age,
+        'SibSp': sibsp,
+        'Parch': parch,
+        'Ticket': ticket,
+        'Fare': fare,
+        'Cabin': cabin,
+        'Embarked': embarked,
+    })
+    return df[list(SCHEMA)]
+
+
+def write_synthetic_csv(path, n_rows, seed=0, block_rows=BLOCK_ROWS):
+    """Write ``n_rows`` synthetic passengers to ``path`` in blocks."""
+    rng = np.random.default_rng(seed)
+    with open(path, 'w', newline='') as f:
+        for start in range(0, n_rows, block_rows):
+            n = min(block_rows, n_rows - start)
+            block = synthetic_block(n, rng, first_id=start + 1)
+            block.to_csv(f, index=False, header=start == 0)
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic Titanic-schema CSV')
+    parser.add_argument('rows', type=float, help='number of rows, e.g. 1e6')
+    parser.add_argument('--output', default='titanic_synthetic.csv')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_synthetic_csv(args.output, int(args.rows), seed=args.seed)
+    print(f"Wrote {int(args.rows):,} rows to {args.output}")
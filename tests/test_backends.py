@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip('polars')
+
+from backends import describe, outlier_bounds, survival_counts
+from data_loader import load_titanic
+from outliers import DEFAULT_THRESHOLDS
+from outliers import outlier_bounds as pandas_outlier_bounds
+from survival_aggregates import add_group_columns, survival_tables
+from test_scripts import DATA
+
+# The engines may sum floating-point statistics in a different order
+RTOL = 1e-12
+
+KEYS = ['Sex', 'Pclass', 'AgeGroup', 'Embarked', 'FamilySize', ('Pclass', 'Sex'),
+        ('Sex', 'Pclass', 'Survived')]
+
+
+@pytest.fixture(scope='module')
+def titanic():
+    return load_titanic(DATA)
+
+
+def assert_same(left, right):
+    """Labels, counts and dtypes identical; floating-point values equal to ``RTOL``."""
+    pd.testing.assert_frame_equal(left, right, check_exact=False, rtol=RTOL, atol=0)
+
+
+def test_describe(titanic):
+    assert_same(describe(titanic, 'pandas'), describe(titanic, 'polars'))
+
+
+def test_survival_counts(titanic):
+    grouped = add_group_columns(titanic.copy())
+    expected = survival_tables(grouped, KEYS, backend='pandas')
+    tables = survival_counts(grouped, KEYS).tables()
+    assert list(tables) == list(expected)
+    for key, table in expected.items():
+        assert_same(table, tables[key])
+
+
+@pytest.mark.parametrize('method', sorted(DEFAULT_THRESHOLDS))
+def test_outlier_bounds(titanic, method):
+    features = ['Age', 'Fare', 'SibSp', 'Parch']
+    threshold = DEFAULT_THRESHOLDS[method]
+    assert_same(pandas_outlier_bounds(titanic, features, method, threshold),
+                outlier_bounds(titanic, features, method, threshold))
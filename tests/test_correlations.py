@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from correlations import CorrelationAccumulator
+from data_loader import load_titanic
+from encoding import encode
+from test_scripts import DATA
+
+FEATURES = ['Survived', 'Pclass', 'Sex', 'Age', 'SibSp', 'Parch', 'Fare', 'Embarked']
+
+
+@pytest.fixture(scope='module')
+def encoded():
+    """titanic.csv as the correlation pass sees it: Age and Embarked have NaNs."""
+    return encode(load_titanic(DATA), FEATURES).astype(float)
+
+
+def merged(chunks, mode):
+    """One accumulator per chunk, merged."""
+    total = CorrelationAccumulator(FEATURES, mode)
+    for chunk in chunks:
+        part = CorrelationAccumulator(FEATURES, mode)
+        part.update(chunk)
+        total.merge(part)
+    return total
+
+
+def chunks_of(df):
+    # Uneven chunks, the first and another one empty; the others hold rows
+    # with NaNs
+    bounds = [0, 0, 100, 350, 350, 600, len(df)]
+    return [df.iloc[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def test_pairwise_matches_pandas(encoded):
+    accumulator = merged(chunks_of(encoded), 'pairwise')
+    pd.testing.assert_frame_equal(accumulator.to_frame(), encoded.corr(),
+                                  check_exact=False, rtol=1e-10, atol=1e-12)
+    np.testing.assert_array_equal(accumulator.rows, encoded.notna().sum().to_numpy())
+
+
+def test_listwise_matches_pandas(encoded):
+    accumulator = merged(chunks_of(encoded), 'listwise')
+    complete = encoded.dropna()
+    pd.testing.assert_frame_equal(accumulator.to_frame(), complete.corr(),
+                                  check_exact=False, rtol=1e-10, atol=1e-12)
+    assert accumulator.rows == len(complete)
+
+
+def test_single_update_matches_merged_chunks(encoded):
+    single = CorrelationAccumulator(FEATURES, 'pairwise')
+    for chunk in chunks_of(encoded):
+        single.update(chunk)
+    expected = merged(chunks_of(encoded), 'pairwise').to_frame()
+    pd.testing.assert_frame_equal(single.to_frame(), expected, check_exact=False, rtol=1e-10,
+                                  atol=1e-12)
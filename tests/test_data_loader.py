@@ -0,0 +1,44 @@
+import os
+import shutil
+
+import pandas as pd
+
+from data_loader import forget_loaded, iter_batches, load_titanic, materialize_arrow
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA = os.path.join(REPO_DIR, 'titanic.csv')
+
+
+def test_same_named_inputs_keep_separate_caches(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    first = tmp_path / 'first' / 'titanic.csv'
+    second = tmp_path / 'second' / 'titanic.csv'
+    for path in [first, second]:
+        path.parent.mkdir()
+    shutil.copy(DATA, first)
+    pd.read_csv(DATA).head(100).to_csv(second, index=False)
+
+    for _ in range(2):
+        forget_loaded()
+        assert len(load_titanic(str(first), cache_dir=cache_dir)) == 891
+        forget_loaded()
+        assert len(load_titanic(str(second), cache_dir=cache_dir)) == 100
+    assert len([name for name in os.listdir(cache_dir) if not name.endswith('.json')]) == 2
+
+
+def test_arrow_filter_on_unselected_column(tmp_path):
+    arrow_path = materialize_arrow(DATA, cache_dir=str(tmp_path))
+    df = load_titanic(arrow_path, columns=['Age', 'Fare'], filters=[('Embarked', '==', 'C')])
+    assert list(df.columns) == ['Age', 'Fare']
+    assert len(df) == 168
+
+
+def test_iter_batches_filter_on_unselected_column():
+    filters = [('PassengerId', '<', 500)]
+    batches = list(iter_batches(DATA, columns=['Age', 'Fare'], filters=filters, batch_size=200))
+    assert all(list(batch.columns) == ['Age', 'Fare'] for batch in batches)
+    assert sum(len(batch) for batch in batches) == 499
+    with open(DATA, 'rb') as f:
+        offset = len(f.readline())
+    batches = list(iter_batches(DATA, columns=['Age'], filters=filters, offset=offset))
+    assert sum(len(batch) for batch in batches) == 499
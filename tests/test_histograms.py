@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from histograms import HistogramEngine
+from test_scripts import DATA
+
+FEATURES = ['Age', 'Fare', 'SibSp', 'Parch']
+
+
+@pytest.fixture(scope='module')
+def titanic():
+    return pd.read_csv(DATA)
+
+
+@pytest.fixture(scope='module')
+def engine(titanic):
+    return HistogramEngine.from_frame(titanic, FEATURES)
+
+
+@pytest.mark.parametrize('feature', FEATURES)
+def test_counts_match_numpy(titanic, engine, feature):
+    counts, edges = np.histogram(titanic[feature].dropna(), bins=30)
+    np.testing.assert_array_equal(engine[feature].counts, counts)
+    np.testing.assert_allclose(engine[feature].edges, edges)
+
+
+@pytest.mark.parametrize('feature', FEATURES)
+def test_kde_matches_scipy(titanic, engine, feature):
+    from scipy.stats import gaussian_kde
+
+    histogram = engine[feature]
+    expected = gaussian_kde(titanic[feature].dropna())(histogram.grid)
+    # Linear binning on the 2048-point grid is accurate to well under 0.1%
+    # of the peak density
+    assert np.abs(histogram.kde() - expected).max() < 1e-3 * expected.max()
+
+
+def test_merged_chunks_match_single_pass(titanic, engine):
+    ranges = {feature: (titanic[feature].min(), titanic[feature].max()) for feature in FEATURES}
+    merged = HistogramEngine(ranges)
+    for start in range(0, len(titanic), 250):
+        merged.merge(HistogramEngine(ranges).update(titanic.iloc[start:start + 250]))
+    for feature in FEATURES:
+        np.testing.assert_array_equal(merged[feature].counts, engine[feature].counts)
+        np.testing.assert_allclose(merged[feature].kde(), engine[feature].kde(), rtol=1e-9,
+                                   atol=1e-12)
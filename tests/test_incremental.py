@@ -0,0 +1,72 @@
+import re
+
+import pandas as pd
+
+from test_scripts import DATA, run_script
+
+
+def added_rows(result):
+    """``(added, total)`` from the row counts eda.py prints in incremental mode."""
+    added, total = re.search(r'Added (\d+) rows to the saved statistics \((\d+) rows in total\)',
+                             result.stdout).groups()
+    return int(added), int(total)
+
+
+def summary(directory):
+    return pd.read_csv(directory / 'summary_statistics.csv', index_col=0)
+
+
+def split_titanic(tmp_path, n_rows=500):
+    """Write the first ``n_rows`` passengers to base.csv and the rest to delta.csv."""
+    with open(DATA) as f:
+        lines = f.read().splitlines(keepends=True)
+    base, delta = tmp_path / 'base.csv', tmp_path / 'delta.csv'
+    base.write_text(''.join(lines[:n_rows + 1]))
+    delta.write_text(''.join(lines[:1] + lines[n_rows + 1:]))
+    return base, delta, lines
+
+
+def test_append_reads_only_new_rows(tmp_path):
+    base, _, lines = split_titanic(tmp_path)
+    assert added_rows(run_script('eda.py', '--incremental', '--data', str(base),
+                                 cwd=tmp_path)) == (500, 500)
+    with open(base, 'a') as f:
+        f.write(''.join(lines[501:]))
+    result = run_script('eda.py', '--incremental', '--data', str(base), cwd=tmp_path)
+    assert 'bytes appended' in result.stdout
+    assert added_rows(result) == (391, 891)
+    incremental = summary(tmp_path)
+    full_dir = tmp_path / 'full'
+    full_dir.mkdir()
+    run_script('eda.py', '--data', DATA, '--backend', 'pandas', cwd=full_dir)
+    full = summary(full_dir)
+    assert (incremental['count'] == full['count']).all()
+    assert (incremental['missing'] == full['missing']).all()
+    cells = (['Age', 'Fare', 'Pclass', 'SibSp'], ['mean', 'std', 'min', 'max'])
+    pd.testing.assert_frame_equal(incremental.loc[cells].astype(float),
+                                  full.loc[cells].astype(float), rtol=1e-9)
+
+
+def test_new_rows_file_is_merged_once(tmp_path):
+    base, delta, _ = split_titanic(tmp_path)
+    run_script('eda.py', '--incremental', '--data', str(base), cwd=tmp_path)
+    result = run_script('eda.py', '--incremental', '--new-rows', '--data', str(delta),
+                        cwd=tmp_path)
+    assert added_rows(result) == (391, 891)
+    result = run_script('eda.py', '--incremental', '--new-rows', '--data', str(delta),
+                        cwd=tmp_path)
+    assert 'already in the saved state' in result.stdout
+    assert added_rows(result) == (0, 891)
+    # The main input is still where the state left it
+    result = run_script('eda.py', '--incremental', '--data', str(base), cwd=tmp_path)
+    assert 'Computing from every row' not in result.stdout
+    assert added_rows(result) == (0, 891)
+
+
+def test_other_filters_start_over(tmp_path):
+    run_script('eda.py', '--incremental', '--data', DATA, cwd=tmp_path)
+    result = run_script('eda.py', '--incremental', '--data', DATA, '--where', 'Pclass=1',
+                        cwd=tmp_path)
+    assert 'other --where filters' in result.stdout
+    assert added_rows(result) == (216, 216)
+    assert summary(tmp_path).loc['Pclass', 'count'] == 216
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from correlations import target_correlations
+from data_loader import load_titanic
+from encoding import encode
+from inference_report import describe_extremes, describe_predictor, profile_features, render_inferences
+from test_scripts import DATA
+
+FEATURES = ['Pclass', 'Sex', 'Age', 'SibSp', 'Parch', 'Fare', 'Embarked', 'HasCabin']
+
+
+def report(df):
+    correlations = target_correlations(encode(df, ['Survived'] + FEATURES), 'Survived', FEATURES)
+    return render_inferences(profile_features(df, correlations))
+
+
+def test_predictor_follows_correlation_rank():
+    correlations = pd.Series({'Sex': 0.1, 'Pclass': -0.6, 'Age': np.nan})
+    assert describe_predictor(correlations, 'Pclass').startswith('Pclass is the strongest')
+    assert describe_predictor(correlations, 'Sex') == ('Sex is a weak predictor of survival, '
+                                                       'ranked 2 of 3 features')
+    assert 'no defined correlation' in describe_predictor(correlations, 'Age')
+
+
+def test_extremes_of_rates():
+    rates = pd.Series({'C': 55.4, 'Q': 39.0, 'S': 33.7})
+    assert describe_extremes(rates, {'C': 'Cherbourg'}).startswith(
+        'Cherbourg had the highest survival rate (55.4%) and S the lowest (33.7%)')
+    assert describe_extremes(rates[['Q']]).startswith('Only one group')
+    assert describe_extremes(pd.Series({1: 40.0, 2: 40.0})).startswith('Every group')
+
+
+def test_conclusions_follow_the_data():
+    df = load_titanic(DATA)
+    assert 'Sex is the strongest predictor' in report(df)
+
+    # When exactly the 1st class passengers survive, class is what the
+    # report must single out, not sex
+    flipped = df.copy()
+    flipped['Survived'] = (flipped['Pclass'].astype(int) == 1).astype(flipped['Survived'].dtype)
+    text = report(flipped)
+    assert 'Pclass is the strongest predictor' in text
+    assert 'Sex is the strongest predictor' not in text
+    assert '1st class had the highest survival rate (100.0%)' in text
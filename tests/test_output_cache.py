@@ -0,0 +1,13 @@
+from output_cache import OutputCache
+
+
+def test_imported_module_edit_invalidates(tmp_path):
+    script = tmp_path / 'draw.py'
+    helper = tmp_path / 'helper.py'
+    script.write_text('def main():\n    from helper import draw\n    draw()\n')
+    helper.write_text('CUTOFF = 1\n')
+    manifest_dir = tmp_path / 'manifests'
+    before = OutputCache(None, str(script), manifest_dir, data_key='x').fingerprint(['Age'])
+    helper.write_text('CUTOFF = 2\n')
+    after = OutputCache(None, str(script), manifest_dir, data_key='x').fingerprint(['Age'])
+    assert before != after
@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from profiling import _memory_mb, profile_stage, take_records
+
+pytestmark = pytest.mark.skipif(_memory_mb() is None, reason='needs /proc memory counters')
+
+
+def test_peak_rss_increase_is_per_stage():
+    take_records()
+    with profile_stage('outer'):
+        with profile_stage('allocate'):
+            values = np.ones(25_000_000)
+            values += 1
+            del values
+        with profile_stage('small'):
+            np.ones(1000).sum()
+    records = {record['stage']: record['peak_rss_increase_mb'] for record in take_records()}
+    if records['allocate'] is None:
+        pytest.skip('the peak memory counter cannot be reset here')
+    assert records['allocate'] > 150
+    assert records['small'] < 50
+    assert records['outer'] >= records['allocate']
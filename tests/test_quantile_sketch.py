@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib import cbook
+
+from boxplot_sketches import BoxAccumulator, BoxplotSketches
+from streaming_stats import KLLSketch
+from test_scripts import DATA
+
+QUANTILES = np.linspace(0.01, 0.99, 99)
+
+
+def rank_error(sketch, values):
+    """Largest distance between the requested and the true rank of the sketch's quantiles."""
+    ordered = np.sort(values)
+    ranks = np.searchsorted(ordered, sketch.quantile(QUANTILES)) / ordered.size
+    return np.abs(ranks - QUANTILES).max()
+
+
+@pytest.fixture(scope='module')
+def values():
+    return np.random.default_rng(1).lognormal(size=200_000)
+
+
+def test_small_input_is_exact():
+    values = np.random.default_rng(2).normal(size=1000)
+    sketch = KLLSketch(k=2048)
+    sketch.update(values)
+    assert sketch.exact
+    np.testing.assert_array_equal(sketch.quantile(QUANTILES), np.quantile(values, QUANTILES))
+
+
+def test_rank_error(values):
+    sketch = KLLSketch(k=256)
+    sketch.update(values)
+    assert not sketch.exact
+    assert rank_error(sketch, values) < 0.005
+
+
+def test_merge_matches_single_pass(values):
+    single = KLLSketch(k=256)
+    single.update(values)
+    merged = KLLSketch(k=256)
+    for chunk in np.array_split(values, 20):
+        part = KLLSketch(k=256)
+        part.update(chunk)
+        merged.merge(part)
+    assert merged.n == single.n == values.size
+    assert rank_error(merged, values) < 0.01
+    # Both estimates of every quantile fall at nearly the same rank
+    ordered = np.sort(values)
+    merged_ranks = np.searchsorted(ordered, merged.quantile(QUANTILES))
+    single_ranks = np.searchsorted(ordered, single.quantile(QUANTILES))
+    assert np.abs(merged_ranks - single_ranks).max() / values.size < 0.01
+
+
+def test_merge_of_exact_sketches_is_exact():
+    values = np.random.default_rng(3).normal(size=3000)
+    merged = KLLSketch(k=4096)
+    for chunk in np.array_split(values, 7):
+        part = KLLSketch(k=4096)
+        part.update(chunk)
+        merged.merge(part)
+    np.testing.assert_array_equal(merged.quantile(QUANTILES), np.quantile(values, QUANTILES))
+
+
+def assert_box_matches(stats, values):
+    expected = cbook.boxplot_stats(values)[0]
+    for name in ['med', 'q1', 'q3', 'whislo', 'whishi']:
+        assert stats[name] == expected[name], name
+    np.testing.assert_array_equal(np.sort(stats['fliers']), np.sort(expected['fliers']))
+
+
+@pytest.mark.parametrize('feature', ['Age', 'Fare', 'SibSp', 'Parch'])
+def test_box_stats_match_matplotlib(feature):
+    values = pd.read_csv(DATA)[feature].dropna().to_numpy()
+    box = BoxAccumulator()
+    for chunk in np.array_split(values, 5):
+        part = BoxAccumulator()
+        part.update(chunk)
+        box.merge(part)
+    assert_box_matches(box.stats(), values)
+
+
+def test_grouped_box_stats_match_matplotlib():
+    df = pd.read_csv(DATA)
+    sketches = BoxplotSketches(['Fare'], groups=['Pclass'])
+    for start in range(0, len(df), 200):
+        sketches.update(df.iloc[start:start + 200])
+    stats = sketches.stats('Fare', 'Pclass')
+    assert [box['label'] for box in stats] == [1, 2, 3]
+    for box in stats:
+        assert_box_matches(box, df.loc[df['Pclass'] == box['label'], 'Fare'].to_numpy())
@@ -0,0 +1,86 @@
+import os
+import shutil
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA = os.path.join(REPO_DIR, 'titanic.csv')
+
+
+def run_script(script, *args, cwd):
+    """Run a repo script with ``cwd`` as its output directory; fail on a non-zero exit."""
+    result = subprocess.run([sys.executable, os.path.join(REPO_DIR, script), *args], cwd=cwd,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr[-2000:]
+    return result
+
+
+def test_eda_stream(tmp_path):
+    run_script('eda.py', '--stream', '--chunksize', '200', '--data', DATA, cwd=tmp_path)
+    with open(tmp_path / 'summary_statistics.csv') as f:
+        rows = f.read().splitlines()
+    assert rows[0].startswith(',count')
+    assert any(row.startswith('Age,714') for row in rows)
+
+
+def png_sizes(directory):
+    """Map each PNG under ``directory`` (by relative path) to its (width, height)."""
+    sizes = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith('.png'):
+                path = os.path.join(root, name)
+                with open(path, 'rb') as f:
+                    header = f.read(24)
+                sizes[os.path.relpath(path, directory)] = (int.from_bytes(header[16:20], 'big'),
+                                                          int.from_bytes(header[20:24], 'big'))
+    return sizes
+
+
+def test_batch_images_match_standalone(tmp_path):
+    standalone = tmp_path / 'standalone'
+    standalone.mkdir()
+    for script in ['feature_relationships.py', 'patterns_analysis.py']:
+        run_script(script, '--data', DATA, '--render-profile', 'preview', cwd=standalone)
+    expected = png_sizes(standalone)
+    assert expected
+
+    inputs = []
+    for name in ['first', 'second']:
+        path = tmp_path / f'{name}.csv'
+        shutil.copy(DATA, path)
+        inputs.append(str(path))
+    run_script('batch.py', *inputs, '--jobs', '1', '--render-profile', 'preview',
+               '--output', str(tmp_path / 'batch'), cwd=tmp_path)
+    for name in ['first', 'second']:
+        sizes = png_sizes(tmp_path / 'batch' / name)
+        assert {path: sizes.get(path) for path in expected} == expected
+
+
+def test_feature_relationships_matrix_only(tmp_path):
+    result = run_script('feature_relationships.py', '--matrix-only', '--chunksize', '100',
+                        '--data', DATA, '--render-profile', 'preview', cwd=tmp_path)
+    assert 'Correlations use the 712 of 891 rows' in result.stdout
+    plots = set(os.listdir(tmp_path / 'plots' / 'correlations'))
+    assert {'correlation_matrix.png', 'survival_correlation.png'} <= plots
+    assert 'pairplot.png' not in plots
+
+
+def test_empty_selection_exits_with_message(tmp_path):
+    for script in ['visualizations.py', 'feature_relationships.py', 'patterns_analysis.py',
+                   'feature_inferences.py']:
+        result = subprocess.run([sys.executable, os.path.join(REPO_DIR, script), '--data', DATA,
+                                 '--where', 'Fare>10000'], cwd=tmp_path, capture_output=True,
+                                text=True)
+        assert result.returncode == 1, script
+        assert result.stderr.strip().endswith('No rows match --where Fare > 10000.0'), script
+
+
+def test_incremental_charts_follow_where(tmp_path):
+    chart = tmp_path / 'analysis' / 'survival_by_gender.png'
+    run_script('patterns_analysis.py', '--incremental', '--data', DATA,
+               '--render-profile', 'preview', cwd=tmp_path)
+    before = chart.read_bytes()
+    run_script('patterns_analysis.py', '--incremental', '--data', DATA, '--where', 'Pclass=1',
+               '--render-profile', 'preview', cwd=tmp_path)
+    assert chart.read_bytes() != before
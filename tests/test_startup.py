@@ -0,0 +1,56 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from test_scripts import REPO_DIR
+
+# Plotting libraries a script must not import until it has a figure to draw
+HEAVY_MODULES = ['matplotlib.pyplot', 'seaborn', 'scipy', 'plotly.express',
+                 'plotly.graph_objects']
+
+# Seconds each script may take to start up, measured as ``<script> --help``
+# (imports and argument parsing, no data work)
+STARTUP_BUDGETS = {
+    'eda.py': 1.5,
+    'visualizations.py': 1.5,
+    'feature_relationships.py': 1.5,
+    'patterns_analysis.py': 1.5,
+    'feature_inferences.py': 1.5,
+}
+
+# Runs a script's argument parsing and prints the heavy modules it imported
+PROBE = '''
+import json, runpy, sys
+script, heavy = sys.argv[1], json.loads(sys.argv[2])
+sys.argv = [script, '--help']
+try:
+    runpy.run_path(script, run_name='__main__')
+except SystemExit:
+    pass
+print(json.dumps([name for name in heavy if name in sys.modules]))
+'''
+
+
+@pytest.mark.parametrize('script', sorted(STARTUP_BUDGETS))
+def test_no_plotting_imports_at_startup(script):
+    path = os.path.join(REPO_DIR, script)
+    probe = subprocess.run([sys.executable, '-c', PROBE, path, json.dumps(HEAVY_MODULES)],
+                           cwd=REPO_DIR, capture_output=True, text=True)
+    assert probe.returncode == 0, probe.stderr[-2000:]
+    assert json.loads(probe.stdout.splitlines()[-1]) == []
+
+
+@pytest.mark.parametrize('script', sorted(STARTUP_BUDGETS))
+def test_startup_within_budget(script):
+    path = os.path.join(REPO_DIR, script)
+    seconds = []
+    for _ in range(3):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, path, '--help'], cwd=REPO_DIR,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        seconds.append(time.perf_counter() - start)
+    assert min(seconds) <= STARTUP_BUDGETS[script]
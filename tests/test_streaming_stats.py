@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from data_loader import iter_batches, load_titanic
+from streaming_stats import StreamingSummary
+from test_scripts import DATA
+
+STATS = ['count', 'mean', 'std', 'missing']
+
+
+@pytest.fixture(scope='module')
+def single_pass():
+    return StreamingSummary().update(load_titanic(DATA)).to_frame()
+
+
+def assert_stats_equal(left, right, stats, rtol=1e-10):
+    pd.testing.assert_frame_equal(left[stats].astype(float), right[stats].astype(float),
+                                  check_exact=False, rtol=rtol)
+
+
+def test_merged_batches_match_single_pass(single_pass):
+    summary = StreamingSummary()
+    for batch in iter_batches(DATA, batch_size=97):
+        summary.merge(StreamingSummary().update(batch))
+    merged = summary.to_frame()
+    assert summary.n_rows == 891
+    assert_stats_equal(merged, single_pass, STATS)
+    for column in ['Sex', 'Embarked', 'Ticket', 'Cabin']:
+        assert merged.at[column, 'top'] == single_pass.at[column, 'top']
+        assert merged.at[column, 'freq'] == single_pass.at[column, 'freq']
+
+
+def test_saved_state_resumes():
+    batches = list(iter_batches(DATA, batch_size=300))
+    summary = StreamingSummary().update(batches[0])
+    for batch in batches[1:]:
+        summary = StreamingSummary.from_dict(summary.to_dict()).update(batch)
+    full = StreamingSummary().update(load_titanic(DATA)).to_frame()
+    assert_stats_equal(summary.to_frame(), full, STATS + ['min', '25%', '50%', '75%', 'max'])
+
+
+def test_matches_describe(single_pass):
+    raw = pd.read_csv(DATA)
+    expected = raw.describe(include='all').T
+    expected['missing'] = raw.isnull().sum()
+    numeric = ['PassengerId', 'Survived', 'Pclass', 'Age', 'SibSp', 'Parch', 'Fare']
+    order_stats = ['min', '25%', '50%', '75%', 'max']
+    # Age and Fare are stored as float32, so their moments agree to its precision
+    assert_stats_equal(single_pass.loc[numeric], expected.loc[numeric], STATS, rtol=1e-7)
+    # Order statistics of the float32 columns read as in the CSV
+    assert (single_pass.loc[numeric, order_stats].astype(float)
+            == expected.loc[numeric, order_stats].astype(float)).all().all()
+    # Ties for the most frequent value are broken differently, so only
+    # compare top where it is unique
+    others = ['Name', 'Sex', 'Ticket', 'Cabin', 'Embarked']
+    assert_stats_equal(single_pass.loc[others], expected.loc[others],
+                       ['count', 'unique', 'freq', 'missing'])
+    for column in ['Sex', 'Embarked']:
+        assert single_pass.at[column, 'top'] == expected.at[column, 'top']
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import load_titanic
+from survival_aggregates import SurvivalCounts, add_group_columns, survival_rate, survival_tables
+from test_scripts import DATA
+
+# Embarked and AgeGroup (from Age) have missing values; AgeBand is a plain
+# float column with NaNs rather than a categorical
+KEYS = ['Sex', 'Pclass', 'AgeGroup', 'Embarked', 'FamilySize', 'AgeBand', ('Pclass', 'Sex'),
+        ('Sex', 'Pclass', 'Survived'), ('Embarked', 'AgeGroup'), ('AgeBand', 'Sex')]
+
+
+@pytest.fixture(scope='module')
+def titanic():
+    df = add_group_columns(load_titanic(DATA))
+    df['AgeBand'] = (df['Age'] // 20).astype(float)
+    return df
+
+
+def expected_rate(df, key):
+    columns = [key] if isinstance(key, str) else list(key)
+    return df.groupby(columns, observed=True)['Survived'].mean() * 100
+
+
+@pytest.mark.parametrize('key', KEYS, ids=str)
+def test_rates_match_groupby(titanic, key):
+    rate = survival_rate(survival_tables(titanic, KEYS)[key])
+    expected = expected_rate(titanic, key)
+    assert list(rate.index) == list(expected.index)
+    np.testing.assert_allclose(rate.to_numpy(), expected.to_numpy(), rtol=1e-12)
+    counts = titanic.groupby([key] if isinstance(key, str) else list(key), observed=True).size()
+    assert list(survival_tables(titanic, KEYS)[key]['count']) == list(counts)
+
+
+def test_chunked_counts_match_single_pass(titanic):
+    expected = survival_tables(titanic, KEYS)
+    counts = SurvivalCounts(KEYS)
+    for start in range(0, len(titanic), 128):
+        counts.update(titanic.iloc[start:start + 128])
+    restored = SurvivalCounts.from_dict(counts.to_dict())
+    for tables in [counts.tables(), restored.tables()]:
+        for key in KEYS:
+            pd.testing.assert_frame_equal(tables[key], expected[key], check_index_type=False,
+                                          check_categorical=False)
@@ -1,117 +1,227 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import argparse
 import os
 
-# Set style for matplotlib plots
-plt.style.use('seaborn-v0_8-whitegrid')
-sns.set_palette('viridis')
-plt.rcParams['figure.figsize'] = (12, 8)
-
-# Create directories for saving plots
-if not os.path.exists('plots'):
-    os.makedirs('plots')
-if not os.path.exists('plots/histograms'):
-    os.makedirs('plots/histograms')
-if not os.path.exists('plots/boxplots'):
-    os.makedirs('plots/boxplots')
-
-# Load the dataset
-df = pd.read_csv('titanic.csv')
+from boxplot_sketches import BoxplotSketches, draw_boxes
+from data_loader import add_data_arguments, load_titanic, require_rows
+from figure_pool import load_plotting, pooled_figure
+from histograms import HistogramEngine, draw_histogram
+from html_export import histogram_figure, report_sizes, write_html
+from output_cache import OutputCache
+from profiling import profile_stage, write_report
+from render_pool import default_jobs, run_jobs
+from render_settings import add_render_argument, savefig, set_render_profile
 
 # List of numeric features for visualization
 numeric_features = ['Age', 'Fare', 'SibSp', 'Parch']
 
-# Create histograms for numeric features
-print("Generating histograms for numeric features...")
-for feature in numeric_features:
-    plt.figure(figsize=(10, 6))
-    sns.histplot(df[feature].dropna(), kde=True, bins=30)
-    plt.title(f'Distribution of {feature}', fontsize=16)
-    plt.xlabel(feature, fontsize=12)
-    plt.ylabel('Frequency', fontsize=12)
-    plt.grid(True, alpha=0.3)
-    plt.savefig(f'plots/histograms/{feature}_histogram.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    
+# Grouping columns for the per-group boxplots, keyed by file suffix: (column, title, x label)
+boxplot_groups = {
+    'survival': ('Survived', 'Survival Status', 'Survived (0=No, 1=Yes)'),
+    'class': ('Pclass', 'Passenger Class', 'Passenger Class'),
+    'gender': ('Sex', 'Gender', 'Gender'),
+}
+
+# Columns read from the dataset; the rest are never loaded
+columns = numeric_features + [column for column, *_ in boxplot_groups.values()]
+
+# Box statistics of every boxplot and bins of every histogram, built once
+# per process by ``box_sketches`` and ``feature_histograms``
+_sketches = None
+_histograms = None
+
+
+def box_sketches(df):
+    """Sketch-based box statistics shared by all boxplot figures.
+
+    They are built in one pass over ``df`` the first time they are needed;
+    render workers forked after that inherit them.
+    """
+    global _sketches
+    if _sketches is None:
+        groups = [column for column, *_ in boxplot_groups.values()]
+        _sketches = BoxplotSketches(numeric_features, groups).update(df)
+    return _sketches
+
+
+def feature_histograms(df):
+    """Bin counts and KDEs of the numeric features, shared by every histogram.
+
+    The per-feature figures, the combined figure and the interactive pages
+    are all drawn from these arrays; forked render workers inherit them.
+    """
+    global _histograms
+    if _histograms is None:
+        _histograms = HistogramEngine.from_frame(df, numeric_features)
+    return _histograms
+
+
+# Create a histogram for a numeric feature
+def plot_histogram(df, feature, mode='binned'):
+    plt, sns = load_plotting()
+    with pooled_figure((10, 6)):
+        if mode == 'binned':
+            draw_histogram(plt.gca(), feature_histograms(df)[feature])
+        else:
+            sns.histplot(df[feature].dropna(), kde=True, bins=30)
+        plt.title(f'Distribution of {feature}', fontsize=16)
+        plt.xlabel(feature, fontsize=12)
+        plt.ylabel('Frequency', fontsize=12)
+        plt.grid(True, alpha=0.3)
+        savefig(f'plots/histograms/{feature}_histogram.png')
+
     # Also create a plotly version for interactive visualization
-    fig = px.histogram(df, x=feature, marginal="box", title=f'Distribution of {feature}')
-    fig.write_html(f'plots/histograms/{feature}_histogram_interactive.html')
-
-# Create boxplots for numeric features
-print("Generating boxplots for numeric features...")
-for feature in numeric_features:
-    plt.figure(figsize=(10, 6))
-    sns.boxplot(y=df[feature].dropna())
-    plt.title(f'Boxplot of {feature}', fontsize=16)
-    plt.ylabel(feature, fontsize=12)
-    plt.grid(True, alpha=0.3)
-    plt.savefig(f'plots/boxplots/{feature}_boxplot.png', dpi=300, bbox_inches='tight')
-    plt.close()
-
-# Create boxplots by survival status
-print("Generating boxplots by survival status...")
-for feature in numeric_features:
-    plt.figure(figsize=(10, 6))
-    sns.boxplot(x='Survived', y=feature, data=df)
-    plt.title(f'Boxplot of {feature} by Survival Status', fontsize=16)
-    plt.xlabel('Survived (0=No, 1=Yes)', fontsize=12)
-    plt.ylabel(feature, fontsize=12)
-    plt.grid(True, alpha=0.3)
-    plt.savefig(f'plots/boxplots/{feature}_by_survival_boxplot.png', dpi=300, bbox_inches='tight')
-    plt.close()
-
-# Create boxplots by passenger class
-print("Generating boxplots by passenger class...")
-for feature in numeric_features:
-    plt.figure(figsize=(10, 6))
-    sns.boxplot(x='Pclass', y=feature, data=df)
-    plt.title(f'Boxplot of {feature} by Passenger Class', fontsize=16)
-    plt.xlabel('Passenger Class', fontsize=12)
-    plt.ylabel(feature, fontsize=12)
-    plt.grid(True, alpha=0.3)
-    plt.savefig(f'plots/boxplots/{feature}_by_class_boxplot.png', dpi=300, bbox_inches='tight')
-    plt.close()
-
-# Create boxplots by gender
-print("Generating boxplots by gender...")
-for feature in numeric_features:
-    plt.figure(figsize=(10, 6))
-    sns.boxplot(x='Sex', y=feature, data=df)
-    plt.title(f'Boxplot of {feature} by Gender', fontsize=16)
-    plt.xlabel('Gender', fontsize=12)
-    plt.ylabel(feature, fontsize=12)
-    plt.grid(True, alpha=0.3)
-    plt.savefig(f'plots/boxplots/{feature}_by_gender_boxplot.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    fig = histogram_figure(feature_histograms(df)[feature], f'Distribution of {feature}',
+                           box_sketches(df).stats(feature)[0])
+    write_html(fig, f'plots/histograms/{feature}_histogram_interactive.html')
+
+
+# Create a boxplot for a numeric feature
+def plot_boxplot(df, feature, mode='sketch'):
+    plt, sns = load_plotting()
+    with pooled_figure((10, 6)):
+        if mode == 'sketch':
+            draw_boxes(plt.gca(), box_sketches(df).stats(feature))
+        else:
+            sns.boxplot(y=df[feature].dropna())
+        plt.title(f'Boxplot of {feature}', fontsize=16)
+        plt.ylabel(feature, fontsize=12)
+        plt.grid(True, alpha=0.3)
+        savefig(f'plots/boxplots/{feature}_boxplot.png')
+
+
+# Create a boxplot of a numeric feature split by survival status, class or gender
+def plot_grouped_boxplot(df, feature, group, mode='sketch'):
+    column, title, xlabel = boxplot_groups[group]
+    plt, sns = load_plotting()
+    with pooled_figure((10, 6)):
+        if mode == 'sketch':
+            draw_boxes(plt.gca(), box_sketches(df).stats(feature, column), grouped=True)
+        else:
+            sns.boxplot(x=column, y=feature, data=df)
+        plt.title(f'Boxplot of {feature} by {title}', fontsize=16)
+        plt.xlabel(xlabel, fontsize=12)
+        plt.ylabel(feature, fontsize=12)
+        plt.grid(True, alpha=0.3)
+        savefig(f'plots/boxplots/{feature}_by_{group}_boxplot.png')
+
 
 # Create a combined figure showing distributions of all numeric features
-plt.figure(figsize=(16, 12))
-for i, feature in enumerate(numeric_features, 1):
-    plt.subplot(2, 2, i)
-    sns.histplot(df[feature].dropna(), kde=True, bins=30)
-    plt.title(f'Distribution of {feature}', fontsize=14)
-    plt.xlabel(feature, fontsize=12)
-    plt.ylabel('Frequency', fontsize=12)
-    plt.grid(True, alpha=0.3)
-plt.tight_layout()
-plt.savefig('plots/combined_distributions.png', dpi=300, bbox_inches='tight')
-plt.close()
+def plot_combined_distributions(df, mode='binned'):
+    plt, sns = load_plotting()
+    with pooled_figure((16, 12)):
+        for i, feature in enumerate(numeric_features, 1):
+            ax = plt.subplot(2, 2, i)
+            if mode == 'binned':
+                draw_histogram(ax, feature_histograms(df)[feature])
+            else:
+                sns.histplot(df[feature].dropna(), kde=True, bins=30)
+            plt.title(f'Distribution of {feature}', fontsize=14)
+            plt.xlabel(feature, fontsize=12)
+            plt.ylabel('Frequency', fontsize=12)
+            plt.grid(True, alpha=0.3)
+        plt.tight_layout()
+        savefig('plots/combined_distributions.png')
+
 
 # Create a combined boxplot figure
-plt.figure(figsize=(16, 12))
-for i, feature in enumerate(numeric_features, 1):
-    plt.subplot(2, 2, i)
-    sns.boxplot(y=df[feature].dropna())
-    plt.title(f'Boxplot of {feature}', fontsize=14)
-    plt.ylabel(feature, fontsize=12)
-    plt.grid(True, alpha=0.3)
-plt.tight_layout()
-plt.savefig('plots/combined_boxplots.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-print("All histograms and boxplots have been generated and saved to the 'plots' directory.")
+def plot_combined_boxplots(df, mode='sketch'):
+    plt, sns = load_plotting()
+    with pooled_figure((16, 12)):
+        for i, feature in enumerate(numeric_features, 1):
+            ax = plt.subplot(2, 2, i)
+            if mode == 'sketch':
+                draw_boxes(ax, box_sketches(df).stats(feature))
+            else:
+                sns.boxplot(y=df[feature].dropna())
+            plt.title(f'Boxplot of {feature}', fontsize=14)
+            plt.ylabel(feature, fontsize=12)
+            plt.grid(True, alpha=0.3)
+        plt.tight_layout()
+        savefig('plots/combined_boxplots.png')
+
+
+def build_jobs(histogram_mode='binned', boxplot_mode='sketch'):
+    """List every figure of this stage as an independent render job.
+
+    Each entry is ``(func, args, columns, outputs)``: the render function and
+    its arguments, the dataframe columns it reads and the files it writes.
+    """
+    jobs = []
+    for feature in numeric_features:
+        jobs.append((plot_histogram, (feature, histogram_mode), [feature],
+                     [f'plots/histograms/{feature}_histogram.png',
+                      f'plots/histograms/{feature}_histogram_interactive.html']))
+    for feature in numeric_features:
+        jobs.append((plot_boxplot, (feature, boxplot_mode), [feature],
+                     [f'plots/boxplots/{feature}_boxplot.png']))
+    for group, (column, _, _) in boxplot_groups.items():
+        for feature in numeric_features:
+            jobs.append((plot_grouped_boxplot, (feature, group, boxplot_mode), [feature, column],
+                         [f'plots/boxplots/{feature}_by_{group}_boxplot.png']))
+    jobs.append((plot_combined_distributions, (histogram_mode,), numeric_features,
+                 ['plots/combined_distributions.png']))
+    jobs.append((plot_combined_boxplots, (boxplot_mode,), numeric_features,
+                 ['plots/combined_boxplots.png']))
+    return jobs
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Histograms and boxplots of the numeric features')
+    parser.add_argument('--jobs', type=int, default=default_jobs(),
+                        help='number of worker processes used to render figures')
+    parser.add_argument('--force', action='store_true',
+                        help='re-render figures even if their inputs are unchanged')
+    parser.add_argument('--histogram-mode', choices=['binned', 'seaborn'], default='binned',
+                        help="'binned' draws every histogram and KDE from bins counted once per "
+                             "feature; 'seaborn' re-bins the raw data and runs scipy's KDE per figure")
+    parser.add_argument('--boxplot-mode', choices=['sketch', 'seaborn'], default='sketch',
+                        help="'sketch' draws every boxplot from quantile sketches built in one "
+                             "pass; 'seaborn' sorts the raw data for each figure")
+    add_data_arguments(parser)
+    add_render_argument(parser)
+    args = parser.parse_args()
+    set_render_profile(args.render_profile)
+
+    # Create directories for saving plots
+    if not os.path.exists('plots'):
+        os.makedirs('plots')
+    if not os.path.exists('plots/histograms'):
+        os.makedirs('plots/histograms')
+    if not os.path.exists('plots/boxplots'):
+        os.makedirs('plots/boxplots')
+
+    # Load the dataset
+    source = {'path': args.data, 'columns': columns, 'filters': args.where}
+    df = load_titanic(**source)
+    require_rows(len(df), args.where)
+
+    # Only render figures whose data, parameters or code changed since the last run
+    cache = OutputCache(df, __file__, force=args.force)
+    all_jobs = build_jobs(args.histogram_mode, args.boxplot_mode)
+    jobs = [(func, job_args) for func, job_args, columns, outputs in all_jobs
+            if cache.stale(outputs, columns, {'job': func.__name__, 'args': job_args})]
+
+    print(f"Generating {len(jobs)} of {len(all_jobs)} histogram/boxplot figures with {args.jobs} worker(s)...")
+    if jobs:
+        # Import the plotting libraries once here so forked workers inherit them
+        load_plotting()
+    # Shared statistics are computed once here, before the workers fork;
+    # the interactive histograms use both
+    names = [func.__name__ for func, _ in jobs]
+    if any(name in ('plot_histogram', 'plot_combined_distributions') for name in names):
+        with profile_stage('feature_histograms'):
+            feature_histograms(df)
+    if 'plot_histogram' in names or (args.boxplot_mode == 'sketch'
+                                     and any('boxplot' in name for name in names)):
+        with profile_stage('box_sketches'):
+            box_sketches(df)
+    run_jobs(jobs, df, args.jobs, source=source)
+    cache.save()
+
+    print("Interactive exports:")
+    report_sizes([path for *_, outputs in all_jobs for path in outputs if path.endswith('.html')])
+
+    write_report(__file__)
+    print("All histograms and boxplots have been generated and saved to the 'plots' directory.")